@@ -0,0 +1,16 @@
+"""
+基准测试：合成榜单 / 爬虫 / 价格趋势数据，分阶段计时
+
+    python -m benchmarks.run --sizes 100 1000
+
+synthetic.generate_inputs 生成与真实输入格式相同的文件，run 对合并、解码、流量周期、
+价格趋势判断、绘图、规则判断、写出报告分别计时，结果追加到 benchmarks/results/history.jsonl。
+
+    python -m benchmarks.split_parity 200 1000
+
+split_parity 保留报告拆分的原 openpyxl 实现，与流式实现对比输出内容和峰值内存。
+
+    python -m benchmarks.product_value_parity
+
+product_value_parity 保留开发结论的原逐行决策树，与规则表逐项对比。
+"""
@@ -0,0 +1,237 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+from contextlib import ExitStack, redirect_stdout
+from datetime import datetime
+from io import BytesIO, StringIO
+from typing import Callable, Dict, List, Optional
+from unittest import mock
+
+import pandas as pd
+
+import data_processor
+from data_processor import load_and_merge_data
+from analyze_product_value import analyze_product_value_bs
+from benchmarks.synthetic import BENCHMARK_DATA_DIR, generate_inputs
+from determining_traffic_cycle import KeywordFlowMemo, set_keyword_flow_memo
+from excel_handler import REPORT_BACKENDS
+from main import prepare_dataframe_columns
+from pipeline_log import PipelineLog, set_pipeline_log
+from pipeline_timing import StageTimer, pad_display, set_stage_timer, stage
+from plot_search_trend import DEFAULT_CHART_DPI, set_chart_cache
+from price_trend_store import load_price_trend_store
+from row_engine import process_rows
+from title_features import add_title_features
+
+DEFAULT_SIZES = (100, 1000)
+# 每次运行的结果追加到这个文件（一行一次运行），与上一次同规模、同设置的结果对比
+HISTORY_PATH = 'benchmarks/results/history.jsonl'
+# 各阶段的计时方式变化时加 1，不再与旧结果对比
+BENCHMARK_VERSION = 2
+# 基准测试固定按榜单开发 / toys&games / plates 的规则计算
+MASTER_KIND, SLAVER_KIND = 'toys&games', 'plates'
+
+# 各阶段（顺序即输出顺序）及其包含的计时记录：逐行子步骤来自 compute_row_result 的 step_clock
+STAGES = {
+    '合并': ('合并',),
+    '解码': ('价格趋势数据', '逐行处理/单行/解析数据'),
+    '流量周期': ('逐行处理/流量周期批量计算', '逐行处理/单行/流量周期计算'),
+    '价格趋势判断': ('逐行处理/单行/价格趋势判断',),
+    '绘图': ('绘图',),
+    '规则判断': ('逐行处理/单行/规则判断', '产品价值分析'),
+    '写出报告': ('写出报告',),
+}
+# data_processor 中逐行调用的绘图函数
+CHART_FUNCTIONS = ('plot_traffic_cycle_json_to_bytes', 'plot_sales_trend_to_bytes', 'plot_price_trend_to_bytes')
+
+
+class SampledChart:
+    """
+    绘图函数的替身：前 sample 次调用实际绘图并计时，之后按顺序返回已画好的图（不调用 matplotlib），
+    整表的绘图耗时按实际绘图的平均耗时推算
+    """
+
+    def __init__(self, plot: Callable, sample: int):
+        self._plot = plot
+        self._sample = sample
+        self._images: List[bytes] = []
+        self.rendered = 0
+        self.calls = 0
+        self.seconds = 0.0
+
+    def __call__(self, *args, **kwargs) -> Optional[BytesIO]:
+        self.calls += 1
+        if self.rendered < self._sample:
+            t0 = time.perf_counter()
+            image = self._plot(*args, **kwargs)
+            self.seconds += time.perf_counter() - t0
+            self.rendered += 1
+            if image is not None:
+                self._images.append(image.getvalue())
+            return image
+        if not self._images:
+            return None
+        return BytesIO(self._images[self.calls % len(self._images)])
+
+    def estimated_seconds(self) -> float:
+        return self.seconds / self.rendered * self.calls if self.rendered else 0.0
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(n_asins: int, seed: int, render_sample: int, report_backend: str, work_dir: str) -> Dict:
+    """
+    按 main.py 的榜单开发流程跑一个规模：加载数据 → process_rows（逐行 compute_row_result）
+    → analyze_product_value_bs → 写出报告，各阶段的耗时取自 pipeline_timing 的计时记录
+
+    每个绘图函数只实际绘制前 render_sample 次，之后返回已画好的图，绘图耗时按比例推算；
+    逐行子步骤中的绘图段（流量周期图 / 销量趋势图 / 价格趋势图）不计入其他阶段。
+    主题提取需要调用模型，不在测试范围内。
+
+    返回
+    ------
+    dict
+        {"asins": 行数, "stages": {阶段: 秒}, "per_asin_us": {阶段: 每个 ASIN 的微秒数}, "rendered_rows": 实际绘图次数}
+    """
+    paths = generate_inputs(n_asins, seed=seed)
+
+    timer = StageTimer()
+    set_stage_timer(timer)
+    set_keyword_flow_memo(KeywordFlowMemo())
+    set_chart_cache(None)
+    os.environ['DEVELOPMENT_KIND'] = '榜单开发'
+    charts = {name: SampledChart(getattr(data_processor, name), render_sample) for name in CHART_FUNCTIONS}
+    try:
+        with stage('合并'):
+            df = load_and_merge_data(paths['best_sellers'], paths['crawl_bsr'])
+            df = add_title_features(df)
+
+        with stage('价格趋势数据'):
+            price_trend_data = load_price_trend_store(paths['price_trend'], asins=df['asin'], use_cache=False)
+
+        images = ({}, {}, {})
+        with ExitStack() as patches:
+            for name, chart in charts.items():
+                patches.enter_context(mock.patch.object(data_processor, name, chart))
+            process_rows(df, price_trend_data, *images, workers=1, chart_dpi=DEFAULT_CHART_DPI,
+                         masterKind=MASTER_KIND, slaverKind=SLAVER_KIND)
+        timer.record('绘图', sum(chart.estimated_seconds() for chart in charts.values()))
+
+        df['商品链接'] = 'https://www.amazon.com/dp/' + df['asin'].astype(str)
+        with stage('产品价值分析'):
+            df = analyze_product_value_bs(data=df, masterKind=MASTER_KIND, slaverKind=SLAVER_KIND)
+        df = df[prepare_dataframe_columns(df)]
+
+        with stage('写出报告'):
+            REPORT_BACKENDS[report_backend](
+                df=df,
+                output_path=os.path.join(work_dir, f'benchmark_{n_asins}.xlsx'),
+                traffic_cycle_images=images[0],
+                sales_trend_images=images[1],
+                price_trend_images=images[2],
+                product_images={},
+            )
+    finally:
+        set_stage_timer(None)
+        set_keyword_flow_memo(None)
+
+    stages = {
+        name: float(sum(sum(timer.records.get(record, [])) for record in records))
+        for name, records in STAGES.items()
+    }
+    return {
+        'asins': int(len(df)),
+        'rendered_rows': max(chart.rendered for chart in charts.values()),
+        'stages': stages,
+        'per_asin_us': {name: seconds * 1e6 / len(df) for name, seconds in stages.items()},
+    }
+
+
+def _previous_record(history_path: str, n_asins: int, settings: Dict) -> Optional[Dict]:
+    """上一次同规模、同设置（版本 / 随机种子 / 绘图张数 / 报告后端）的结果"""
+    if not os.path.exists(history_path):
+        return None
+    previous = None
+    with open(history_path, encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if any(record.get(key) != value for key, value in settings.items()):
+                continue
+            result = record.get('results', {}).get(str(n_asins))
+            if result is not None:
+                previous = {**result, 'commit': record.get('commit'), 'time': record.get('time')}
+    return previous
+
+
+def print_result(result: Dict, previous: Optional[Dict]):
+    print(f'\n{result["asins"]} 个 ASIN（每种趋势图实测 {result["rendered_rows"]} 张，绘图耗时按比例推算）')
+    if previous is not None:
+        print(f'对比上一次：{previous["time"]}（{previous["commit"]}）')
+    print(pad_display('阶段', 14) + pad_display('耗时', 10, right=True) + pad_display('每个ASIN', 12, right=True) + pad_display('变化', 10, right=True))
+    for name, seconds in result['stages'].items():
+        per_asin = result['per_asin_us'][name]
+        change = ''
+        if previous is not None and previous['stages'].get(name):
+            change = f'{seconds / previous["stages"][name] - 1:+.1%}'
+        print(f'{pad_display(name, 14)}{seconds:>9.3f}s{per_asin:>10.1f}µs{change:>10}')
+    print(f'{pad_display("合计", 14)}{sum(result["stages"].values()):>9.3f}s')
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='用合成的榜单 / 爬虫 / 价格趋势数据测量各阶段耗时')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help=f'ASIN 数（默认 {" ".join(map(str, DEFAULT_SIZES))}；10000、100000 需要较长时间）')
+    parser.add_argument('--seed', type=int, default=0, help='合成数据的随机种子')
+    parser.add_argument('--render-sample', type=int, default=50,
+                        help='每种趋势图实际绘制的张数，整表的绘图耗时按比例推算（默认 50）')
+    parser.add_argument('--report-backend', choices=list(REPORT_BACKENDS), default='xlsxwriter',
+                        help='写出报告的方式（默认 xlsxwriter）')
+    parser.add_argument('--no-save', action='store_true', help=f'不把结果追加到 {HISTORY_PATH}')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    # 逐行消息和阶段内部的打印不计入输出，只保留出错消息
+    set_pipeline_log(PipelineLog(level=logging.ERROR, progress=False))
+    # 没有中文字体的环境下每张图都会警告缺字形，不影响耗时
+    warnings.filterwarnings('ignore', message='Glyph .* missing from font')
+    work_dir = os.path.join(BENCHMARK_DATA_DIR, 'reports')
+    os.makedirs(work_dir, exist_ok=True)
+
+    settings = {'version': BENCHMARK_VERSION, 'seed': args.seed, 'render_sample': args.render_sample, 'report_backend': args.report_backend}
+    record = {
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        **settings,
+        'results': {},
+    }
+    for n_asins in args.sizes:
+        print(f'正在生成 / 读取 {n_asins} 个 ASIN 的合成数据并计时...', file=sys.stderr)
+        with redirect_stdout(StringIO()):
+            result = run_size(n_asins, args.seed, args.render_sample, args.report_backend, work_dir)
+        print_result(result, _previous_record(HISTORY_PATH, n_asins, settings))
+        record['results'][str(n_asins)] = result
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(HISTORY_PATH), exist_ok=True)
+        with open(HISTORY_PATH, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        print(f'\n结果已追加到 {HISTORY_PATH}')
@@ -0,0 +1,418 @@
+"""
+报告拆分的一致性检查 + 峰值内存对比：流式实现（split_excel_by_description_with_images）
+与原 openpyxl 实现分别拆分同一份合成报告，逐 sheet 对比内容，并记录耗时和峰值 RSS
+
+    python -m benchmarks.split_parity [行数 ...]
+
+每种实现在单独的子进程中运行（峰值 RSS 互不影响）。
+"""
+import json
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+import zlib
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook, Workbook
+from openpyxl.drawing.image import Image as XLImage
+from openpyxl.styles import Alignment, Font, PatternFill, Border, Side
+from openpyxl.utils import get_column_letter
+from PIL import Image
+
+from excel_handler import build_report_xlsxwriter
+from pipeline_log import FAILED, row_event
+from split_excel_by_description_with_images import (
+    excel_colwidth_to_pixels, excel_rowheight_to_pixels, extract_main_category, sheet_images, sheet_parts,
+    split_excel_by_description_with_images,
+)
+
+
+def split_excel_openpyxl(
+    input_path: str,
+    output_path: str,
+    desc_col_name: str = "开发结论"
+):
+    """原实现：openpyxl 读入整份报告，每张图片在每个目标 sheet 中各复制一份（流式实现的参照）"""
+    wb = load_workbook(input_path)
+    src_ws = wb.worksheets[0]
+
+    headers = [cell.value for cell in src_ws[1]]
+    if desc_col_name not in headers:
+        raise ValueError(f"未找到列：{desc_col_name}")
+
+    desc_col_idx = headers.index(desc_col_name) + 1
+    
+    # 找到"开发结论说明"列的索引（如果存在）
+    conclusion_desc_col_idx = None
+    conclusion_desc_col_name = "开发结论说明"
+    if conclusion_desc_col_name in headers:
+        conclusion_desc_col_idx = headers.index(conclusion_desc_col_name) + 1
+    
+    # 找到"图片"列的索引（如果存在）
+    img_col_idx = None
+    if "图片" in headers:
+        img_col_idx = headers.index("图片") + 1
+    
+    # 需要设置文本换行的列
+    wrap_text_columns = ["商品链接", "产品标题", "主题", "核心词周期", "原因", "商品潜力说明"]
+    wrap_text_col_indices = {}
+    for col_name in wrap_text_columns:
+        if col_name in headers:
+            wrap_text_col_indices[headers.index(col_name) + 1] = col_name
+    
+    # 创建文本换行的对齐方式
+    wrap_alignment = Alignment(wrap_text=True, vertical='top')
+
+    # 记录列宽
+    src_col_widths = {
+        idx: src_ws.column_dimensions[get_column_letter(idx)].width
+        for idx in range(1, len(headers) + 1)
+    }
+
+    # 记录行高
+    src_row_heights = {
+        row: src_ws.row_dimensions[row].height
+        for row in range(1, src_ws.max_row + 1)
+    }
+
+    # 行 → 图片（预先读取所有图片数据到内存）
+    row_images = {}
+    for img in src_ws._images:
+        row = img.anchor._from.row + 1
+        try:
+            # 立即读取图片数据到内存，避免文件流关闭的问题
+            img_data = img._data()
+            # 确保数据被完全读取到内存（转换为bytes）
+            if hasattr(img_data, 'read'):
+                # 如果是文件流，读取所有数据
+                img_bytes = img_data.read()
+                img_data.close()  # 关闭原始流
+            else:
+                # 如果已经是bytes，直接使用
+                img_bytes = img_data
+            # 将字节数据存储为元组：(图片字节数据, 列索引, 宽度, 高度)
+            col_idx = img.anchor._from.col + 1
+            row_images.setdefault(row, []).append((img_bytes, col_idx, img.width, img.height))
+        except Exception as e:
+            row_event('拆分报告图片', FAILED, '读取出错', row, f"读取图片数据失败（行 {row}）: {e}")
+
+    # 三层分组：
+    # 第一层：按照主要类别分组（用于创建sheet）
+    # 第二层：按照开发结论值分组
+    # 第三层：按照开发结论说明值分组 - {主类别: {开发结论: {开发结论说明: [行索引列表]}}}
+    category_groups = {}
+    for row_idx in range(2, src_ws.max_row + 1):
+        conclusion_value = src_ws.cell(row=row_idx, column=desc_col_idx).value
+        conclusion_str = str(conclusion_value).strip() if conclusion_value else "未分类"
+        
+        # 获取开发结论说明值
+        if conclusion_desc_col_idx:
+            conclusion_desc_value = src_ws.cell(row=row_idx, column=conclusion_desc_col_idx).value
+            conclusion_desc_str = str(conclusion_desc_value).strip() if conclusion_desc_value else "未分类说明"
+        else:
+            conclusion_desc_str = "未分类说明"
+        
+        main_category = extract_main_category(conclusion_str)
+        
+        if main_category not in category_groups:
+            category_groups[main_category] = {}
+        
+        if conclusion_str not in category_groups[main_category]:
+            category_groups[main_category][conclusion_str] = {}
+        
+        if conclusion_desc_str not in category_groups[main_category][conclusion_str]:
+            category_groups[main_category][conclusion_str][conclusion_desc_str] = []
+        
+        category_groups[main_category][conclusion_str][conclusion_desc_str].append(row_idx)
+
+    new_wb = Workbook()
+    ws_original = new_wb.active
+    ws_original.title = "源数据"
+    
+    # 定义sheet创建顺序（主要类别）
+    sheet_order = ["源数据", "开发", "追踪", "待定", "不开发"]
+
+    # 复制函数，用于复制一行数据到目标工作表
+    def copy_row_to_sheet(src_ws, target_ws, old_row, new_row_idx, headers, wrap_text_col_indices, wrap_alignment, src_row_heights, row_images, src_col_widths, img_col_idx):
+        # 写单元格
+        for col_idx in range(1, len(headers) + 1):
+            cell = target_ws.cell(
+                row=new_row_idx,
+                column=col_idx,
+                value=src_ws.cell(row=old_row, column=col_idx).value
+            )
+            # 如果是需要换行的列，设置对齐方式为换行
+            if col_idx in wrap_text_col_indices:
+                cell.alignment = wrap_alignment
+
+        # 复制行高
+        if src_row_heights.get(old_row):
+            target_ws.row_dimensions[new_row_idx].height = src_row_heights[old_row]
+
+        # 复制图片（核心修复）
+        if old_row in row_images:
+            for img_data_tuple in row_images[old_row]:
+                try:
+                    img_bytes, col_idx, original_width, original_height = img_data_tuple
+                    # 从内存中的字节数据创建新的图片
+                    stream = BytesIO(img_bytes)
+                    new_img = XLImage(stream)
+
+                    col_letter = get_column_letter(col_idx)
+
+                    # 计算目标像素尺寸
+                    col_width = src_col_widths.get(col_idx)
+                    row_height = src_row_heights.get(old_row)
+
+                    max_w = excel_colwidth_to_pixels(col_width)
+                    max_h = excel_rowheight_to_pixels(row_height)
+                    
+                    # 如果当前图片是"图片"列中的内容，则高度只取一半
+                    if img_col_idx is not None and col_idx == img_col_idx:
+                        max_h = max_h // 2
+
+                    # 限制尺寸（关键）
+                    new_img.width = min(new_img.width, max_w)
+                    new_img.height = min(new_img.height, max_h)
+
+                    target_ws.add_image(new_img, f"{col_letter}{new_row_idx}")
+
+                except Exception as e:
+                    row_event('拆分报告图片', FAILED, '复制出错', old_row, f"图片复制失败（行 {old_row}）: {e}")
+
+    # 1. 第一个sheet：复制所有原始数据
+    # 写表头
+    for col_idx, header in enumerate(headers, 1):
+        ws_original.cell(row=1, column=col_idx, value=header)
+
+    # 复制列宽
+    for col_idx, width in src_col_widths.items():
+        if width:
+            ws_original.column_dimensions[get_column_letter(col_idx)].width = width
+
+    original_row_idx = 2
+    for old_row in range(2, src_ws.max_row + 1):
+        copy_row_to_sheet(
+            src_ws, ws_original, old_row, original_row_idx,
+            headers, wrap_text_col_indices, wrap_alignment,
+            src_row_heights, row_images, src_col_widths, img_col_idx
+        )
+        original_row_idx += 1
+
+    # 定义说明内容的样式
+    section_title_font = Font(name='Microsoft YaHei', size=11, bold=True, color='FFFFFF')
+    section_title_fill = PatternFill(start_color='70AD47', end_color='70AD47', fill_type='solid')
+    header_font = Font(name='Microsoft YaHei', size=10, bold=True)
+    border_style = Border(
+        left=Side(style='thin', color='000000'),
+        right=Side(style='thin', color='000000'),
+        top=Side(style='thin', color='000000'),
+        bottom=Side(style='thin', color='000000')
+    )
+    
+    # 2. 其他sheet：按照主要类别创建，每个sheet内按开发结论说明值分组显示
+    for main_category in sheet_order[1:]:  # 跳过"源数据"
+        if main_category not in category_groups:
+            continue  # 如果该主要类别没有数据，跳过
+        
+        # 获取该主要类别下的所有开发结论和数据
+        conclusions = category_groups[main_category]
+        if not conclusions:
+            continue
+        
+        ws_new = new_wb.create_sheet(main_category[:31])
+        
+        # 复制列宽
+        for col_idx, width in src_col_widths.items():
+            if width:
+                ws_new.column_dimensions[get_column_letter(col_idx)].width = width
+        
+        current_row = 1
+        
+        # 收集所有开发结论说明值，用于按说明分组
+        # 因为同一个说明可能出现在不同的开发结论下，我们需要按说明分组
+        all_conclusion_descriptions = {}
+        for conclusion_str, conclusion_descriptions in conclusions.items():
+            for desc_str, rows in conclusion_descriptions.items():
+                if desc_str not in all_conclusion_descriptions:
+                    all_conclusion_descriptions[desc_str] = []
+                all_conclusion_descriptions[desc_str].extend(rows)
+        
+        # 按照开发结论说明顺序处理每个部分
+        sorted_descriptions = sorted(all_conclusion_descriptions.keys())
+        
+        for desc_idx, conclusion_desc_str in enumerate(sorted_descriptions):
+            rows = all_conclusion_descriptions[conclusion_desc_str]
+            if not rows:
+                continue
+            
+            # 1. 添加开发结论说明行（显示开发结论说明的值）
+            section_title_cell = ws_new.cell(row=current_row, column=1, value=conclusion_desc_str)
+            section_title_cell.font = section_title_font
+            section_title_cell.fill = section_title_fill
+            section_title_cell.alignment = Alignment(horizontal='left', vertical='center')
+            section_title_cell.border = border_style
+            
+            # 合并单元格，让说明跨越多列
+            max_col = min(len(headers), 10)
+            ws_new.merge_cells(start_row=current_row, start_column=1, 
+                              end_row=current_row, end_column=max_col)
+            ws_new.row_dimensions[current_row].height = 22
+            current_row += 1
+            
+            # 2. 写表头行
+            for col_idx, header in enumerate(headers, 1):
+                header_cell = ws_new.cell(row=current_row, column=col_idx, value=header)
+                header_cell.font = header_font
+                header_cell.border = border_style
+            ws_new.row_dimensions[current_row].height = 20
+            current_row += 1
+            
+            # 3. 复制数据行
+            for old_row in rows:
+                copy_row_to_sheet(
+                    src_ws, ws_new, old_row, current_row,
+                    headers, wrap_text_col_indices, wrap_alignment,
+                    src_row_heights, row_images, src_col_widths, img_col_idx
+                )
+                current_row += 1
+            
+            # 4. 在部分之间添加空行（最后一个部分不添加）
+            if desc_idx < len(sorted_descriptions) - 1:
+                current_row += 2  # 空出2行作为分隔
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    new_wb.save(output_path)
+
+    print(f"✅ 已完成拆分并保持图片大小：{output_path}")
+
+
+SPLITTERS = {"openpyxl": split_excel_openpyxl, "流式": split_excel_by_description_with_images}
+
+
+def rss_kb(field: str) -> int:
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    return 0
+
+
+def png(size, rng, dpi: int) -> bytes:
+    """带一条随机噪点的 PNG（压缩后的大小与真实趋势图相近）"""
+    pixels = np.full((size[1], size[0], 3), rng.integers(0, 255, 3), dtype=np.uint8)
+    pixels[:20] = rng.integers(0, 255, (20, size[0], 3))
+    bio = BytesIO()
+    Image.fromarray(pixels).save(bio, format="PNG", dpi=(dpi, dpi))
+    return bio.getvalue()
+
+
+def unique_png(data: bytes, text: str) -> bytes:
+    """在 IEND 之前插入一个 tEXt 块，使循环使用的图片内容各不相同"""
+    payload = b"Comment\x00" + text.encode("utf-8")
+    chunk = struct.pack(">I", len(payload)) + b"tEXt" + payload + struct.pack(">I", zlib.crc32(b"tEXt" + payload))
+    return data[:-12] + chunk + data[-12:]
+
+
+def synthetic_report(path: str, n_rows: int):
+    rng = np.random.default_rng(0)
+    conclusions = ["开发", "追踪-销量不足", "待定", "不开发-价格下降", None]
+    reasons = ["价格在区间内", "销量不足", "周期不匹配", None]
+    df = pd.DataFrame({
+        "商品链接": [f"https://www.amazon.com/dp/B{i:09d}" for i in range(n_rows)],
+        "图片链接": [f"https://example.com/{i}.jpg" for i in range(n_rows)],
+        "asin": [f"B{i:09d}" for i in range(n_rows)],
+        "产品标题": ["Dinosaur Party Plates and Napkins Serves 16, Birthday Decorations " * 2] * n_rows,
+        "上架时间": pd.Timestamp("2024-05-01") + pd.to_timedelta(np.arange(n_rows), unit="D"),
+        "核心词周期图": None,
+        "核心词周期": [f"强周期型：{i % 12 + 1}月-{(i + 3) % 12 + 1}月" for i in range(n_rows)],
+        "销量趋势图": None,
+        "上月销量": [float(i % 500) if i % 9 else np.nan for i in range(n_rows)],
+        "价格趋势图": None,
+        "价格": rng.uniform(5, 30, n_rows).round(2),
+        "开发结论": [conclusions[i % len(conclusions)] for i in range(n_rows)],
+        "开发结论说明": [reasons[i % len(reasons)] for i in range(n_rows)],
+    })
+    charts = {}
+    for name, size, dpi in (("核心词周期图", (1120, 320), 80), ("销量趋势图", (1120, 320), 80),
+                            ("价格趋势图", (600, 240), 80), ("图片", (300, 300), 72)):
+        pool = [png(size, rng, dpi) for _ in range(8)]
+        skip = 13 if name == "图片" else 11
+        charts[name] = {i: unique_png(pool[i % len(pool)], f"{name}{i}") for i in range(n_rows) if i % skip}
+    build_report_xlsxwriter(df, path, charts["核心词周期图"], charts["销量趋势图"], charts["价格趋势图"],
+                            product_images=charts["图片"])
+
+
+def read_back(path: str):
+    """每个 sheet 的单元格值、合并区域、行高、列宽、换行单元格、图片位置和显示尺寸"""
+    wb = load_workbook(path)
+    with zipfile.ZipFile(path) as zf:
+        pictures = {name: sorted((row, col, cx, cy) for row, col, _, cx, cy in sheet_images(zf, part))
+                    for name, part in sheet_parts(zf)}
+    return {
+        ws.title: (
+            [[cell.value for cell in row] for row in ws.iter_rows()],
+            sorted(str(rng) for rng in ws.merged_cells.ranges),
+            {r: d.height for r, d in ws.row_dimensions.items() if d.height},
+            {k: round(d.width, 4) for k, d in ws.column_dimensions.items() if d.width},
+            sorted(cell.coordinate for row in ws.iter_rows() for cell in row if cell.alignment.wrap_text),
+            pictures[ws.title],
+        )
+        for ws in wb.worksheets
+    }
+
+
+def run_splitter(name: str, input_path: str, output_path: str):
+    """子进程中运行一种实现，输出耗时和峰值 RSS（JSON）"""
+    base_kb = rss_kb("VmRSS")
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+    t0 = time.perf_counter()
+    SPLITTERS[name](input_path, output_path, desc_col_name="开发结论")
+    elapsed = time.perf_counter() - t0
+    peak_kb = rss_kb("VmHWM")
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_kb / 1024, "delta_mb": (peak_kb - base_kb) / 1024}))
+
+
+def check(sizes):
+    """每个规模各生成一份合成报告，两种实现分别拆分；第一个规模对比输出内容"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in sizes:
+            report_path = os.path.join(tmp_dir, f"report_{n_rows}.xlsx")
+            synthetic_report(report_path, n_rows)
+            stats, contents = {}, {}
+            for name in SPLITTERS:
+                out_path = os.path.join(tmp_dir, f"split_{name}_{n_rows}.xlsx")
+                proc = subprocess.run([sys.executable, "-m", "benchmarks.split_parity", "run", name, report_path,
+                                       out_path], capture_output=True, text=True, check=True)
+                stats[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+                stats[name]["file_mb"] = os.path.getsize(out_path) / 2 ** 20
+                if n_rows == sizes[0]:
+                    contents[name] = read_back(out_path)
+            if contents:
+                expected, actual = contents["openpyxl"], contents["流式"]
+                assert list(expected) == list(actual), "sheet 不一致"
+                fields = ("单元格值", "合并区域", "行高", "列宽", "换行单元格", "图片位置和尺寸")
+                for sheet in expected:
+                    for field, a, b in zip(fields, expected[sheet], actual[sheet]):
+                        assert a == b, f"{sheet} {field}不一致"
+                print(f"内容一致：{n_rows} 行，sheet {list(actual)}，"
+                      f"图片 {sum(len(sheet[5]) for sheet in actual.values())} 处")
+            print(f"{n_rows} 行（报告 {os.path.getsize(report_path) / 2 ** 20:.1f} MB）：")
+            for name, stat in stats.items():
+                print(f"  {name:>8}: 耗时 {stat['seconds']:.2f}s，峰值 RSS {stat['peak_mb']:.0f} MB"
+                      f"（拆分增加 {stat['delta_mb']:.0f} MB），文件 {stat['file_mb']:.1f} MB")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == "run":
+        # 子进程：python -m benchmarks.split_parity run 实现 输入 输出
+        run_splitter(*sys.argv[2:5])
+    else:
+        check([int(n) for n in sys.argv[1:]] or [200, 1000])
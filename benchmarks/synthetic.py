@@ -0,0 +1,172 @@
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# 生成的输入文件目录（按 ASIN 数和随机种子分目录，已生成的直接复用）
+BENCHMARK_DATA_DIR = 'benchmarks/data'
+# 核心词搜索量从 2017-01 开始（与卖家精灵导出一致）
+SEARCH_TREND_START = '2017-01'
+# 生成逻辑变化时加 1，已生成的文件不再复用
+GENERATOR_VERSION = 2
+
+_THEMES = ['Dinosaur', 'Unicorn', 'Football', 'Rainbow', 'Pastel', 'Construction', 'Outer Space', 'Mermaid',
+           'Christmas', 'Halloween', 'Neon', 'Ice Cream', 'Puppy', 'Polka Dots', 'Blue and Gold', 'Farm Animals']
+_PRODUCTS = ['Plates and Napkins', 'Party Supplies Kit', 'Paper Plates', 'Birthday Banner', 'Table Centerpieces',
+             'Cupcake Stand', 'Dessert Plates', 'Tableware Set']
+_PCS = [None, 16, 24, 40, 48, 60, 72, 96, 120, 144]
+_SIZES = ['', '9 inch', '7 inch', '9" and 7"']
+_KEYWORD_WORDS = ['party', 'birthday', 'plates', 'supplies', 'decorations', 'napkins', 'kids', 'baby shower',
+                  'tableware', 'banner', 'balloons', 'theme', 'boy', 'girl', 'favors']
+
+
+def _months(start: str, end: str):
+    return pd.period_range(start, end, freq='M').strftime('%Y-%m').tolist()
+
+
+class _KeywordPool:
+    """
+    核心词池：同一类目下的 ASIN 共用一部分核心词（与真实数据一致，流量周期的关键词缓存依赖这一点）。
+    每个核心词有自己的季节性（峰值月份、幅度）、起始月份和噪声。
+    """
+
+    def __init__(self, rng: np.random.Generator, size: int, months: list):
+        self.months = months
+        n_months = len(months)
+        month_of_year = np.array([int(m[5:]) for m in months])
+        self.keywords = []
+        for k in range(size):
+            words = rng.choice(_KEYWORD_WORDS, size=rng.integers(2, 4), replace=False)
+            base = float(rng.lognormal(8.5, 1.2))
+            peak = int(rng.integers(1, 13))
+            amplitude = float(rng.choice([0.0, 0.3, 0.8, 2.0], p=[0.25, 0.3, 0.3, 0.15]))
+            distance = np.minimum(np.abs(month_of_year - peak), 12 - np.abs(month_of_year - peak))
+            seasonal = 1 + amplitude * np.exp(-(distance ** 2) / 2.0)
+            growth = np.linspace(1 - rng.uniform(0, 0.5), 1 + rng.uniform(0, 0.8), n_months)
+            searches = base * seasonal * growth * rng.lognormal(0, 0.15, n_months)
+            # 一部分核心词是近几年才出现的，之前的月份搜索量为 0
+            started = int(rng.integers(0, n_months // 2)) if rng.random() < 0.4 else 0
+            searches[:started] = 0
+            searches[rng.random(n_months) < 0.02] = 0
+            self.keywords.append({
+                'keywordCn': f'核心词{k}',
+                'searches': searches.round().astype(int).tolist(),
+                'months': months,
+                'keywordJp': f'キーワード{k}',
+                'keyword': f'{" ".join(words)} {k}',
+            })
+
+
+def _search_trend(rng: np.random.Generator, pool: _KeywordPool) -> str:
+    """核心词周期数据单元格（Python 字面量文本，与爬虫导出的格式相同）"""
+    roll = rng.random()
+    if roll < 0.02:
+        # 没有核心词数据的 ASIN（爬虫导出中不会是空单元格）
+        return repr({'code': 'OK', 'message': None, 'data': [], 'success': True})
+    picks = rng.choice(len(pool.keywords), size=int(rng.integers(3, 7)), replace=False)
+    text = repr({'code': 'OK', 'message': None, 'data': [pool.keywords[k] for k in picks], 'success': True})
+    if roll < 0.025:
+        # 数据太长被截断的单元格
+        return text[:len(text) // 2]
+    return text
+
+
+def _sell_trend(rng: np.random.Generator, listed: datetime, now: datetime) -> Optional[str]:
+    """销量数据单元格：从上架月份到本月，每月一条 {'dk': 'YYYYMM', 'sales': n}"""
+    if rng.random() < 0.03:
+        return None
+    months = pd.period_range(listed.strftime('%Y-%m'), now.strftime('%Y-%m'), freq='M')
+    level = rng.lognormal(3.5, 1.2)
+    sales = np.maximum(0, level * rng.lognormal(0, 0.4, len(months))).round().astype(int)
+    return repr([{'dk': month.strftime('%Y%m'), 'sales': int(s)} for month, s in zip(months, sales)])
+
+
+def _price_trend(rng: np.random.Generator, now: datetime) -> Dict:
+    """价格趋势：近几年不规则时间点上的价格（上升 / 下降 / 平稳 / 波动），少量缺失值"""
+    n_points = int(rng.integers(60, 800))
+    span_days = float(rng.uniform(200, 2000))
+    offsets = np.sort(rng.uniform(0, span_days, n_points))[::-1]
+    times = [(now - timedelta(days=float(d))).strftime('%Y-%m-%d %H:%M') for d in offsets]
+    base = rng.uniform(6, 35)
+    kind = rng.choice(['up', 'down', 'flat', 'volatile'])
+    drift = {'up': 0.3, 'down': -0.3, 'flat': 0.0, 'volatile': 0.0}[kind]
+    noise = 0.15 if kind == 'volatile' else 0.01
+    prices = base * (1 + drift * np.linspace(0, 1, n_points)) * rng.lognormal(0, noise, n_points)
+    price_trend = [round(float(p), 2) if rng.random() > 0.03 else None for p in prices]
+    return {'price_trend': price_trend, 'times': times}
+
+
+def generate_inputs(n_asins: int, seed: int = 0, data_dir: str = BENCHMARK_DATA_DIR,
+                    now: Optional[datetime] = None) -> Dict[str, str]:
+    """
+    生成 n_asins 个 ASIN 的榜单开发输入（与 input_file/rank 下的文件格式相同）
+
+    参数
+    ------
+    n_asins : int
+        ASIN 数
+    seed : int
+        随机种子，相同参数生成的文件内容相同
+    now : datetime
+        "当前"时间，销量和价格数据截止到该时间，默认为今天（上月销量、价格趋势窗口按当前日期计算）
+
+    返回
+    ------
+    dict
+        {"best_sellers": 路径, "crawl_bsr": 路径, "price_trend": 路径}
+    """
+    now = now or datetime.now()
+    date_str = now.strftime('%Y%m%d')
+    out_dir = os.path.join(data_dir, f'{n_asins}_{seed}_{date_str}_v{GENERATOR_VERSION}')
+    paths = {
+        'best_sellers': os.path.join(out_dir, f'best-sellers-{date_str}.xlsx'),
+        'crawl_bsr': os.path.join(out_dir, f'crawl-{date_str}-bsr.xlsx'),
+        'price_trend': os.path.join(out_dir, f'crawl-{date_str}-price-trend.json'),
+    }
+    if all(os.path.exists(path) for path in paths.values()):
+        return paths
+    os.makedirs(out_dir, exist_ok=True)
+
+    rng = np.random.default_rng(seed)
+    last_month = (pd.Period(now.strftime('%Y-%m'), freq='M') - 1).strftime('%Y-%m')
+    pool = _KeywordPool(rng, max(20, n_asins // 5), _months(SEARCH_TREND_START, last_month))
+
+    asins = [f'B0{i:08X}' for i in rng.permutation(16 ** 6)[:n_asins]]
+    titles = []
+    for _ in range(n_asins):
+        pcs = _PCS[rng.integers(len(_PCS))]
+        parts = [rng.choice(_THEMES), rng.choice(_PRODUCTS)]
+        if pcs is not None:
+            parts.append(f'{pcs}pcs' if rng.random() < 0.5 else f'{pcs} Pieces')
+        parts += [_SIZES[rng.integers(len(_SIZES))], 'for Birthday Party Decorations']
+        titles.append(' '.join(p for p in parts if p))
+    prices = rng.uniform(5, 40, n_asins).round(2)
+
+    best_sellers = pd.DataFrame({
+        '#': np.arange(1, n_asins + 1),
+        '产品标题': titles,
+        '图片': np.nan,
+        'asin': asins,
+        '图片链接': [f'https://images-na.ssl-images-amazon.com/images/I/{asin}.jpg' for asin in asins],
+        '价格': [f'${p:.2f}' for p in prices],
+    })
+
+    listed = [now - timedelta(days=int(d)) for d in rng.integers(60, 2500, n_asins)]
+    crawl = pd.DataFrame({
+        'asin': asins,
+        'search_trend': [_search_trend(rng, pool) for _ in range(n_asins)],
+        'year': [d.strftime('%Y-%m-%d') for d in listed],
+        'sell_trend': [_sell_trend(rng, d, now) for d in listed],
+        'price': prices,
+    }).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+    # xlsxwriter 写大表比 openpyxl 快得多；字符串原样写入，不转换成超链接
+    excel_options = {'engine': 'xlsxwriter', 'engine_kwargs': {'options': {'strings_to_urls': False}}}
+    best_sellers.to_excel(paths['best_sellers'], index=False, **excel_options)
+    crawl.to_excel(paths['crawl_bsr'], index=False, **excel_options)
+    with open(paths['price_trend'], 'w', encoding='utf-8') as f:
+        json.dump({asin: _price_trend(rng, now) for asin in asins}, f, ensure_ascii=False)
+    return paths
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+# 趋势图 PNG 的磁盘缓存目录
+CHART_CACHE_DIR = 'cache/charts'
+# 绘图逻辑或图表样式变化时加 1，旧图自动失效
+CHART_CACHE_VERSION = 1
+# 内存 / 磁盘缓存的容量上限（字节），超过后淘汰最久未使用的图
+CHART_CACHE_MEMORY_BYTES = 64 << 20
+CHART_CACHE_DISK_BYTES = 512 << 20
+
+
+# =========================================================
+# 内容哈希
+# =========================================================
+def update_hash(h, value):
+    """把一个值写入哈希（带类型和长度前缀，避免不同值拼接后相同）"""
+    if isinstance(value, np.ndarray):
+        data = value.dtype.str.encode('ascii') + np.ascontiguousarray(value).tobytes()
+        tag = b'a'
+    elif isinstance(value, str):
+        data, tag = value.encode('utf-8', 'surrogatepass'), b's'
+    else:
+        data, tag = json.dumps(value, sort_keys=True, ensure_ascii=False, default=repr).encode('utf-8'), b'j'
+    h.update(tag + len(data).to_bytes(8, 'little') + data)
+
+
+def content_key(*parts) -> str:
+    """多个值的内容哈希（sha1 十六进制）"""
+    h = hashlib.sha1()
+    for part in parts:
+        update_hash(h, part)
+    return h.hexdigest()
+
+
+# =========================================================
+# 图表缓存
+# =========================================================
+class ChartCache:
+    """
+    按内容哈希保存的 PNG 缓存：内存中是按字节数限制的 LRU，磁盘上每张图一个文件
+
+    磁盘缓存超过上限时按修改时间淘汰最旧的文件（命中时更新修改时间）。
+    多个进程可以共用同一个磁盘目录（写入时先写临时文件再改名）。
+
+    参数
+    ------
+    cache_dir : str
+        磁盘缓存目录，None 表示只使用内存缓存
+    memory_bytes / disk_bytes : int
+        内存 / 磁盘缓存的容量上限
+    """
+
+    def __init__(self, cache_dir: Optional[str] = CHART_CACHE_DIR,
+                 memory_bytes: int = CHART_CACHE_MEMORY_BYTES, disk_bytes: int = CHART_CACHE_DISK_BYTES):
+        self.cache_dir = cache_dir
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._memory_size = 0
+        self._disk_size: Optional[int] = None  # 第一次写入时统计
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f'{key}.png')
+
+    def get(self, key: str) -> Optional[bytes]:
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return data
+        if self.cache_dir is not None:
+            path = self._path(key)
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                os.utime(path)
+            except OSError:
+                data = None
+            if data is not None:
+                self._remember(key, data)
+                self.hits += 1
+                return data
+        self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes):
+        self._remember(key, data)
+        if self.cache_dir is not None:
+            try:
+                self._write(key, data)
+            except OSError as e:
+                print(f'写入图表缓存失败: {e}')
+
+    def _remember(self, key: str, data: bytes):
+        if len(data) > self.memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_size -= len(old)
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def _disk_files(self):
+        for sub in os.scandir(self.cache_dir):
+            if sub.is_dir():
+                for entry in os.scandir(sub.path):
+                    if entry.name.endswith('.png'):
+                        yield entry
+
+    def _write(self, key: str, data: bytes):
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if self._disk_size is None:
+            self._disk_size = sum(entry.stat().st_size for entry in self._disk_files())
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._disk_size += len(data)
+        if self._disk_size > self.disk_bytes:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """删除最久未使用的文件，直到占用降到上限的 90%"""
+        entries = sorted(self._disk_files(), key=lambda entry: entry.stat().st_mtime_ns)
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if total <= self.disk_bytes * 0.9:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                total -= size
+            except OSError:
+                continue
+        self._disk_size = total
+
+
+if __name__ == '__main__':
+    # 与不使用缓存时的 PNG 一致性检查 + 耗时对比（使用 input_file/kinds 下的销量 / 核心词周期数据，缓存写到临时目录）
+    import contextlib
+    import glob
+    import io
+    import tempfile
+    import time
+
+    import pandas as pd
+
+    import plot_search_trend as plots
+    from trend_decoder import decode_payload
+
+    jobs = []
+    for path in sorted(glob.glob('input_file/kinds/*/asin详细数据-*.xlsx')):
+        df = pd.read_excel(path)
+        jobs += [(plots.plot_traffic_cycle_json_to_bytes, decode_payload(v)) for v in df['核心词周期数据'].dropna()]
+        jobs += [(plots.plot_sales_trend_to_bytes, decode_payload(v)) for v in df['销量数据'].dropna()]
+
+    def render_all():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return [None if image is None else image.getvalue() for image in (plot(data) for plot, data in jobs)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        timings = {}
+        for name, cache in (('不使用缓存', None), ('首次（写缓存）', ChartCache(tmp_dir)),
+                            ('内存命中', None), ('磁盘命中', ChartCache(tmp_dir))):
+            if name != '内存命中':
+                plots.set_chart_cache(cache)
+            t0 = time.perf_counter()
+            images = render_all()
+            timings[name] = time.perf_counter() - t0
+            if name == '不使用缓存':
+                expected = images
+            assert images == expected, name
+    print(f'一致性检查通过：{len(jobs)} 张图；' + '，'.join(f'{name} {t:.2f}s' for name, t in timings.items()))
@@ -1,21 +1,29 @@
-import ast
+import asyncio
+import hashlib
 import json
 import os
-from typing import Dict, Optional
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, List, Tuple
+import numpy as np
 import pandas as pd
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 
 from can_develop_today import can_develop
 from detect_low_flow_months import detect_low_flow_months
-from determining_traffic_cycle import determine_traffic_cycle
+from determining_traffic_cycle import determine_traffic_cycle, determine_traffic_cycles_batch, get_keyword_flow_memo
 from extract_keyword_series import extract_keyword_series
 from format_traffic_cycle_text import format_traffic_cycle_text
 from get_last_month_saler import get_last_month_saler
 from kinds_dev import classify_season_from_traffic_cycle
 from pass_rule import pass_rule
 from plot_search_trend import plot_traffic_cycle_json_to_bytes, plot_sales_trend_to_bytes, plot_price_trend_to_bytes
-from price_trend_detector import clean_price_and_time, classify_price_trend
+from price_trend_detector import classify_price_trend
+from pipeline_log import OK, SKIPPED, FAILED, count, debug, error, info, row_event, warning
+from pipeline_timing import step_clock
+from price_series import PriceTimeSeries
+from title_features import TITLE_FEATURE_COLUMNS
+from trend_decoder import decode_payload, TruncatedPayloadError
 
 
 def load_and_merge_data(file_path1: str, file_path2: str) -> pd.DataFrame:
@@ -41,8 +49,125 @@ def load_and_merge_data(file_path1: str, file_path2: str) -> pd.DataFrame:
     return df
 
 
-def extract_themes_from_titles(titles: list, llm: ChatOpenAI) -> list:
-    """从标题中提取主题（使用LLM）"""
+# 标题 -> 主题 的持久化缓存文件
+THEME_CACHE_PATH = 'cache/title_themes.json'
+
+
+def _normalize_title_key(title: str) -> str:
+    """标题归一化（小写、合并空白）后取哈希，作为主题缓存的 key"""
+    normalized = ' '.join(str(title).lower().split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def _load_theme_cache(cache_path: Optional[str]) -> Dict[str, str]:
+    if not cache_path or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        warning(f'主题缓存读取失败，将重新提取: {e}')
+        return {}
+
+
+def _save_theme_cache(cache_path: Optional[str], cache: Dict[str, str]):
+    if not cache_path:
+        return
+    cache_dir = os.path.dirname(cache_path)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f'{cache_path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_path, cache_path)
+
+
+def _parse_theme_response(content, expected: int) -> Optional[List[str]]:
+    """解析模型返回的主题数组，数量不一致或无法解析时返回 None"""
+    try:
+        result = json.loads(content)
+    except (TypeError, json.JSONDecodeError):
+        return None
+    if not isinstance(result, list) or len(result) != expected:
+        return None
+    return [str(theme) for theme in result]
+
+
+def _run_theme_batches(
+    prompt: ChatPromptTemplate,
+    llm,
+    batches: List[List[str]],
+    max_concurrency: int
+) -> List[List[str]]:
+    """
+    并发请求所有批次，返回与 batches 一一对应的主题列表
+
+    某个批次失败（请求异常、返回被截断或数量不一致）时拆成两半重试，
+    拆到单个标题仍失败则该标题主题为空字符串。
+    """
+    # 待请求的片段：(批次序号, 批次内起始位置, 标题列表)
+    pending = [(i, 0, batch) for i, batch in enumerate(batches)]
+    partial: Dict[int, List[str]] = {i: [''] * len(batch) for i, batch in enumerate(batches)}
+
+    while pending:
+        inputs = [
+            prompt.format_messages(titles=json.dumps(chunk, ensure_ascii=False))
+            for _, _, chunk in pending
+        ]
+        responses = asyncio.run(
+            llm.abatch(inputs, config={'max_concurrency': max_concurrency}, return_exceptions=True)
+        )
+
+        next_pending = []
+        for (batch_no, offset, chunk), resp in zip(pending, responses):
+            themes = None
+            if not isinstance(resp, Exception):
+                themes = _parse_theme_response(resp.content, len(chunk))
+            if themes is not None:
+                partial[batch_no][offset:offset + len(chunk)] = themes
+            elif len(chunk) > 1:
+                mid = len(chunk) // 2
+                warning(f'主题提取批次失败（{len(chunk)}个标题），拆分重试: {resp if isinstance(resp, Exception) else "返回结果无法解析"}')
+                next_pending.append((batch_no, offset, chunk[:mid]))
+                next_pending.append((batch_no, offset + mid, chunk[mid:]))
+            else:
+                warning(f'主题提取失败，标题: {chunk[0]}')
+        pending = next_pending
+
+    return [partial[i] for i in range(len(batches))]
+
+
+def extract_themes_from_titles(
+    titles: list,
+    llm: ChatOpenAI,
+    batch_size: int = 50,
+    max_concurrency: int = 4,
+    cache_path: Optional[str] = THEME_CACHE_PATH
+) -> list:
+    """
+    从标题中提取主题（使用LLM）
+
+    标题按 batch_size 分批，通过 abatch 并发请求（最多 max_concurrency 个请求同时进行）。
+    已提取过的标题（按归一化标题的哈希）直接从缓存读取，只有未命中的标题才会请求模型。
+
+    参数
+    ------
+    titles : list
+        标题列表
+    llm :
+        聊天模型（ChatOpenAI 或 fake_llm.FakeThemeLLM）
+    batch_size : int
+        每次请求包含的标题数
+    max_concurrency : int
+        最大并发请求数
+    cache_path : str
+        主题缓存文件路径，None 表示不使用缓存
+
+    返回
+    ------
+    list
+        与 titles 顺序一一对应的主题列表（提取失败的标题为空字符串）
+    """
     prompt = ChatPromptTemplate.from_messages([
         (
             "system",
@@ -81,14 +206,39 @@ def extract_themes_from_titles(titles: list, llm: ChatOpenAI) -> list:
         ),
         (
             "human",
-            "请按上述规则，从以下竞品标题中提取主题（按顺序，一一对应）：\n{titles}"
+            "请按上述规则，从以下竞品标题（JSON 数组）中提取主题（按顺序，一一对应），以 JSON 数组返回：\n{titles}"
         )
     ])
 
-    messages = prompt.format_messages(titles=titles)
-    resp = llm.invoke(messages)
-    result = json.loads(resp.content)
-    print(result)
+    cache = _load_theme_cache(cache_path)
+    keys = [_normalize_title_key(title) for title in titles]
+
+    # 未命中缓存的标题（相同标题只请求一次）
+    missing: Dict[str, str] = {}
+    for key, title in zip(keys, titles):
+        if key not in cache and key not in missing:
+            missing[key] = str(title)
+    hit_count = sum(1 for key in keys if key in cache)
+    info(f'主题提取：共 {len(titles)} 个标题，缓存命中 {hit_count}，需请求 {len(missing)} 个')
+
+    if missing:
+        missing_keys = list(missing)
+        batch_size = max(1, batch_size)
+        batches = [
+            [missing[key] for key in missing_keys[i:i + batch_size]]
+            for i in range(0, len(missing_keys), batch_size)
+        ]
+        batch_results = _run_theme_batches(prompt, llm, batches, max_concurrency)
+
+        themes = [theme for batch in batch_results for theme in batch]
+        for key, theme in zip(missing_keys, themes):
+            # 提取失败的标题（空字符串）不写入缓存，下次重新请求
+            if theme:
+                cache[key] = theme
+        _save_theme_cache(cache_path, cache)
+
+    result = [cache.get(key, '') for key in keys]
+    debug(f'主题提取结果: {result}')
     return result
     # return [i for i in range(0,172)]
     # ['Pastel', 'Unicorn', 'Happy Birthday', 'Rainbow', 'Pastel Rainbow', 'Dinosaur', 'Rainbow', 'Unicorn',
@@ -137,26 +287,167 @@ def load_price_trend_data(file_path: str) -> Dict:
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             price_trend_data = json.load(f)
-        print(f'成功读取价格趋势数据，共 {len(price_trend_data)} 个ASIN')
+        info(f'成功读取价格趋势数据，共 {len(price_trend_data)} 个ASIN')
     except FileNotFoundError:
-        print(f'警告: 未找到价格趋势文件 {file_path}，将跳过价格趋势图')
+        warning(f'未找到价格趋势文件 {file_path}，将跳过价格趋势图')
     except Exception as e:
-        print(f'读取价格趋势文件时出错: {e}')
-        import traceback
-        traceback.print_exc()
+        error(f'读取价格趋势文件时出错: {e}')
     return price_trend_data
 
 
 def parse_json_data(data_str):
-    """解析JSON字符串数据"""
+    """解析JSON字符串数据
+
+    数据被截断时抛出 TruncatedPayloadError，其他无法解析的数据返回 None
+    """
     if isinstance(data_str, str):
         try:
-            return ast.literal_eval(data_str)
-        except:
+            return decode_payload(data_str)
+        except TruncatedPayloadError:
+            raise
+        except ValueError:
             return None
     return data_str
 
 
+def build_traffic_cycle_table(df: pd.DataFrame) -> Dict:
+    """
+    批量计算所有行的流量周期（结果与逐行调用 determine_traffic_cycle 一致）
+
+    返回
+    ------
+    Dict
+        key为DataFrame索引，value为 (周期月份列表, 流量类型)。
+        数据无法解析或无法批量计算的行不在表中，由 process_row_data 逐行计算。
+    """
+    # 按起始月份分组，每组拼成 (asin数, 关键词数, 月份数) 的数组
+    groups: Dict[str, list] = {}
+    for idx, traffic_cycle_json in df['核心词周期数据'].items():
+        try:
+            traffic_cycle_json = parse_json_data(traffic_cycle_json)
+            if not isinstance(traffic_cycle_json, dict):
+                continue
+            traffic_cycle_series, start_month_str, end_month_str = extract_keyword_series(traffic_cycle_json)
+            keyword_values = [
+                np.asarray(values, dtype=float) if values else None
+                for values in traffic_cycle_series.values()
+            ]
+        except Exception:
+            continue
+        if start_month_str is None or end_month_str is None:
+            continue
+        groups.setdefault(start_month_str, []).append((idx, keyword_values))
+
+    memo = get_keyword_flow_memo()
+    hits, misses = (memo.hits, memo.misses) if memo is not None else (0, 0)
+    table = {}
+    for start_month_str, items in groups.items():
+        n_keywords = max(len(keyword_values) for _, keyword_values in items)
+        n_months = max((len(v) for _, keyword_values in items for v in keyword_values if v is not None), default=0)
+        traffic_tensor = np.full((len(items), n_keywords, n_months), np.nan)
+        lengths = np.zeros((len(items), n_keywords), dtype=np.int64)
+        for a, (_, keyword_values) in enumerate(items):
+            for k, values in enumerate(keyword_values):
+                if values is not None:
+                    traffic_tensor[a, k, :len(values)] = values
+                    lengths[a, k] = len(values)
+
+        results = determine_traffic_cycles_batch(traffic_tensor, start_month_str, lengths)
+        for (idx, _), result in zip(items, results):
+            if result is not None:
+                table[idx] = result
+
+    if memo is not None:
+        count('流量周期关键词缓存', '命中', n=memo.hits - hits)
+        count('流量周期关键词缓存', '新判定', n=memo.misses - misses)
+    debug(f'批量计算流量周期：{len(table)}/{len(df)} 行')
+    return table
+
+
+# 逐行处理写入的结果列（列名, RowResult 字段名），按写入顺序排列
+ROW_RESULT_FIELDS = (
+    ('价格趋势类型', 'price_trend_type'),
+    ('上月销量', 'last_month_sales'),
+    ('核心词周期', 'core_word_cycle'),
+    ('pcs', 'pcs'),
+    ('经验判断是否开发', 'development_decision'),
+    ('规则层建议', 'rule_suggestion'),
+    ('季度统计', 'season_stats'),
+)
+ROW_RESULT_COLUMNS = [col for col, _ in ROW_RESULT_FIELDS]
+
+# 三类图片在结果记录中的 key
+IMAGE_KINDS = ('traffic_cycle', 'sales_trend', 'price_trend')
+
+
+@dataclass
+class RowResult:
+    """单行处理结果（compute_row_result 的返回值）"""
+    idx: Any
+    price_trend_type: Optional[str] = None
+    last_month_sales: Optional[int] = None
+    core_word_cycle: Optional[str] = None  # 为 None 表示数据被截断，该行不写入任何列
+    pcs: Optional[str] = None
+    development_decision: Optional[str] = None
+    rule_suggestion: Optional[str] = None
+    season_stats: Optional[str] = None
+    # 只包含实际处理过的图片，value 为 PNG bytes（绘制失败为 None）
+    images: Dict[str, Optional[bytes]] = field(default_factory=dict)
+
+    def cells(self) -> Dict[str, Any]:
+        """需要写入 DataFrame 的单元格 {列名: 值}（上月销量为 None 时也写入）"""
+        if self.core_word_cycle is None:
+            return {}
+        cells = {}
+        for col, name in ROW_RESULT_FIELDS:
+            value = getattr(self, name)
+            if value is not None or name == 'last_month_sales':
+                cells[col] = value
+        return cells
+
+
+def apply_row_results(
+    df: pd.DataFrame,
+    results: List[RowResult],
+    traffic_cycle_images: Dict[int, Optional[bytes]],
+    sales_trend_images: Dict[int, Optional[bytes]],
+    price_trend_images: Dict[int, Optional[bytes]],
+):
+    """
+    把结果记录写回 df 和图片字典
+
+    每个结果列只整体赋值一次（而不是逐个单元格 df.loc 写入），列的类型由整列的值推断，
+    没有写入的行为空值；已存在的列保留未写入行的原值。
+    """
+    positions = df.index.get_indexer([result.idx for result in results])
+    if (positions < 0).any():
+        raise KeyError(f'结果记录中的索引不在 DataFrame 中: {[r.idx for r, p in zip(results, positions) if p < 0]}')
+    row_cells = [result.cells() for result in results]
+
+    for col in ROW_RESULT_COLUMNS:
+        written = [(pos, cells[col]) for pos, cells in zip(positions, row_cells) if col in cells]
+        if not written:
+            continue
+        values = df[col].tolist() if col in df.columns else [np.nan] * len(df)
+        for pos, value in written:
+            values[pos] = value
+        column = pd.Series(values, index=df.index, dtype=object)
+        inferred = column.infer_objects()
+        # 整数列含空值时 infer_objects 会转成 float，保留 object 避免销量显示成 114.0
+        if inferred.dtype.kind != 'f' or any(isinstance(value, float) for _, value in written):
+            column = inferred
+        df[col] = column
+
+    image_dicts = {
+        'traffic_cycle': traffic_cycle_images,
+        'sales_trend': sales_trend_images,
+        'price_trend': price_trend_images,
+    }
+    for result in results:
+        for kind, image_bytes in result.images.items():
+            image_dicts[kind][result.idx] = image_bytes
+
+
 def process_row_data(
     idx: int,
     row: pd.Series,
@@ -166,30 +457,81 @@ def process_row_data(
     sales_trend_images: Dict[int, Optional[bytes]],
     price_trend_images: Dict[int, Optional[bytes]],
     masterKind: str = 'toys&games',
-    slaverKind: str = 'plates'
+    slaverKind: str = 'plates',
+    traffic_cycle_table: Optional[Dict] = None
 ):
-    """处理单行数据"""
+    """处理单行数据并写回 df 和图片字典
+
+    traffic_cycle_table 为 build_traffic_cycle_table 预先计算的流量周期表，
+    表中有该行时直接使用，否则逐行计算。
+    处理整张表时应使用 compute_row_result 收集结果，最后调用一次 apply_row_results。
+    """
+    result = compute_row_result(
+        idx,
+        row,
+        price_trend_data.get(row['asin']),
+        masterKind=masterKind,
+        slaverKind=slaverKind,
+        precomputed_traffic_cycle=(traffic_cycle_table or {}).get(idx)
+    )
+    apply_row_results(df, [result], traffic_cycle_images, sales_trend_images, price_trend_images)
+
+
+def compute_row_result(
+    idx,
+    row: pd.Series,
+    price_info: Optional[Dict],
+    masterKind: str = 'toys&games',
+    slaverKind: str = 'plates',
+    precomputed_traffic_cycle: Optional[Tuple] = None
+) -> RowResult:
+    """
+    处理单行数据，返回结果记录（不修改 DataFrame 和图片字典）
+
+    参数
+    ------
+    price_info : dict
+        该 ASIN 的价格趋势数据（price_trend / times），没有数据时为 None
+    precomputed_traffic_cycle : tuple
+        build_traffic_cycle_table 预先计算的 (周期月份列表, 流量类型)，为 None 时逐行计算
+
+    返回
+    ------
+    RowResult
+    """
+    # 逐行子步骤计时（pipeline_timing 未启用时为空操作），规则判断是最后一段
+    clock = step_clock('逐行处理/单行')
+    row_result = _compute_row_result(idx, row, price_info, masterKind, slaverKind, precomputed_traffic_cycle, clock)
+    clock.lap('规则判断')
+    return row_result
+
+
+def _compute_row_result(idx, row, price_info, masterKind, slaverKind, precomputed_traffic_cycle, clock) -> RowResult:
+    row_result = RowResult(idx=idx)
     title = row['产品标题']
     asin = row['asin']
     traffic_cycle_json = row['核心词周期数据']
     sales_json = row['销量数据']
     price = row['价格']
+    # 加载数据时已追加标题特征列（add_title_features）的表，规则判断直接使用，不再逐行解析标题
+    title_features = row if all(col in row.index for col in TITLE_FEATURE_COLUMNS) else None
     trend_result = None
 
     # 解析JSON数据
     if isinstance(traffic_cycle_json, str):
         try:
             traffic_cycle_json = parse_json_data(traffic_cycle_json)
-        except:
-            print('核心词周期数据太长被截断')
-            return
+        except TruncatedPayloadError as e:
+            row_event('解析数据', FAILED, '核心词周期数据被截断', idx, f'核心词周期数据太长被截断: {e}')
+            return row_result
 
     if isinstance(sales_json, str):
         try:
             sales_json = parse_json_data(sales_json)
-        except:
-            print('销量json太长被截断')
-            return
+        except TruncatedPayloadError as e:
+            row_event('解析数据', FAILED, '销量数据被截断', idx, f'销量json太长被截断: {e}')
+            return row_result
+    clock.lap('解析数据')
 
     # 添加流量周期图
     try:
@@ -198,108 +540,112 @@ def process_row_data(
                 try:
                     traffic_cycle_json = parse_json_data(traffic_cycle_json)
                 except:
-                    print(f"  第{idx}行: 无法解析 traffic_cycle_json 字符串")
-                    traffic_cycle_images[idx] = None
-                    return
+                    row_event('流量周期图', FAILED, '无法解析', idx, '无法解析 traffic_cycle_json 字符串')
+                    row_result.images['traffic_cycle'] = None
+                    return row_result
 
             if isinstance(traffic_cycle_json, dict):
                 data_list = traffic_cycle_json.get("data", [])
                 if data_list and len(data_list) > 0:
                     image_bytes = plot_traffic_cycle_json_to_bytes(traffic_cycle_json)
                     if image_bytes:
-                        traffic_cycle_images[idx] = image_bytes.getvalue()
-                        print(f"  第{idx}行: 成功绘制流量周期图（{len(data_list)}个关键词）")
+                        row_result.images['traffic_cycle'] = image_bytes.getvalue()
+                        row_event('流量周期图', OK, '已绘制', idx, f'成功绘制流量周期图（{len(data_list)}个关键词）')
                     else:
-                        print(f"  第{idx}行: 绘制失败，data 有 {len(data_list)} 项但无法生成图片")
-                        traffic_cycle_images[idx] = None
+                        row_event('流量周期图', FAILED, '没有可绘制的关键词', idx,
+                                  f'绘制失败，data 有 {len(data_list)} 项但无法生成图片')
+                        row_result.images['traffic_cycle'] = None
                 else:
-                    print(f"  第{idx}行: traffic_cycle_json 的 data 为空")
-                    traffic_cycle_images[idx] = None
+                    row_event('流量周期图', SKIPPED, 'data 为空', idx, 'traffic_cycle_json 的 data 为空')
+                    row_result.images['traffic_cycle'] = None
             else:
-                print(f"  第{idx}行: traffic_cycle_json 不是字典格式，类型为 {type(traffic_cycle_json)}")
-                traffic_cycle_images[idx] = None
+                row_event('流量周期图', SKIPPED, '不是字典格式', idx,
+                          f'traffic_cycle_json 不是字典格式，类型为 {type(traffic_cycle_json)}')
+                row_result.images['traffic_cycle'] = None
         else:
-            print(f"  第{idx}行: traffic_cycle_json 为空")
-            traffic_cycle_images[idx] = None
+            row_event('流量周期图', SKIPPED, '数据为空', idx, 'traffic_cycle_json 为空')
+            row_result.images['traffic_cycle'] = None
     except Exception as e:
-        print(f"  第{idx}行: 绘制流量周期图时出错: {e}")
-        import traceback
-        traceback.print_exc()
-        traffic_cycle_images[idx] = None
+        row_event('流量周期图', FAILED, '绘制出错', idx, f'绘制流量周期图时出错: {e}', exc_info=True)
+        row_result.images['traffic_cycle'] = None
+    clock.lap('流量周期图')
 
     # 添加销量趋势图
     try:
         if sales_json and isinstance(sales_json, list) and len(sales_json) > 0:
             image_bytes = plot_sales_trend_to_bytes(sales_json)
             if image_bytes:
-                sales_trend_images[idx] = image_bytes.getvalue()
-                print(f"  第{idx}行: 成功绘制销量趋势图")
+                row_result.images['sales_trend'] = image_bytes.getvalue()
+                row_event('销量趋势图', OK, '已绘制', idx)
             else:
-                print(f"  第{idx}行: 绘制销量趋势图失败")
-                sales_trend_images[idx] = None
+                row_event('销量趋势图', FAILED, '没有可绘制的数据', idx, '绘制销量趋势图失败')
+                row_result.images['sales_trend'] = None
         else:
             if not sales_json:
-                print(f"  第{idx}行: sales_json 为空")
+                row_event('销量趋势图', SKIPPED, '数据为空', idx, 'sales_json 为空')
             elif not isinstance(sales_json, list):
-                print(f"  第{idx}行: sales_json 不是列表格式，类型为 {type(sales_json)}")
+                row_event('销量趋势图', SKIPPED, '不是列表格式', idx,
+                          f'sales_json 不是列表格式，类型为 {type(sales_json)}')
             else:
-                print(f"  第{idx}行: sales_json 列表为空")
-            sales_trend_images[idx] = None
+                row_event('销量趋势图', SKIPPED, '列表为空', idx, 'sales_json 列表为空')
+            row_result.images['sales_trend'] = None
     except Exception as e:
-        print(f"  第{idx}行: 绘制销量趋势图时出错: {e}")
-        import traceback
-        traceback.print_exc()
-        sales_trend_images[idx] = None
+        row_event('销量趋势图', FAILED, '绘制出错', idx, f'绘制销量趋势图时出错: {e}', exc_info=True)
+        row_result.images['sales_trend'] = None
+    clock.lap('销量趋势图')
 
     # 添加价格趋势图和判断价格趋势类型
     try:
-        if asin in price_trend_data:
-            price_info = price_trend_data[asin]
+        if price_info is not None:
             price_trend = price_info.get("price_trend", [])
             times = price_info.get("times", [])
             
-            # 清洗价格和时间数据
-            times_clean, prices_clean = clean_price_and_time(times, price_trend)
+            # 清洗价格和时间数据（时间只解析一次，判断趋势时直接使用数组）
+            series_clean = PriceTimeSeries.from_raw(price_trend, times)
             
             # 判断价格趋势类型
-            if prices_clean and len(prices_clean) >= 3:
+            if len(series_clean) >= 3:
                 try:
                     if asin in ["B0F78QFZW1","B01KM1N1YI","B089NPM4YG","B0DRTVPY34"]:
-                        print(asin)
-                    trend_result, detail = classify_price_trend(prices_clean, times_clean, sales_data=sales_json)
-                    df.loc[idx, '价格趋势类型'] = trend_result
-                    print(f"  第{idx}行: 价格趋势类型 = {trend_result}（有效数据点: {len(prices_clean)}，使用销量筛选）")
+                        debug(f'第{idx}行: 重点关注的 ASIN {asin}')
+                    trend_result, detail = classify_price_trend(series_clean.prices, series_clean.times, sales_data=sales_json)
+                    row_result.price_trend_type = trend_result
+                    row_event('价格趋势类型', OK, str(trend_result), idx,
+                              f'价格趋势类型 = {trend_result}（有效数据点: {len(series_clean)}，使用销量筛选）')
                 except Exception as e:
-                    print(f"  第{idx}行: 判断价格趋势类型时出错: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    df.loc[idx, '价格趋势类型'] = "未知"
+                    row_event('价格趋势类型', FAILED, '判断出错', idx, f'判断价格趋势类型时出错: {e}', exc_info=True)
+                    row_result.price_trend_type = "未知"
             else:
-                print(f"  第{idx}行: 价格数据不足（有效数据点: {len(prices_clean) if prices_clean else 0}，需要至少3个）")
-                df.loc[idx, '价格趋势类型'] = "数据不足"
+                row_event('价格趋势类型', SKIPPED, '价格数据不足', idx,
+                          f'价格数据不足（有效数据点: {len(series_clean)}，需要至少3个）')
+                row_result.price_trend_type = "数据不足"
+            clock.lap('价格趋势判断')
             
-            # 绘制价格趋势图
-            if price_trend and times and len(price_trend) == len(times):
+            # 绘制价格趋势图（price_trend / times 可能是 price_trend_store 的数组，按长度判断）
+            n_prices = 0 if price_trend is None else len(price_trend)
+            n_times = 0 if times is None else len(times)
+            if n_prices and n_times and n_prices == n_times:
                 image_bytes = plot_price_trend_to_bytes(price_trend, times)
                 if image_bytes:
-                    price_trend_images[idx] = image_bytes.getvalue()
-                    print(f"  第{idx}行: 成功绘制价格趋势图")
+                    row_result.images['price_trend'] = image_bytes.getvalue()
+                    row_event('价格趋势图', OK, '已绘制', idx)
                 else:
-                    print(f"  第{idx}行: 绘制价格趋势图失败（数据过滤后为空或无有效数据）")
-                    price_trend_images[idx] = None
+                    row_event('价格趋势图', FAILED, '没有有效数据', idx,
+                              '绘制价格趋势图失败（数据过滤后为空或无有效数据）')
+                    row_result.images['price_trend'] = None
             else:
-                print(f"  第{idx}行: 价格趋势数据不完整（price_trend: {len(price_trend) if price_trend else 0}, times: {len(times) if times else 0}）")
-                price_trend_images[idx] = None
+                row_event('价格趋势图', SKIPPED, '数据不完整', idx,
+                          f'价格趋势数据不完整（price_trend: {n_prices}, times: {n_times}）')
+                row_result.images['price_trend'] = None
         else:
-            print(f"  第{idx}行: 未找到ASIN {asin} 的价格趋势数据")
-            df.loc[idx, '价格趋势类型'] = "无数据"
-            price_trend_images[idx] = None
+            row_event('价格趋势图', SKIPPED, '没有价格趋势数据', idx, f'未找到ASIN {asin} 的价格趋势数据')
+            row_result.price_trend_type = "无数据"
+            row_result.images['price_trend'] = None
     except Exception as e:
-        print(f"  第{idx}行: 处理价格趋势时出错: {e}")
-        import traceback
-        traceback.print_exc()
-        df.loc[idx, '价格趋势类型'] = "处理失败"
-        price_trend_images[idx] = None
+        row_event('价格趋势图', FAILED, '处理出错', idx, f'处理价格趋势时出错: {e}', exc_info=True)
+        row_result.price_trend_type = "处理失败"
+        row_result.images['price_trend'] = None
+    clock.lap('价格趋势图')
 
     # 处理核心词搜索量数据
     traffic_cycle_series, start_month_str, end_month_str = extract_keyword_series(traffic_cycle_json)
@@ -307,12 +653,14 @@ def process_row_data(
     
     # 解析销量数据
     sales = get_last_month_saler(sales_json)
-    df.loc[idx, '上月销量'] = sales
+    row_result.last_month_sales = sales
     
     # 计算流量周期
     if start_month_str is None or end_month_str is None:
         traffic_cycle = []
         flow_type = []
+    elif precomputed_traffic_cycle is not None:
+        traffic_cycle, flow_type = precomputed_traffic_cycle
     else:
         traffic_cycle, flow_type = determine_traffic_cycle(traffic_cycle_list, start_month_str, end_month_str)
     
@@ -337,7 +685,8 @@ def process_row_data(
             low_months=low_months
         )
 
-    df.loc[idx, '核心词周期'] = str(core_word_cell_text)
+    row_result.core_word_cycle = str(core_word_cell_text)
+    clock.lap('流量周期计算')
 
     # 规则层处理
     development_kind = os.getenv('DEVELOPMENT_KIND')
@@ -349,131 +698,135 @@ def process_row_data(
                 reason = '销量或价格是空'
                 pcs = None
             else:
-                result, reason, pcs = pass_rule(main_menu=masterKind, sub_menu=slaverKind, sales=sales, price=price, title=title)
+                result, reason, pcs = pass_rule(main_menu=masterKind, sub_menu=slaverKind, sales=sales, price=price, title=title,
+                                                title_features=title_features)
 
-            df.loc[idx, 'pcs'] = str(pcs) + ' pcs' if pcs is not None else ''
+            row_result.pcs = str(pcs) + ' pcs' if pcs is not None else ''
 
             if pcs is None:
-                df.loc[idx, '经验判断是否开发'] = '待定'
-                df.loc[idx, '规则层建议'] = reason
-                return
+                row_result.development_decision = '待定'
+                row_result.rule_suggestion = reason
+                return row_result
 
             if price is None:
-                df.loc[idx, '经验判断是否开发'] = '待定'
-                df.loc[idx, '规则层建议'] = '上月无参照价格'
-                return
+                row_result.development_decision = '待定'
+                row_result.rule_suggestion = '上月无参照价格'
+                return row_result
 
             if result:
                 can_dev, timing_reason = can_develop(traffic_cycles=traffic_cycle,flow_type=flow_type)
                 if result and can_dev:
-                    df.loc[idx, '经验判断是否开发'] = '是'
-                    df.loc[idx, '规则层建议'] = reason + '；' + timing_reason
+                    row_result.development_decision = '是'
+                    row_result.rule_suggestion = reason + '；' + timing_reason
                 else:
-                    df.loc[idx, '经验判断是否开发'] = '否'
-                    df.loc[idx, '规则层建议'] = reason + '；' + timing_reason
+                    row_result.development_decision = '否'
+                    row_result.rule_suggestion = reason + '；' + timing_reason
             else:
-                df.loc[idx, '经验判断是否开发'] = '否'
-                df.loc[idx, '规则层建议'] = reason
+                row_result.development_decision = '否'
+                row_result.rule_suggestion = reason
         elif masterKind == 'toys&games' and slaverKind == 'banners':
             # 根据规则判断是否开发
 
             result, reason, pcs = pass_rule(main_menu=masterKind, sub_menu=slaverKind, sales=sales, price=price,
-                                                title=title,price_trend=trend_result)
+                                                title=title, price_trend=trend_result, title_features=title_features)
 
-            df.loc[idx, 'pcs'] = str(pcs) + ' pcs' if pcs is not None else ''
+            row_result.pcs = str(pcs) + ' pcs' if pcs is not None else ''
 
 
             if sales is None or trend_result is None:
-                df.loc[idx, '经验判断是否开发'] = '待定'
-                df.loc[idx, '规则层建议'] = '上月销量或价格趋势不存在'
-                return
+                row_result.development_decision = '待定'
+                row_result.rule_suggestion = '上月销量或价格趋势不存在'
+                return row_result
             can_dev, timing_reason = can_develop(traffic_cycles=traffic_cycle,flow_type=flow_type)
             if result:
                 if result and can_dev:
-                    df.loc[idx, '经验判断是否开发'] = '是'
-                    df.loc[idx, '规则层建议'] = reason + '；' + timing_reason
+                    row_result.development_decision = '是'
+                    row_result.rule_suggestion = reason + '；' + timing_reason
                 else:
-                    df.loc[idx, '经验判断是否开发'] = '否'
-                    df.loc[idx, '规则层建议'] = reason + '；' + timing_reason
+                    row_result.development_decision = '否'
+                    row_result.rule_suggestion = reason + '；' + timing_reason
             else:
-                df.loc[idx, '经验判断是否开发'] = '否'
-                df.loc[idx, '规则层建议'] = reason + ';' + timing_reason
+                row_result.development_decision = '否'
+                row_result.rule_suggestion = reason + ';' + timing_reason
         elif masterKind == 'toys&games' and slaverKind == 'centerpieces':
             # 根据规则判断是否开发
 
             result, reason, pcs = pass_rule(main_menu=masterKind, sub_menu=slaverKind, sales=sales, price=price,
-                                            title=title, price_trend=trend_result)
+                                            title=title, price_trend=trend_result, title_features=title_features)
 
-            df.loc[idx, 'pcs'] = str(pcs) + ' pcs' if pcs is not None else ''
+            row_result.pcs = str(pcs) + ' pcs' if pcs is not None else ''
 
             if sales is None or trend_result is None:
-                df.loc[idx, '经验判断是否开发'] = '待定'
-                df.loc[idx, '规则层建议'] = '上月销量或价格趋势不存在'
-                return
+                row_result.development_decision = '待定'
+                row_result.rule_suggestion = '上月销量或价格趋势不存在'
+                return row_result
             can_dev, timing_reason = can_develop(traffic_cycles=traffic_cycle,flow_type=flow_type)
             if result:
                 if result and can_dev:
-                    df.loc[idx, '经验判断是否开发'] = '是'
-                    df.loc[idx, '规则层建议'] = reason + '；' + timing_reason
+                    row_result.development_decision = '是'
+                    row_result.rule_suggestion = reason + '；' + timing_reason
                 else:
-                    df.loc[idx, '经验判断是否开发'] = '否'
-                    df.loc[idx, '规则层建议'] = reason + '；' + timing_reason
+                    row_result.development_decision = '否'
+                    row_result.rule_suggestion = reason + '；' + timing_reason
             else:
                 if timing_reason.startswith('可以开发'):
                     timing_reason = '不建议开发' + timing_reason[4:]
-                df.loc[idx, '经验判断是否开发'] = '否'
-                df.loc[idx, '规则层建议'] = reason + ';' + timing_reason
+                row_result.development_decision = '否'
+                row_result.rule_suggestion = reason + ';' + timing_reason
         elif masterKind == 'toys&games' and slaverKind == 'cupcake stands':
             # 根据规则判断是否开发
             material = row['材质']
             result, reason, pcs = pass_rule(main_menu=masterKind, sub_menu=slaverKind, sales=sales, price=price,
-                                            title=title, price_trend=trend_result, material=material)
+                                            title=title, price_trend=trend_result, material=material,
+                                            title_features=title_features)
 
-            df.loc[idx, 'pcs'] = str(pcs) + ' pcs' if pcs is not None else ''
+            row_result.pcs = str(pcs) + ' pcs' if pcs is not None else ''
 
             if sales is None or trend_result is None:
-                df.loc[idx, '经验判断是否开发'] = '待定'
-                df.loc[idx, '规则层建议'] = '上月销量或价格趋势不存在'
-                return
+                row_result.development_decision = '待定'
+                row_result.rule_suggestion = '上月销量或价格趋势不存在'
+                return row_result
             can_dev, timing_reason = can_develop(traffic_cycles=traffic_cycle,flow_type=flow_type)
             if result:
                 if result and can_dev:
-                    df.loc[idx, '经验判断是否开发'] = '是'
-                    df.loc[idx, '规则层建议'] = reason + '；' + timing_reason
+                    row_result.development_decision = '是'
+                    row_result.rule_suggestion = reason + '；' + timing_reason
                 else:
-                    df.loc[idx, '经验判断是否开发'] = '否'
-                    df.loc[idx, '规则层建议'] = reason + '；' + timing_reason
+                    row_result.development_decision = '否'
+                    row_result.rule_suggestion = reason + '；' + timing_reason
             else:
-                df.loc[idx, '经验判断是否开发'] = '否'
-                df.loc[idx, '规则层建议'] = reason + ';' + timing_reason
+                row_result.development_decision = '否'
+                row_result.rule_suggestion = reason + ';' + timing_reason
     elif development_kind == '店铺开发':
         # 根据规则判断是否开发
 
         result, reason, pcs = pass_rule(main_menu=masterKind, sub_menu=slaverKind, sales=sales, price=price,
-                                        title=title, price_trend=trend_result)
+                                        title=title, price_trend=trend_result, title_features=title_features)
 
-        df.loc[idx, 'pcs'] = str(pcs) + ' pcs' if pcs is not None else ''
+        row_result.pcs = str(pcs) + ' pcs' if pcs is not None else ''
 
         if sales is None or trend_result is None:
-            df.loc[idx, '经验判断是否开发'] = '待定'
-            df.loc[idx, '规则层建议'] = '上月销量或价格趋势不存在'
-            return
+            row_result.development_decision = '待定'
+            row_result.rule_suggestion = '上月销量或价格趋势不存在'
+            return row_result
         can_dev, timing_reason = can_develop(traffic_cycles=traffic_cycle, flow_type=flow_type)
         if result:
             if result and can_dev:
-                df.loc[idx, '经验判断是否开发'] = '是'
-                df.loc[idx, '规则层建议'] = reason + '；' + timing_reason
+                row_result.development_decision = '是'
+                row_result.rule_suggestion = reason + '；' + timing_reason
             else:
-                df.loc[idx, '经验判断是否开发'] = '否'
-                df.loc[idx, '规则层建议'] = reason + '；' + timing_reason
+                row_result.development_decision = '否'
+                row_result.rule_suggestion = reason + '；' + timing_reason
         else:
             if timing_reason.startswith('可以开发'):
                 timing_reason = '不建议开发' + timing_reason[4:]
-            df.loc[idx, '经验判断是否开发'] = '否'
-            df.loc[idx, '规则层建议'] = reason + ';' + timing_reason
+            row_result.development_decision = '否'
+            row_result.rule_suggestion = reason + ';' + timing_reason
     elif development_kind == '类目开发':
         # 增加一列，季度
         # 大于8个月的归为全年
         # 否则判断当前月份涉及了哪些季度，
         season_result = classify_season_from_traffic_cycle(sales_hist=sales_json, traffic_cycle=traffic_cycle)
-        df.loc[idx,'季度统计'] = season_result
+        row_result.season_stats = season_result
+
+    return row_result
@@ -1,6 +1,8 @@
+import hashlib
 from typing import List, Sequence, Dict, Any, Optional, Union, Tuple
-from collections import Counter
+from collections import Counter, OrderedDict
 
+import numpy as np
 import pandas as pd
 
 
@@ -23,13 +25,17 @@ def _monthly_effective_contribution(series: pd.Series) -> pd.Series:
     return monthly_contrib / monthly_contrib.sum()
 
 
-def _find_peak_windows(
+_MONTHS = np.arange(1, 13)
+_DEFAULT_WINDOW_SIZES = [2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
+
+
+def _find_peak_windows_loop(
         monthly_ratio: pd.Series,
         window_sizes: Optional[List[int]] = None,
         min_score: float = 0.05,
         min_ratio: float = 0.0,
 ) -> List[Dict[str, Any]]:
-    """在 12 个月度贡献度上寻找所有候选峰值窗口。"""
+    """在 12 个月度贡献度上寻找所有候选峰值窗口（逐窗口 pandas 实现，作为向量化版本的参照和回退）。"""
     if window_sizes is None:
         window_sizes = [2, 3, 4, 5, 6, 7, 8, 9, 10, 11]
 
@@ -53,6 +59,46 @@ def _find_peak_windows(
     return candidates
 
 
+def _find_peak_windows(
+        monthly_ratio: pd.Series,
+        window_sizes: Optional[List[int]] = None,
+        min_score: float = 0.05,
+        min_ratio: float = 0.0,
+) -> List[Dict[str, Any]]:
+    """
+    在 12 个月度贡献度上寻找所有候选峰值窗口（NumPy 向量化实现）。
+
+    把 12 个月的贡献度拼接成 24 个元素的环形数组，同一窗口长度的 12 个起始月份一次计算：
+    正贡献约束用“非正月份个数”的累计和相减判断，窗口得分用取窗口矩阵后按行求和
+    （与 pandas 的求和顺序一致，得分逐位相同）。返回结果与 `_find_peak_windows_loop` 完全一致。
+    """
+    if window_sizes is None:
+        window_sizes = _DEFAULT_WINDOW_SIZES
+
+    # 月份不完整（不足 12 个月）时保持原有行为
+    if len(monthly_ratio) != 12 or not np.array_equal(monthly_ratio.index, _MONTHS):
+        return _find_peak_windows_loop(monthly_ratio, window_sizes, min_score, min_ratio)
+
+    ratio = monthly_ratio.to_numpy(dtype=float)
+    # 非正贡献月份个数的前缀和（NaN 与原实现一致，不算作非正）
+    non_positive = np.concatenate(([0], np.cumsum(np.tile(ratio <= min_ratio, 2))))
+    # pandas 求和会跳过 NaN
+    doubled = np.tile(np.where(np.isnan(ratio), 0.0, ratio), 2)
+    starts = np.arange(12)
+
+    candidates: List[Dict[str, Any]] = []
+    for w in window_sizes:
+        positive = non_positive[starts + w] == non_positive[starts]
+        window_idx = starts[:, None] + np.arange(w)
+        scores = doubled.take(window_idx).sum(axis=1)
+        for start in np.flatnonzero(positive & (scores >= min_score)):
+            candidates.append(
+                {"months": (window_idx[start] % 12 + 1).tolist(), "score": float(scores[start]), "length": w}
+            )
+
+    return candidates
+
+
 def _deduplicate_windows(windows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """去掉被更大窗口完全包含的子窗口。"""
     windows = sorted(windows, key=lambda x: (-x["score"], x["length"]))
@@ -134,6 +180,81 @@ def _detect_product_flow_with_peaks(series: pd.Series) -> Dict[str, Any]:
     }
 
 
+# ---------------- 关键词序列判定结果缓存 ----------------
+
+# 缓存的关键词序列条数上限，超过后淘汰最久未使用的结果
+KEYWORD_FLOW_MEMO_SIZE = 50000
+
+
+class KeywordFlowMemo:
+    """
+    单条关键词序列的判定结果缓存（_detect_product_flow_with_peaks 的返回值），按条数限制的 LRU
+
+    同一类目下很多 ASIN 共用相同的核心词，相同的序列只判定一次。
+    key 为 (起始月份, 序列 dtype, 序列内容的哈希)：判定结果只与序列和起始月份是几月有关，与年份无关。
+    缓存的结果由多行共用，调用方不能修改。
+    """
+
+    def __init__(self, max_entries: int = KEYWORD_FLOW_MEMO_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._results: 'OrderedDict[tuple, Dict[str, Any]]' = OrderedDict()
+
+    def __len__(self):
+        return len(self._results)
+
+    @staticmethod
+    def key(values: np.ndarray, start_month: int) -> Optional[tuple]:
+        """序列的 key；不是数值数组（如含 None）时返回 None（不使用缓存）"""
+        if values.dtype.kind not in 'biuf':
+            return None
+        digest = hashlib.sha1(np.ascontiguousarray(values).tobytes()).digest()
+        return int(start_month), values.dtype.str, digest
+
+    def get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        result = self._results.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._results.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: tuple, result: Dict[str, Any]):
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+
+_keyword_flow_memo: Optional[KeywordFlowMemo] = KeywordFlowMemo()
+
+
+def get_keyword_flow_memo() -> Optional[KeywordFlowMemo]:
+    """当前进程的关键词序列缓存，None 表示不使用缓存"""
+    return _keyword_flow_memo
+
+
+def set_keyword_flow_memo(memo: Optional[KeywordFlowMemo]):
+    """安装当前进程的关键词序列缓存（None 表示每条序列都重新判定）"""
+    global _keyword_flow_memo
+    _keyword_flow_memo = memo
+
+
+def _detect_flow_cached(values: Sequence[float], series: pd.Series) -> Dict[str, Any]:
+    """带缓存的 _detect_product_flow_with_peaks（series 为 values 按月构造的时间序列）"""
+    memo = _keyword_flow_memo
+    key = memo.key(np.asarray(values), series.index[0].month) if memo is not None else None
+    if key is None:
+        return _detect_product_flow_with_peaks(series)
+    result = memo.get(key)
+    if result is None:
+        result = _detect_product_flow_with_peaks(series)
+        memo.put(key, result)
+    return result
+
+
 def _normalize_cycle_months(months: Optional[Sequence[int]]) -> Optional[tuple]:
     """将月份窗口标准化为可比较的 key（排序后的元组）。"""
     if not months:
@@ -169,10 +290,8 @@ def determine_traffic_cycle(traffic_values: List[Sequence[float]], start_time: s
     
     if all_zero:
         return [],''
-    
-    cycle_counter: Counter = Counter()
-    flow_type_counter: Counter = Counter()
 
+    results: List[Dict[str, Any]] = []
     for values in traffic_values:
         if not values:
             continue
@@ -181,7 +300,17 @@ def determine_traffic_cycle(traffic_values: List[Sequence[float]], start_time: s
         months = pd.date_range(start_time, periods=len(values), freq="MS")
         series = pd.Series(list(values), index=months, name="product_search_volume")
 
-        result = _detect_product_flow_with_peaks(series)
+        results.append(_detect_flow_cached(values, series))
+
+    return _vote_traffic_cycle(results)
+
+
+def _vote_traffic_cycle(results: List[Dict[str, Any]]) -> Tuple[List[List[Any]], Any]:
+    """根据每条序列的判定结果（主峰、次峰、流量类型）投票得到最终周期和流量类型。"""
+    cycle_counter: Counter = Counter()
+    flow_type_counter: Counter = Counter()
+
+    for result in results:
         main_peak_months = result.get("main_peak")
         secondary_peak_months = result.get("secondary_peaks")
         flow_type = result.get("flow_type")
@@ -376,6 +505,260 @@ def determine_traffic_cycle(traffic_values: List[Sequence[float]], start_time: s
     return final_cycles, final_flow_type
 
 
+# ---------------- 批量计算（整份报告一次计算） ----------------
+
+# 窗口 (长度, 起始月份) 的全部组合，顺序与 _find_peak_windows 的候选顺序一致
+_WINDOW_COMBOS = [(w, start) for w in _DEFAULT_WINDOW_SIZES for start in range(12)]
+_WINDOW_LENGTHS = np.array([w for w, _ in _WINDOW_COMBOS])
+# 每个窗口包含的月份（12 位掩码，第 m-1 位表示 m 月）
+_WINDOW_MASKS = [sum(1 << ((start + i) % 12) for i in range(w)) for w, start in _WINDOW_COMBOS]
+
+
+def _kahan_add(total: np.ndarray, comp: np.ndarray, values: np.ndarray, nobs: np.ndarray):
+    """按 pandas groupby 的补偿求和方式累加一列（跳过 NaN，原地更新）。"""
+    valid = ~np.isnan(values)
+    y = values - comp
+    t = total + y
+    new_comp = t - total - y
+    # 与 pandas 一致：补偿项为 NaN（值为 ±inf）时置 0
+    new_comp[np.isnan(new_comp)] = 0
+    np.copyto(comp, new_comp, where=valid)
+    np.copyto(total, t, where=valid)
+    nobs += valid
+
+
+def _nanmean_rows(values: np.ndarray) -> np.ndarray:
+    """逐行求均值，与 pandas Series.mean（跳过 NaN）的求和顺序一致。"""
+    valid = ~np.isnan(values)
+    sums = np.ascontiguousarray(np.where(valid, values, 0.0)).sum(axis=1)
+    counts = valid.sum(axis=1)
+    return sums / counts
+
+
+def _months_of_mask(mask: int) -> List[int]:
+    return [m for m in range(1, 13) if mask >> (m - 1) & 1]
+
+
+def _detect_flows_same_length(
+        values: np.ndarray,
+        start_month: int,
+        min_score: float = 0.05,
+        min_ratio: float = 0.0,
+) -> List[Dict[str, Any]]:
+    """
+    对一组等长（至少 12 个月）的序列批量执行 _detect_product_flow_with_peaks 的判定，
+    返回每条序列的 main_peak / secondary_peaks / flow_type（月份列表已排序）。
+    """
+    n, length = values.shape
+    offsets = np.arange(length) + start_month - 1
+    month_idx = offsets % 12
+    year_idx = offsets // 12
+    years = np.unique(year_idx)
+
+    # 1. 年内标准化（groupby(year).transform("mean")）
+    year_means = np.empty_like(values)
+    for year in years:
+        cols = np.flatnonzero(year_idx == year)
+        total, comp, nobs = np.zeros(n), np.zeros(n), np.zeros(n, dtype=np.int64)
+        for c in cols:
+            _kahan_add(total, comp, values[:, c], nobs)
+        year_means[:, cols] = (total / nobs)[:, None]
+    normalized = values / year_means
+
+    # 2. 超额部分按月份求和并归一化
+    diff = normalized - _nanmean_rows(normalized)[:, None]
+    excess = np.where((diff >= 0) | np.isnan(diff), diff, 0.0)
+    contrib, comp = np.zeros((n, 12)), np.zeros((n, 12))
+    nobs = np.zeros((n, 12), dtype=np.int64)
+    for c in range(length):
+        m = month_idx[c]
+        total_m, comp_m, nobs_m = contrib[:, m].copy(), comp[:, m].copy(), nobs[:, m].copy()
+        _kahan_add(total_m, comp_m, excess[:, c], nobs_m)
+        contrib[:, m], comp[:, m], nobs[:, m] = total_m, comp_m, nobs_m
+    contrib_sum = contrib.sum(axis=1)[:, None]
+    ratio = np.where(contrib_sum == 0, contrib * 0, contrib / contrib_sum)
+
+    # 3. 峰值窗口（与 _find_peak_windows 相同的计算方式）
+    non_positive = np.concatenate(
+        (np.zeros((n, 1), dtype=np.int64), np.cumsum(np.tile(ratio <= min_ratio, 2), axis=1)), axis=1
+    )
+    doubled = np.tile(np.where(np.isnan(ratio), 0.0, ratio), 2)
+    starts = np.arange(12)
+    scores_parts, keep_parts = [], []
+    for w in _DEFAULT_WINDOW_SIZES:
+        positive = non_positive[:, starts + w] == non_positive[:, starts]
+        scores_w = doubled[:, starts[:, None] + np.arange(w)].sum(axis=2)
+        scores_parts.append(scores_w)
+        keep_parts.append(positive & (scores_w >= min_score))
+    scores = np.concatenate(scores_parts, axis=1)
+    keep = np.concatenate(keep_parts, axis=1)
+
+    # 4. 去重（与 _deduplicate_windows 相同：按得分降序、长度升序，去掉被包含的窗口）
+    peaks_per_row: List[List[int]] = []
+    for i in range(n):
+        candidates = np.flatnonzero(keep[i]).tolist()
+        candidates.sort(key=lambda k: (-scores[i, k], _WINDOW_LENGTHS[k]))
+        final: List[int] = []
+        for k in candidates:
+            mask = _WINDOW_MASKS[k]
+            if any(mask & _WINDOW_MASKS[f] == mask for f in final):
+                continue
+            final.append(k)
+        peaks_per_row.append(final)
+
+    # 5. 主峰稳定性（_window_stability），按主峰月份分组计算
+    has_peak = np.array([bool(p) for p in peaks_per_row])
+    main_masks = np.array([_WINDOW_MASKS[p[0]] if p else 0 for p in peaks_per_row])
+    stability = np.ones(n)
+    month_bits = 1 << month_idx
+    for mask in np.unique(main_masks[has_peak]):
+        rows = np.flatnonzero(has_peak & (main_masks == mask))
+        block = values[rows]
+        result = None
+        for year in years:
+            year_cols = np.flatnonzero(year_idx == year)
+            window_cols = year_cols[(month_bits[year_cols] & mask) != 0]
+            year_mean = _nanmean_rows(block[:, year_cols])
+            if len(window_cols):
+                window_mean = _nanmean_rows(block[:, window_cols])
+            else:
+                window_mean = np.full(len(rows), np.nan)
+            year_ratio = np.where(year_mean == 0, 0.0, window_mean / year_mean)
+            # 与内置 min 一致：按年份顺序比较，NaN 不会替换也不会被替换
+            result = year_ratio if result is None else np.where(year_ratio < result, year_ratio, result)
+        stability[rows] = result
+
+    # 6. 流量类型
+    detections: List[Dict[str, Any]] = []
+    for i in range(n):
+        peaks = peaks_per_row[i]
+        if not peaks:
+            detections.append({
+                "flow_type": "未知",
+                "main_peak": None,
+                "secondary_peaks": [],
+                "seasonality_strength": 0.0,
+                "stability": 1.0,
+            })
+            continue
+        st = stability[i]
+        ss = float(scores[i, peaks[0]])
+        main_peak = _months_of_mask(_WINDOW_MASKS[peaks[0]])
+        if st == 0:
+            flow_type = '未知'
+            main_peak = []
+        elif 0 < st < 1.15:
+            flow_type = "全年流量型"
+        elif ss >= 0.65 and st >= 1.3:
+            flow_type = "强周期型"
+        else:
+            flow_type = "混合季节型"
+        detections.append({
+            "flow_type": flow_type,
+            "main_peak": main_peak,
+            "secondary_peaks": [_months_of_mask(_WINDOW_MASKS[k]) for k in peaks[1:]],
+            "seasonality_strength": round(ss, 3),
+            "stability": round(float(st), 2),
+        })
+    return detections
+
+
+def _detect_flows_same_length_cached(values: np.ndarray, start_month: int) -> List[Dict[str, Any]]:
+    """
+    带缓存的 _detect_flows_same_length：已缓存的序列直接取结果，
+    其余序列（同一批中相同的序列只算一次）一起批量判定后写入缓存
+    """
+    memo = _keyword_flow_memo
+    if memo is None:
+        return _detect_flows_same_length(values, start_month)
+
+    keys = [memo.key(row, start_month) for row in values]
+    found: Dict[tuple, Dict[str, Any]] = {}
+    todo: Dict[tuple, int] = {}  # 待判定的 key -> 行号
+    for i, key in enumerate(keys):
+        if key in found or key in todo:
+            memo.hits += 1
+            continue
+        result = memo.get(key)
+        if result is None:
+            todo[key] = i
+        else:
+            found[key] = result
+    if todo:
+        for key, result in zip(todo, _detect_flows_same_length(values[list(todo.values())], start_month)):
+            memo.put(key, result)
+            found[key] = result
+    return [found[key] for key in keys]
+
+
+def determine_traffic_cycles_batch(
+        traffic_tensor: np.ndarray,
+        start_time: str,
+        lengths: Optional[np.ndarray] = None,
+) -> List[Optional[Tuple[List[List[Any]], Any]]]:
+    """
+    批量计算整份报告的流量周期，结果与逐行调用 determine_traffic_cycle 完全一致。
+
+    参数
+    ------
+    traffic_tensor : np.ndarray
+        形状为 (asin 数, 关键词数, 月份数) 的搜索量数组，不足的部分用 NaN 填充。
+    start_time : str
+        所有序列的起始月份（如 "2024-01"）。
+    lengths : np.ndarray, optional
+        形状为 (asin 数, 关键词数) 的每条序列实际长度，0 表示该关键词没有数据。
+        不传时按每条序列最后一个非 NaN 值的位置推断。
+
+    返回
+    ------
+    List
+        每个 asin 的 (周期月份列表, 流量类型)。无法批量计算的 asin（序列不足 12 个月且
+        逐条判定出错）返回 None，可回退到 determine_traffic_cycle 逐行计算。
+    """
+    traffic_tensor = np.asarray(traffic_tensor, dtype=float)
+    n_asins, n_keywords, n_months = traffic_tensor.shape
+    if lengths is None:
+        valid = ~np.isnan(traffic_tensor)
+        lengths = np.where(valid.any(axis=2), n_months - np.argmax(valid[:, :, ::-1], axis=2), 0)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    start = pd.Timestamp(start_time)
+
+    # 每条非空序列的判定结果，按长度分组批量计算
+    detections: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    failed = set()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for length in np.unique(lengths[lengths > 0]):
+            pairs = np.argwhere(lengths == length)
+            if length >= 12:
+                block = np.ascontiguousarray(traffic_tensor[pairs[:, 0], pairs[:, 1], :length])
+                for (a, k), detection in zip(pairs, _detect_flows_same_length_cached(block, start.month)):
+                    detections[(a, k)] = detection
+                continue
+            # 不足 12 个月：逐条按原逻辑判定
+            months = pd.date_range(start_time, periods=int(length), freq="MS")
+            for a, k in pairs:
+                try:
+                    series = pd.Series(traffic_tensor[a, k, :length], index=months)
+                    detections[(a, k)] = _detect_flow_cached(series.to_numpy(), series)
+                except Exception:
+                    failed.add(a)
+
+    results: List[Optional[Tuple[List[List[Any]], Any]]] = []
+    for a in range(n_asins):
+        row_lengths = lengths[a]
+        all_zero = not any(
+            (traffic_tensor[a, k, :row_lengths[k]] != 0).any() for k in range(n_keywords) if row_lengths[k] > 0
+        )
+        if all_zero:
+            results.append(([], ''))
+            continue
+        if a in failed:
+            results.append(None)
+            continue
+        results.append(_vote_traffic_cycle([detections[(a, k)] for k in range(n_keywords) if row_lengths[k] > 0]))
+    return results
+
+
 if __name__ == "__main__":
     # 构造几组模拟流量数据（2 年 * 12 个月），大部分样本在 4-7 月有明显旺季
     # def build_series(peak_months: Sequence[int], base: float = 100.0, peak: float = 200.0):
@@ -421,3 +804,61 @@ if __name__ == "__main__":
     final_cycle = determine_traffic_cycle(traffic_samples, '2017-01', '2025-11')
     print("\n=== 最终多数票周期 ===")
     print(f"最终判定周期月份: {final_cycle}")
+
+    print("\n=== 峰值窗口搜索：向量化实现与逐窗口实现对比 ===")
+    import time
+
+    rng = np.random.default_rng(0)
+    ratios = []
+    for _ in range(200):
+        n = int(rng.integers(12, 48))
+        values = rng.gamma(1.0, 1000.0, n) * (rng.random(n) > rng.random() * 0.5)
+        ratios.append(_monthly_effective_contribution(
+            pd.Series(values, index=pd.date_range("2023-01", periods=n, freq="MS"))
+        ))
+    assert all(_find_peak_windows(r) == _find_peak_windows_loop(r) for r in ratios), "峰值窗口结果不一致"
+
+    elapsed = {}
+    for func in (_find_peak_windows_loop, _find_peak_windows):
+        t0 = time.perf_counter()
+        for r in ratios:
+            func(r)
+        elapsed[func.__name__] = (time.perf_counter() - t0) / len(ratios)
+    print(f"结果一致；逐窗口 {elapsed['_find_peak_windows_loop'] * 1e3:.2f} ms/次，"
+          f"向量化 {elapsed['_find_peak_windows'] * 1e3:.3f} ms/次，"
+          f"加速 {elapsed['_find_peak_windows_loop'] / elapsed['_find_peak_windows']:.0f}x")
+
+    print("\n=== 批量计算与逐行计算对比 ===")
+    batch_samples = [traffic_samples, traffic_samples[:2], [[0] * 35, []], traffic_samples[1:]]
+    n_months = max(len(v) for sample in batch_samples for v in sample)
+    tensor = np.full((len(batch_samples), 3, n_months), np.nan)
+    sample_lengths = np.zeros((len(batch_samples), 3), dtype=np.int64)
+    for a, sample in enumerate(batch_samples):
+        for k, vals in enumerate(sample):
+            tensor[a, k, :len(vals)] = vals
+            sample_lengths[a, k] = len(vals)
+    batch_results = determine_traffic_cycles_batch(tensor, '2023-01', sample_lengths)
+    row_results = [determine_traffic_cycle(sample, '2023-01', '2025-11') for sample in batch_samples]
+    assert batch_results == row_results, "批量结果与逐行结果不一致"
+    for sample_result in batch_results:
+        print(sample_result)
+
+    print("\n=== 关键词序列缓存：多个 asin 共用核心词 ===")
+    # 200 个 asin，每个 asin 从 30 个核心词中取 5 个
+    keyword_pool = [
+        (rng.gamma(1.0, 1000.0, 35) * (1 + 3 * (np.arange(35) % 12 >= 9))).round().tolist() for _ in range(30)
+    ]
+    shared_samples = [[keyword_pool[k] for k in rng.choice(30, 5, replace=False)] for _ in range(200)]
+    shared_tensor = np.array(shared_samples, dtype=float)
+
+    timings = {}
+    outputs = {}
+    for name, memo in (("不使用缓存", None), ("使用缓存", KeywordFlowMemo())):
+        set_keyword_flow_memo(memo)
+        t0 = time.perf_counter()
+        outputs[name] = [determine_traffic_cycle(sample, '2023-01', '2025-11') for sample in shared_samples]
+        timings[name] = time.perf_counter() - t0
+        assert determine_traffic_cycles_batch(shared_tensor, '2023-01') == outputs[name], "批量结果与逐行结果不一致"
+    assert outputs["使用缓存"] == outputs["不使用缓存"], "使用缓存后结果不一致"
+    print(f"结果一致；逐行计算 不使用缓存 {timings['不使用缓存']:.2f}s，使用缓存 {timings['使用缓存']:.2f}s，"
+          f"命中 {memo.hits} 条，新判定 {memo.misses} 条")
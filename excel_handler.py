@@ -1,12 +1,28 @@
 import io
-from typing import Dict, Optional
-import requests
-from openpyxl import load_workbook
+import struct
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook, Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.drawing.image import Image as XLImage
+from openpyxl.styles import Alignment, Border, Font, Side
 from openpyxl.utils import get_column_letter
 
 from PIL import Image
-import io
+
+from format_excel_style import WRAP_COLUMNS, WIDTH_ONLY_COLUMNS
+from image_fetcher import ProductImageFetcher
+from pipeline_log import OK, SKIPPED, FAILED, error, row_event
+from pipeline_timing import stage, timed
+
+# 图片列配置：列名 -> (图片宽度, 图片高度, 最小列宽, 最小行高)
+CHART_IMAGE_COLUMNS = {
+    "核心词周期图": (400, 200, 60, 150),
+    "销量趋势图": (350, 200, 50, 150),
+    "价格趋势图": (350, 200, 50, 150),
+}
+PRODUCT_IMAGE_COLUMN = ("图片", 75, 75, 14, 80)
 
 def bytes_to_png_bytes(image_bytes: bytes) -> io.BytesIO:
     """把任意图片 bytes 转成 PNG bytes（兼容 webp/jpg/png/gif 等）"""
@@ -21,6 +37,21 @@ def bytes_to_png_bytes(image_bytes: bytes) -> io.BytesIO:
 
 
 
+@timed("写出报告/下载产品图片")
+def download_product_images(urls: list, fetcher: Optional[ProductImageFetcher] = None) -> Dict[int, Optional[bytes]]:
+    """并发下载产品图片（带磁盘缓存，已缓存的图片不再请求网络）
+
+    Args:
+        urls: 图片链接列表（与DataFrame行顺序一致）
+        fetcher: 图片下载器，默认使用 image_fetcher 中的默认配置
+
+    Returns:
+        图片字典，key为行位置（从0开始），value为PNG bytes（下载失败为None）
+    """
+    fetcher = fetcher or ProductImageFetcher()
+    return fetcher.fetch_all([url if isinstance(url, str) else None for url in urls])
+
+
 def insert_traffic_cycle_images(output_path: str, traffic_cycle_images: Dict[int, Optional[bytes]], df_index_mapping: list):
     """插入流量周期图到Excel
     
@@ -89,18 +120,15 @@ def insert_traffic_cycle_images(output_path: str, traffic_cycle_images: Dict[int
 
                         inserted_count += 1
                     except Exception as e:
-                        print(f"插入第 {excel_row} 行（DataFrame索引{df_idx}）流量周期图时出错: {e}")
-                        import traceback
-                        traceback.print_exc()
+                        row_event('插入流量周期图', FAILED, '插入出错', excel_row,
+                                  f"插入第 {excel_row} 行（DataFrame索引{df_idx}）流量周期图时出错: {e}", exc_info=True)
 
             wb.save(output_path)
             print(f'成功插入 {inserted_count} 张流量周期图到 {output_path}')
         else:
             print(f'警告: 未找到"核心词周期图"列，跳过图片插入')
     except Exception as e:
-        print(f'插入流量周期图时出错: {e}')
-        import traceback
-        traceback.print_exc()
+        error(f'插入流量周期图时出错: {e}')
 
 
 def insert_sales_trend_images(output_path: str, sales_trend_images: Dict[int, Optional[bytes]], df_index_mapping: list):
@@ -170,18 +198,15 @@ def insert_sales_trend_images(output_path: str, sales_trend_images: Dict[int, Op
 
                         inserted_count += 1
                     except Exception as e:
-                        print(f"插入第 {excel_row} 行（DataFrame索引{df_idx}）销量趋势图时出错: {e}")
-                        import traceback
-                        traceback.print_exc()
+                        row_event('插入销量趋势图', FAILED, '插入出错', excel_row,
+                                  f"插入第 {excel_row} 行（DataFrame索引{df_idx}）销量趋势图时出错: {e}", exc_info=True)
 
             wb.save(output_path)
             print(f'成功插入 {inserted_count} 张销量趋势图到 {output_path}')
         else:
             print(f'警告: 未找到"销量趋势图"列，跳过图片插入')
     except Exception as e:
-        print(f'插入销量趋势图时出错: {e}')
-        import traceback
-        traceback.print_exc()
+        error(f'插入销量趋势图时出错: {e}')
 
 
 def insert_price_trend_images(output_path: str, price_trend_images: Dict[int, Optional[bytes]], df_index_mapping: list):
@@ -249,25 +274,25 @@ def insert_price_trend_images(output_path: str, price_trend_images: Dict[int, Op
                         ws.add_image(img, f"{col_letter}{excel_row}")
 
                         inserted_count += 1
-                        print(f"  ✓ 插入价格趋势图: Excel行{excel_row}, DataFrame索引{df_idx}, 原始索引{original_idx}")
+                        row_event('插入价格趋势图', OK, '已插入', excel_row,
+                                  f"插入价格趋势图: DataFrame索引{df_idx}, 原始索引{original_idx}")
                     except Exception as e:
-                        print(f"插入第 {excel_row} 行（DataFrame索引{df_idx}）价格趋势图时出错: {e}")
-                        import traceback
-                        traceback.print_exc()
+                        row_event('插入价格趋势图', FAILED, '插入出错', excel_row,
+                                  f"插入第 {excel_row} 行（DataFrame索引{df_idx}）价格趋势图时出错: {e}", exc_info=True)
                 else:
                     if original_idx not in price_trend_images:
-                        print(f"  - 跳过行{excel_row}（原始索引{original_idx}）: 价格趋势图数据不存在")
+                        row_event('插入价格趋势图', SKIPPED, '数据不存在', excel_row,
+                                  f"原始索引{original_idx}: 价格趋势图数据不存在")
                     elif not price_trend_images[original_idx]:
-                        print(f"  - 跳过行{excel_row}（原始索引{original_idx}）: 价格趋势图数据为空")
+                        row_event('插入价格趋势图', SKIPPED, '数据为空', excel_row,
+                                  f"原始索引{original_idx}: 价格趋势图数据为空")
 
             wb.save(output_path)
             print(f'成功插入 {inserted_count} 张价格趋势图到 {output_path}')
         else:
             print(f'警告: 未找到"价格趋势图"列，跳过图片插入')
     except Exception as e:
-        print(f'插入价格趋势图时出错: {e}')
-        import traceback
-        traceback.print_exc()
+        error(f'插入价格趋势图时出错: {e}')
 
 
 def insert_product_images(output_path: str):
@@ -321,64 +346,40 @@ def insert_product_images(output_path: str):
                     cell.hyperlink = None
             
             inserted_img_count = 0
-            session = requests.Session()
+            # 先并发下载全部图片（key为行位置，对应Excel第 pos + 2 行）
+            urls = [ws.cell(row, link_col_idx).value for row in range(2, ws.max_row + 1)]
+            product_images = download_product_images(urls)
 
             for row in range(2, ws.max_row + 1):
-                url = ws.cell(row, link_col_idx).value
-
-                if not url:
+                png_bytes = product_images.get(row - 2)
+                if png_bytes is None:
                     continue
 
-                # 重试机制：最多重试3次
-                max_retries = 3
-                success = False
-                for attempt in range(max_retries):
-                    try:
-                        resp = session.get(str(url), timeout=10)
-                        resp.raise_for_status()
-                        # img_bytes = io.BytesIO(resp.content)  # 碰见.webp保存的问题
-                        # img = XLImage(img_bytes)
-                        png_io = bytes_to_png_bytes(resp.content)  # ✅ 关键：转 PNG
-                        img = XLImage(png_io)
-                        img.width = 75
-                        img.height = 75
-
-                        # 设置列宽和行高
-                        current_width = ws.column_dimensions[col_letter].width
-                        if current_width is None or current_width < 14:
-                            ws.column_dimensions[col_letter].width = 14
-
-                        current_height = ws.row_dimensions[row].height
-                        if current_height is None or current_height < 80:
-                            ws.row_dimensions[row].height = 80
-
-                        # 直接锚定到对应单元格
-                        ws.add_image(img, f"{col_letter}{row}")
-                        
-                        # 插入图片后，立即清除单元格的值和超链接（确保没有URL文本和超链接）
-                        cell = ws.cell(row, img_col_idx)
-                        # 强制清除值（无论是什么值都清除）
-                        cell.value = None
-                        # 清除超链接
-                        if cell.hyperlink is not None:
-                            cell.hyperlink = None
-                        
-                        inserted_img_count += 1
-                        success = True
-                        if attempt > 0:
-                            print(f"  ✓ 插入图片（重试{attempt}次后成功）: Excel行{row}, url={url}")
-                        else:
-                            print(f"  ✓ 插入图片: Excel行{row}, url={url}")
-                        break  # 成功，退出重试循环
-                    except Exception as e:
-                        if attempt < max_retries - 1:
-                            # 不是最后一次尝试，继续重试
-                            print(f"  ⚠ 插入图片失败（尝试 {attempt + 1}/{max_retries}）: Excel行{row}, url={url}, 错误: {e}")
-                            continue
-                        else:
-                            # 最后一次尝试也失败了
-                            print(f"  ✗ 插入图片失败（已重试{max_retries}次）: Excel行{row}, url={url}, 错误: {e}")
-                            break
+                img = XLImage(io.BytesIO(png_bytes))
+                img.width = 75
+                img.height = 75
+
+                # 设置列宽和行高
+                current_width = ws.column_dimensions[col_letter].width
+                if current_width is None or current_width < 14:
+                    ws.column_dimensions[col_letter].width = 14
+
+                current_height = ws.row_dimensions[row].height
+                if current_height is None or current_height < 80:
+                    ws.row_dimensions[row].height = 80
+
+                # 直接锚定到对应单元格
+                ws.add_image(img, f"{col_letter}{row}")
+
+                # 插入图片后，立即清除单元格的值和超链接（确保没有URL文本和超链接）
+                cell = ws.cell(row, img_col_idx)
+                # 强制清除值（无论是什么值都清除）
+                cell.value = None
+                # 清除超链接
+                if cell.hyperlink is not None:
+                    cell.hyperlink = None
+
+                inserted_img_count += 1
 
             # 保存前，再次清除图片列所有单元格的值和超链接（确保没有URL残留）
             for row in range(2, ws.max_row + 1):
@@ -432,9 +433,7 @@ def insert_product_images(output_path: str):
                     if current_width is None or current_width < width:
                         ws.column_dimensions[col_letter].width = width
     except Exception as e:
-        print(f'插入产品图片时出错: {e}')
-        import traceback
-        traceback.print_exc()
+        error(f'插入产品图片时出错: {e}')
 
 
 def delete_column_from_excel(output_path: str, column_name: str):
@@ -465,6 +464,481 @@ def delete_column_from_excel(output_path: str, column_name: str):
         wb.save(output_path)
         print(f'成功删除"{column_name}"列（原第{col_idx}列）')
     except Exception as e:
-        print(f'删除列"{column_name}"时出错: {e}')
-        import traceback
-        traceback.print_exc()
+        error(f'删除列"{column_name}"时出错: {e}')
+
+
+def _excel_value(value):
+    """把 DataFrame 单元格的值转换成 openpyxl 可写入的值（与 df.to_excel 一致：空值写为空单元格）"""
+    if value is None:
+        return None
+    if isinstance(value, (list, dict, tuple, set)):
+        return str(value)
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        return str(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return str(value)
+
+
+def _report_layout(
+    df: pd.DataFrame,
+    traffic_cycle_images: Dict[int, Optional[bytes]],
+    sales_trend_images: Dict[int, Optional[bytes]],
+    price_trend_images: Dict[int, Optional[bytes]],
+    product_images: Optional[Dict[int, Optional[bytes]]],
+    style_config: Optional[Dict[str, Dict[str, float]]],
+) -> dict:
+    """两种报告写出方式共用的准备工作：输出列、列宽、换行列、图片字典"""
+    style_config = style_config or {}
+    wrap_columns = style_config.get("wrap_columns", WRAP_COLUMNS)
+    width_only_columns = style_config.get("width_only_columns", WIDTH_ONLY_COLUMNS)
+
+    # "图片链接"列替换为"图片"列
+    columns = list(df.columns)
+    link_col_name = "图片链接"
+    img_col_name, _, _, img_col_width, _ = PRODUCT_IMAGE_COLUMN
+    has_product_column = link_col_name in columns
+    if has_product_column:
+        if product_images is None:
+            product_images = download_product_images(df[link_col_name].tolist())
+        columns[columns.index(link_col_name)] = img_col_name
+    else:
+        print(f'警告: 未找到"{link_col_name}"列，跳过图片插入')
+        product_images = {}
+
+    widths = {}
+    for col_pos, col_name in enumerate(columns):
+        if col_name in wrap_columns:
+            widths[col_pos] = wrap_columns[col_name]
+        elif col_name in width_only_columns:
+            widths[col_pos] = width_only_columns[col_name]
+        elif col_name in CHART_IMAGE_COLUMNS:
+            widths[col_pos] = CHART_IMAGE_COLUMNS[col_name][2]
+        elif col_name == img_col_name and has_product_column:
+            widths[col_pos] = img_col_width
+
+    return {
+        "columns": columns,
+        "widths": widths,
+        "wrap_positions": {i for i, col_name in enumerate(columns) if col_name in wrap_columns},
+        "chart_positions": {i: col_name for i, col_name in enumerate(columns) if col_name in CHART_IMAGE_COLUMNS},
+        "img_position": columns.index(img_col_name) if has_product_column else None,
+        "chart_images": {
+            "核心词周期图": traffic_cycle_images or {},
+            "销量趋势图": sales_trend_images or {},
+            "价格趋势图": price_trend_images or {},
+        },
+        "product_images": product_images,
+    }
+
+
+def _print_inserted(output_path: str, inserted_counts: Dict[str, int]):
+    for col_name, count in inserted_counts.items():
+        print(f'成功插入 {count} 张{col_name}到 {output_path}')
+    print(f'已生成报告: {output_path}')
+
+
+def build_report(
+    df: pd.DataFrame,
+    output_path: str,
+    traffic_cycle_images: Dict[int, Optional[bytes]],
+    sales_trend_images: Dict[int, Optional[bytes]],
+    price_trend_images: Dict[int, Optional[bytes]],
+    product_images: Optional[Dict[int, Optional[bytes]]] = None,
+    style_config: Optional[Dict[str, Dict[str, float]]] = None,
+):
+    """一次性写出最终报告（单次流式写入，替代 to_excel + 多次 load_workbook/save 的流程）
+
+    输出结果与原流程一致："图片链接"列替换为"图片"列（产品图片），
+    三类图表插入到对应列，并按样式配置设置列宽和自动换行。
+
+    Args:
+        df: 最终的DataFrame（已按输出列顺序排列）
+        output_path: 输出Excel文件路径
+        traffic_cycle_images / sales_trend_images / price_trend_images:
+            图片字典，key为原始DataFrame索引
+        product_images: 产品图片字典，key为行位置（从0开始）；为None时按"图片链接"列下载
+        style_config: 样式配置 {"wrap_columns": {列名: 列宽}, "width_only_columns": {列名: 列宽}}，
+            默认使用 format_excel_style 中的配置
+    """
+    layout = _report_layout(df, traffic_cycle_images, sales_trend_images, price_trend_images,
+                            product_images, style_config)
+    columns = layout["columns"]
+    chart_images = layout["chart_images"]
+    product_images = layout["product_images"]
+    img_col_name, img_width, img_height, _, img_row_height = PRODUCT_IMAGE_COLUMN
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+
+    # 1. 列宽（流式写入前必须设置）
+    for col_pos, width in layout["widths"].items():
+        ws.column_dimensions[get_column_letter(col_pos + 1)].width = width
+
+    # 2. 表头（与 df.to_excel 的表头样式一致）
+    header_font = Font(bold=True)
+    thin = Side(style="thin")
+    header_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    header_alignment = Alignment(horizontal="center", vertical="top")
+    header_cells = []
+    for col_name in columns:
+        cell = WriteOnlyCell(ws, value=col_name)
+        cell.font = header_font
+        cell.border = header_border
+        cell.alignment = header_alignment
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    # 3. 数据行 + 图片
+    wrap_alignment = Alignment(wrap_text=True, vertical='top')
+    wrap_col_positions = layout["wrap_positions"]
+    chart_col_positions = layout["chart_positions"]
+    img_col_position = layout["img_position"]
+    inserted_counts = {col_name: 0 for col_name in list(CHART_IMAGE_COLUMNS) + [img_col_name]}
+
+    for pos, (original_idx, values) in enumerate(zip(df.index, df.itertuples(index=False, name=None))):
+        excel_row = pos + 2  # Excel行号 = DataFrame行位置 + 2（表头1行 + 1）
+        row_height = None
+
+        # 图表
+        for col_pos, col_name in chart_col_positions.items():
+            img_data = chart_images[col_name].get(original_idx)
+            if not img_data:
+                continue
+            width, height, _, min_row_height = CHART_IMAGE_COLUMNS[col_name]
+            img = XLImage(io.BytesIO(img_data))
+            img.width = width
+            img.height = height
+            ws.add_image(img, f"{get_column_letter(col_pos + 1)}{excel_row}")
+            row_height = max(row_height or 0, min_row_height)
+            inserted_counts[col_name] += 1
+
+        # 产品图片
+        if img_col_position is not None and product_images.get(pos):
+            img = XLImage(io.BytesIO(product_images[pos]))
+            img.width = img_width
+            img.height = img_height
+            ws.add_image(img, f"{get_column_letter(img_col_position + 1)}{excel_row}")
+            row_height = max(row_height or 0, img_row_height)
+            inserted_counts[img_col_name] += 1
+
+        # 行高必须在写入该行之前设置
+        if row_height is not None:
+            ws.row_dimensions[excel_row].height = row_height
+
+        row_cells = []
+        for col_pos, value in enumerate(values):
+            # "图片"列只放图片，不保留URL文本
+            value = None if col_pos == img_col_position else _excel_value(value)
+            if col_pos in wrap_col_positions:
+                cell = WriteOnlyCell(ws, value=value)
+                cell.alignment = wrap_alignment
+                row_cells.append(cell)
+            else:
+                row_cells.append(value)
+        ws.append(row_cells)
+
+    with stage("写出报告/保存"):
+        wb.save(output_path)
+    _print_inserted(output_path, inserted_counts)
+
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def image_size(img_data: bytes) -> Tuple[int, int, float, float]:
+    """
+    图片的 (宽, 高, 水平 DPI, 垂直 DPI)，不解码像素
+
+    PNG 直接读取 IHDR / pHYs 块（没有 pHYs 时 DPI 为 96），其他格式用 PIL 读取头部
+    """
+    if img_data[:8] == _PNG_SIGNATURE:
+        width, height = struct.unpack(">II", img_data[16:24])
+        x_dpi = y_dpi = 96.0
+        offset = 8
+        while offset + 8 <= len(img_data):
+            length, chunk_type = struct.unpack(">I4s", img_data[offset:offset + 8])
+            if chunk_type == b"pHYs":
+                x_ppu, y_ppu, unit = struct.unpack(">IIB", img_data[offset + 8:offset + 17])
+                # 单位为米时换算成 DPI
+                if unit == 1:
+                    x_dpi, y_dpi = x_ppu * 0.0254, y_ppu * 0.0254
+                break
+            if chunk_type in (b"IDAT", b"IEND"):
+                break
+            offset += 12 + length
+        return width, height, x_dpi or 96.0, y_dpi or 96.0
+    with Image.open(io.BytesIO(img_data)) as im:
+        width, height = im.size
+        x_dpi, y_dpi = im.info.get("dpi") or (96, 96)
+    return width, height, float(x_dpi or 96), float(y_dpi or 96)
+
+
+def xlsxwriter_image_scale(size: Tuple[int, int, float, float], width: float, height: float) -> Dict[str, float]:
+    """
+    xlsxwriter 按图片原始像素和 DPI 计算显示尺寸（像素 * 96 / DPI），
+    换算成显示为 width x height 像素所需的缩放比例（size 为 image_size 的返回值）
+    """
+    native_width, native_height, x_dpi, y_dpi = size
+    return {
+        "x_scale": width / (native_width * 96.0 / x_dpi),
+        "y_scale": height / (native_height * 96.0 / y_dpi),
+    }
+
+
+def build_report_xlsxwriter(
+    df: pd.DataFrame,
+    output_path: str,
+    traffic_cycle_images: Dict[int, Optional[bytes]],
+    sales_trend_images: Dict[int, Optional[bytes]],
+    price_trend_images: Dict[int, Optional[bytes]],
+    product_images: Optional[Dict[int, Optional[bytes]]] = None,
+    style_config: Optional[Dict[str, Dict[str, float]]] = None,
+):
+    """用 xlsxwriter 的 constant_memory 模式写出最终报告（参数和输出内容与 build_report 相同）
+
+    按行顺序一次写完：每行先设置行高、插入图片，再写单元格，写完的行立即刷到临时文件，
+    不在内存中保留单元格对象。图片按 (行, 列) 锚定，随单元格移动、不随单元格缩放。
+    """
+    import xlsxwriter
+
+    layout = _report_layout(df, traffic_cycle_images, sales_trend_images, price_trend_images,
+                            product_images, style_config)
+    columns = layout["columns"]
+    chart_images = layout["chart_images"]
+    product_images = layout["product_images"]
+    img_col_name, img_width, img_height, _, img_row_height = PRODUCT_IMAGE_COLUMN
+
+    workbook = xlsxwriter.Workbook(output_path, {
+        "constant_memory": True,
+        # 与 openpyxl 写出的内容一致：字符串原样写入，不转换成公式或超链接
+        "strings_to_formulas": False,
+        "strings_to_urls": False,
+        "default_date_format": "yyyy-mm-dd hh:mm:ss",
+        "nan_inf_to_errors": True,
+    })
+    ws = workbook.add_worksheet("Sheet1")
+    header_format = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+    wrap_format = workbook.add_format({"text_wrap": True, "valign": "top"})
+
+    # 1. 列宽
+    for col_pos, width in layout["widths"].items():
+        ws.set_column(col_pos, col_pos, width)
+
+    # 2. 表头
+    for col_pos, col_name in enumerate(columns):
+        ws.write_string(0, col_pos, col_name, header_format)
+
+    # 3. 数据行 + 图片（constant_memory 模式下必须按行顺序写）
+    wrap_col_positions = layout["wrap_positions"]
+    chart_col_positions = layout["chart_positions"]
+    img_col_position = layout["img_position"]
+    inserted_counts = {col_name: 0 for col_name in list(CHART_IMAGE_COLUMNS) + [img_col_name]}
+
+    for pos, (original_idx, values) in enumerate(zip(df.index, df.itertuples(index=False, name=None))):
+        row = pos + 1  # 表头占第 0 行
+        row_height = None
+
+        for col_pos, col_name in chart_col_positions.items():
+            img_data = chart_images[col_name].get(original_idx)
+            if not img_data:
+                continue
+            width, height, _, min_row_height = CHART_IMAGE_COLUMNS[col_name]
+            ws.insert_image(row, col_pos, f"{col_name}{row + 1}.png", {
+                "image_data": io.BytesIO(img_data), "object_position": 2,
+                **xlsxwriter_image_scale(image_size(img_data), width, height),
+            })
+            row_height = max(row_height or 0, min_row_height)
+            inserted_counts[col_name] += 1
+
+        if img_col_position is not None and product_images.get(pos):
+            img_data = product_images[pos]
+            ws.insert_image(row, img_col_position, f"{img_col_name}{row + 1}.png", {
+                "image_data": io.BytesIO(img_data), "object_position": 2,
+                **xlsxwriter_image_scale(image_size(img_data), img_width, img_height),
+            })
+            row_height = max(row_height or 0, img_row_height)
+            inserted_counts[img_col_name] += 1
+
+        if row_height is not None:
+            ws.set_row(row, row_height)
+
+        for col_pos, value in enumerate(values):
+            # "图片"列只放图片，不保留URL文本
+            if col_pos == img_col_position:
+                continue
+            cell_format = wrap_format if col_pos in wrap_col_positions else None
+            value = _excel_value(value)
+            if value is None:
+                if cell_format is not None:
+                    ws.write_blank(row, col_pos, None, cell_format)
+            elif isinstance(value, str):
+                ws.write_string(row, col_pos, value, cell_format)
+            else:
+                ws.write(row, col_pos, value, cell_format)
+
+    with stage("写出报告/保存"):
+        workbook.close()
+    _print_inserted(output_path, inserted_counts)
+
+
+# 报告写出方式（main.py --report-backend）
+REPORT_BACKENDS = {
+    "openpyxl": build_report,
+    "xlsxwriter": build_report_xlsxwriter,
+}
+
+
+if __name__ == '__main__':
+    # 两种写出方式的耗时 / 峰值内存对比 + 内容一致性检查
+    # 输入只构造一次，每种方式在单独的子进程中运行（峰值 RSS 互不影响）：python excel_handler.py [行数]
+    import json
+    import os
+    import resource
+    import subprocess
+    import sys
+    import tempfile
+    import time
+
+    def synthetic_report_inputs(n_rows: int):
+        """按 input_file/kinds 下的真实数据绘制图表，循环使用，构造 n_rows 行的报告输入"""
+        import contextlib
+        import glob
+
+        import plot_search_trend as plots
+        from trend_decoder import decode_payload
+
+        plots.set_chart_cache(None)
+        charts = {"核心词周期图": [], "销量趋势图": [], "价格趋势图": []}
+        with contextlib.redirect_stdout(io.StringIO()):
+            for path in sorted(glob.glob('input_file/kinds/*/asin详细数据-*.xlsx'))[:1]:
+                source = pd.read_excel(path)
+                for value in source['核心词周期数据'].dropna()[:20]:
+                    charts["核心词周期图"].append(plots.plot_traffic_cycle_json_to_bytes(decode_payload(value)))
+                for value in source['销量数据'].dropna()[:20]:
+                    charts["销量趋势图"].append(plots.plot_sales_trend_to_bytes(decode_payload(value)))
+            for i in range(20):
+                times = [f'2025-{m:02d}-01 00:00' for m in range(1, 13)]
+                charts["价格趋势图"].append(plots.plot_price_trend_to_bytes([10 + (m * i) % 7 for m in range(12)], times))
+        charts = {name: [c.getvalue() for c in images if c is not None] for name, images in charts.items()}
+
+        rng = np.random.default_rng(0)
+        product_pool = []
+        for i in range(20):
+            bio = io.BytesIO()
+            Image.new("RGB", (300, 300), tuple(int(c) for c in rng.integers(0, 255, 3))).save(bio, format="PNG")
+            product_pool.append(bio.getvalue())
+
+        df = pd.DataFrame({
+            "商品链接": [f"https://www.amazon.com/dp/B{i:09d}" for i in range(n_rows)],
+            "图片链接": [f"https://example.com/{i}.jpg" for i in range(n_rows)],
+            "asin": [f"B{i:09d}" for i in range(n_rows)],
+            "产品标题": ["Dinosaur Party Plates and Napkins Serves 16, Birthday Decorations " * 2] * n_rows,
+            "上架时间": pd.Timestamp("2024-05-01") + pd.to_timedelta(np.arange(n_rows), unit="D"),
+            "核心词周期图": None,
+            "核心词周期": [f"强周期型：{i % 12 + 1}月-{(i + 3) % 12 + 1}月" for i in range(n_rows)],
+            "销量趋势图": None,
+            "上月销量": [float(i % 500) if i % 9 else np.nan for i in range(n_rows)],
+            "价格趋势图": None,
+            "价格趋势类型": ["上升", "下降", "平稳", "数据不足"] * (n_rows // 4) + ["上升"] * (n_rows % 4),
+            "价格": rng.uniform(5, 30, n_rows).round(2),
+            "规则层建议": ["销量达标；价格在区间内；=可以开发"] * n_rows,
+        })
+        # 循环使用的图片各加一个 tEXt 块，使每张图片内容不同（与真实报告一样，xlsxwriter 无法按内容去重）
+        images = {
+            name: {i: unique_png(pool[i % len(pool)], f"{name}{i}") for i in range(n_rows) if i % 11}
+            for name, pool in charts.items()
+        }
+        products = {i: unique_png(product_pool[i % len(product_pool)], f"图片{i}") for i in range(n_rows) if i % 13}
+        return df, images, products
+
+    def unique_png(png: bytes, text: str) -> bytes:
+        """在 IEND 之前插入一个 tEXt 块"""
+        import struct
+        import zlib
+
+        data = b"Comment\x00" + text.encode("utf-8")
+        chunk = struct.pack(">I", len(data)) + b"tEXt" + data + struct.pack(">I", zlib.crc32(b"tEXt" + data))
+        return png[:-12] + chunk + png[-12:]
+
+    def read_back(path: str):
+        """读出单元格值、行高、列宽、换行列、图片位置和尺寸"""
+        wb = load_workbook(path)
+        ws = wb.active
+        values = [[cell.value for cell in row] for row in ws.iter_rows()]
+        heights = {r: d.height for r, d in ws.row_dimensions.items() if d.height}
+        wrapped = sorted({cell.column for row in ws.iter_rows(min_row=2) for cell in row if cell.alignment.wrap_text})
+        # openpyxl 读回的 img.width / height 是图片原始尺寸，显示尺寸从 drawing XML 中读取
+        import zipfile
+
+        from split_excel_by_description_with_images import sheet_images, sheet_parts
+
+        with zipfile.ZipFile(path) as zf:
+            pictures = sorted((row, col, cx, cy) for row, col, _, cx, cy in sheet_images(zf, sheet_parts(zf)[0][1]))
+        return values, heights, wrapped, pictures
+
+    def rss_kb(field: str) -> int:
+        """当前（VmRSS）或峰值（VmHWM）RSS，单位 KB；非 Linux 时都用 ru_maxrss"""
+        try:
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith(field + ':'):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    def reset_peak_rss():
+        """把峰值 RSS 重置为当前值（Linux），只统计写报告期间的峰值"""
+        try:
+            with open('/proc/self/clear_refs', 'w') as f:
+                f.write('5')
+        except OSError:
+            pass
+
+    if len(sys.argv) > 2:
+        # 子进程：python excel_handler.py 输入pickle 写出方式 输出路径
+        import pickle
+
+        with open(sys.argv[1], 'rb') as f:
+            df, images, products = pickle.load(f)
+        backend, out_path = sys.argv[2], sys.argv[3]
+        base_kb = rss_kb("VmRSS")
+        reset_peak_rss()
+        t0 = time.perf_counter()
+        REPORT_BACKENDS[backend](df, out_path, images["核心词周期图"], images["销量趋势图"], images["价格趋势图"],
+                                 product_images=products)
+        elapsed = time.perf_counter() - t0
+        peak_kb = rss_kb("VmHWM")
+        print(json.dumps({"seconds": elapsed, "peak_mb": peak_kb / 1024, "delta_mb": (peak_kb - base_kb) / 1024}))
+        sys.exit(0)
+
+    import pickle
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        inputs_path = os.path.join(tmp_dir, "inputs.pkl")
+        with open(inputs_path, 'wb') as f:
+            pickle.dump(synthetic_report_inputs(n_rows), f)
+        stats, contents = {}, {}
+        for backend in REPORT_BACKENDS:
+            out_path = os.path.join(tmp_dir, f"{backend}.xlsx")
+            proc = subprocess.run([sys.executable, __file__, inputs_path, backend, out_path],
+                                  capture_output=True, text=True, check=True)
+            stats[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+            contents[backend] = read_back(out_path)
+            stats[backend]["file_mb"] = os.path.getsize(out_path) / 2 ** 20
+        names = ("单元格值", "行高", "换行列", "图片位置和尺寸")
+        for name, a, b in zip(names, contents["openpyxl"], contents["xlsxwriter"]):
+            assert a == b, f"{name}不一致"
+    print(f"内容一致：{n_rows} 行，{len(contents['openpyxl'][3])} 张图片")
+    for backend, stat in stats.items():
+        print(f"{backend:>10}: 耗时 {stat['seconds']:.2f}s，峰值 RSS {stat['peak_mb']:.0f} MB"
+              f"（写报告增加 {stat['delta_mb']:.0f} MB），文件 {stat['file_mb']:.1f} MB")
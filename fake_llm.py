@@ -0,0 +1,83 @@
+import json
+import re
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# 提取主题时忽略的词（数量、规格、泛品类词等）
+_STOP_WORDS = {
+    'pcs', 'pc', 'piece', 'pieces', 'set', 'serves', 'party', 'supplies', 'decorations', 'decoration',
+    'tableware', 'plates', 'plate', 'napkins', 'napkin', 'cups', 'banner', 'banners', 'centerpieces',
+    'birthday', 'for', 'and', 'with', 'the', 'of', 'a', 'an', 'paper', 'kit', 'pack',
+}
+
+
+def fake_theme(title: str) -> str:
+    """按简单规则从标题中取主题：取前两个非数字、非泛品类的单词"""
+    words = re.findall(r"[A-Za-z][A-Za-z']*", title)
+    picked = [w for w in words if w.lower() not in _STOP_WORDS][:2]
+    return ' '.join(w.capitalize() for w in picked) or 'Birthday'
+
+
+class FakeThemeLLM(BaseChatModel):
+    """
+    离线主题提取用的假模型（不联网、不需要 API key）
+
+    从消息中解析 JSON 标题数组，按 fake_theme 规则返回等长的 JSON 主题数组，
+    可用于在本地测试 extract_themes_from_titles 的分批、并发、缓存和失败拆分逻辑。
+
+    参数
+    ------
+    delay : float
+        每次请求的模拟耗时（秒）
+    max_titles : int
+        单次请求能完整返回的最大标题数，超过时返回被截断的 JSON（模拟输出被截断）
+    """
+
+    delay: float = 0.0
+    max_titles: Optional[int] = None
+    call_count: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return 'fake-theme'
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.call_count += 1
+        if self.delay:
+            time.sleep(self.delay)
+
+        content = str(messages[-1].content)
+        titles = json.loads(content[content.index('['):])
+        themes = [fake_theme(title) for title in titles]
+        text = json.dumps(themes, ensure_ascii=False)
+        if self.max_titles is not None and len(titles) > self.max_titles:
+            text = text[:len(text) // 2]
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+if __name__ == '__main__':
+    from data_processor import extract_themes_from_titles
+
+    demo_titles = [
+        f'{title} - Style {i}'
+        for i in range(10)
+        for title in [
+            '197 Pcs Building Blocks Birthday Paper Plates Tableware Set',
+            'New Years Eve Party Supplies 2026, Happy New Years Party Decorations',
+            'Dinosaur Party Plates and Napkins Serves 16',
+        ]
+    ]
+    llm = FakeThemeLLM(max_titles=4)
+    themes = extract_themes_from_titles(demo_titles, llm, batch_size=8, max_concurrency=4, cache_path=None)
+    assert themes == [fake_theme(t) for t in demo_titles]
+    print(f'请求次数: {llm.call_count}')
@@ -2,6 +2,26 @@ from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter
 from openpyxl.styles import Alignment
 
+from pipeline_log import error
+
+
+# 需要设置列宽和换行的列（列宽增大 + 数据换行）
+WRAP_COLUMNS = {
+    "商品链接": 30,
+    "产品标题": 40,
+    "核心词周期": 40,
+    "规则层建议": 40,
+    '开发结论说明': 40,
+}
+
+# 只需要增大列宽的列
+WIDTH_ONLY_COLUMNS = {
+    "asin": 15,
+    "主题": 15,
+    "上架时间": 15,
+    "开发结论": 15
+}
+
 
 def format_excel_style(excel_path: str):
     """
@@ -16,22 +36,8 @@ def format_excel_style(excel_path: str):
         wb = load_workbook(excel_path)
         ws = wb.active
         
-        # 需要设置列宽和换行的列（列宽增大 + 数据换行）
-        wrap_columns = {
-            "商品链接": 30,
-            "产品标题": 40,
-            "核心词周期": 40,
-            "规则层建议": 40,
-            '开发结论说明': 40,
-        }
-        
-        # 只需要增大列宽的列
-        width_only_columns = {
-            "asin": 15,
-            "主题": 15,
-            "上架时间": 15,
-            "开发结论": 15
-        }
+        wrap_columns = WRAP_COLUMNS
+        width_only_columns = WIDTH_ONLY_COLUMNS
         
         # 创建自动换行的对齐方式
         wrap_alignment = Alignment(wrap_text=True, vertical='top')
@@ -66,7 +72,5 @@ def format_excel_style(excel_path: str):
         print(f'已调整Excel文件样式: {excel_path}')
         
     except Exception as e:
-        print(f'调整Excel文件样式时出错: {e}')
-        import traceback
-        traceback.print_exc()
+        error(f'调整Excel文件样式时出错: {e}')
 
@@ -0,0 +1,214 @@
+import hashlib
+import io
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, List
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from PIL import Image
+
+from pipeline_log import OK, FAILED, RETRIED, count, debug, info, progress, row_event
+
+# 产品图片缓存目录（按 URL 哈希存放已转换、已缩放的 PNG）
+DEFAULT_CACHE_DIR = 'cache/product_images'
+
+
+def to_thumbnail_png(image_bytes: bytes, max_size: int = 150) -> bytes:
+    """把任意图片 bytes（webp/jpg/png/gif 等）转成缩放后的 PNG bytes
+
+    报告中产品图片只显示 75x75，按 max_size 等比缩小后再保存，避免把原图尺寸的 PNG 写进 Excel。
+    """
+    with Image.open(io.BytesIO(image_bytes)) as im:
+        # 统一转 RGBA，避免透明/调色板模式导致异常
+        im = im.convert("RGBA")
+        im.thumbnail((max_size, max_size))
+        bio_out = io.BytesIO()
+        im.save(bio_out, format="PNG")
+        return bio_out.getvalue()
+
+
+class ProductImageFetcher:
+    """
+    并发下载产品图片，带每个域名的连接数限制、指数退避重试和磁盘缓存
+
+    缓存以 URL 的哈希为 key，保存已转换、已缩放的 PNG，
+    同一天重跑或不同日期重复出现的 ASIN 不再需要网络请求和 PIL 处理。
+
+    参数
+    ------
+    cache_dir : str
+        缓存目录，None 表示不使用磁盘缓存
+    max_workers : int
+        下载线程数
+    per_host : int
+        同一域名同时进行的最大请求数
+    max_retries : int
+        每个 URL 的最大尝试次数
+    backoff : float
+        重试等待的基础秒数，第 n 次重试等待 backoff * 2**(n-1) 秒（加少量随机抖动）
+    timeout : float
+        单次请求超时时间（秒）
+    max_size : int
+        缓存 PNG 的最大边长（像素）
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        max_workers: int = 8,
+        per_host: int = 4,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 10,
+        max_size: int = 150,
+    ):
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_size = max_size
+
+        self._local = threading.local()
+        self._host_lock = threading.Lock()
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._stats_lock = threading.Lock()
+        self.stats = {"cache_hits": 0, "downloaded": 0, "failed": 0}
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    # ---------- 缓存 ----------
+    def _cache_path(self, url: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}_{self.max_size}.png")
+
+    def _read_cache(self, url: str) -> Optional[bytes]:
+        path = self._cache_path(url)
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                return f.read()
+        return None
+
+    def _write_cache(self, url: str, png_bytes: bytes):
+        path = self._cache_path(url)
+        if not path:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 先写临时文件再替换，避免并发或中断时留下不完整的缓存
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(png_bytes)
+        os.replace(tmp_path, path)
+
+    # ---------- 网络 ----------
+    def _session(self) -> requests.Session:
+        """每个线程一个 Session（requests.Session 不保证线程安全）"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.per_host, pool_maxsize=self.per_host)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+        return session
+
+    def _host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._host_lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.per_host)
+                self._host_semaphores[host] = semaphore
+            return semaphore
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def fetch(self, url: str) -> Optional[bytes]:
+        """获取单张产品图片的 PNG bytes，优先读缓存，失败返回 None"""
+        url = str(url)
+        cached = self._read_cache(url)
+        if cached is not None:
+            self._count("cache_hits")
+            count('产品图片', '缓存命中')
+            return cached
+
+        semaphore = self._host_semaphore(url)
+        for attempt in range(self.max_retries):
+            if attempt > 0:
+                time.sleep(self.backoff * (2 ** (attempt - 1)) * (1 + random.random() * 0.1))
+            try:
+                with semaphore:
+                    resp = self._session().get(url, timeout=self.timeout)
+                if 400 <= resp.status_code < 500 and resp.status_code != 429:
+                    # 客户端错误（如 404）重试也不会成功
+                    row_event('产品图片', FAILED, f'HTTP {resp.status_code}',
+                              message=f'下载图片失败（HTTP {resp.status_code}）: url={url}')
+                    break
+                resp.raise_for_status()
+                png_bytes = to_thumbnail_png(resp.content, self.max_size)
+                self._write_cache(url, png_bytes)
+                self._count("downloaded")
+                count('产品图片', OK, '已下载')
+                if attempt > 0:
+                    debug(f'下载图片（重试{attempt}次后成功）: url={url}')
+                return png_bytes
+            except Exception as e:
+                if attempt < self.max_retries - 1:
+                    row_event('产品图片', RETRIED, type(e).__name__, level=logging.INFO,
+                              message=f'下载图片失败（尝试 {attempt + 1}/{self.max_retries}）: url={url}, 错误: {e}')
+                else:
+                    row_event('产品图片', FAILED, type(e).__name__,
+                              message=f'下载图片失败（已重试{self.max_retries}次）: url={url}, 错误: {e}')
+        self._count("failed")
+        return None
+
+    def fetch_all(self, urls: List[Optional[str]]) -> Dict[int, Optional[bytes]]:
+        """
+        并发获取一组产品图片
+
+        参数
+        ------
+        urls : list
+            图片链接列表（与DataFrame行顺序一致），空值会被跳过
+
+        返回
+        ------
+        Dict[int, Optional[bytes]]
+            key为行位置（从0开始），value为PNG bytes（获取失败为None）
+        """
+        positions: Dict[str, List[int]] = {}
+        for pos, url in enumerate(urls):
+            if not url or not isinstance(url, str):
+                continue
+            positions.setdefault(url, []).append(pos)
+
+        # 相同 URL 只下载一次
+        unique_urls = list(positions)
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            results = []
+            for png_bytes in executor.map(self.fetch, unique_urls):
+                results.append(png_bytes)
+                progress(len(results), len(unique_urls), '下载产品图片')
+
+        product_images: Dict[int, Optional[bytes]] = {}
+        for url, png_bytes in zip(unique_urls, results):
+            for pos in positions[url]:
+                product_images[pos] = png_bytes
+
+        info(
+            f"产品图片：共 {len(unique_urls)} 个链接，缓存命中 {self.stats['cache_hits']}，"
+            f"下载 {self.stats['downloaded']}，失败 {self.stats['failed']}"
+        )
+        return product_images
@@ -1,3 +1,4 @@
+import argparse
 import os
 import sys
 
@@ -6,20 +7,17 @@ from datetime import datetime
 from typing import Dict, Optional
 from dotenv import load_dotenv
 
-from data_processor import (
-    load_and_merge_data,
-    extract_themes_from_titles,
-    load_price_trend_data,
-    process_row_data
-)
-from excel_handler import (
-    insert_traffic_cycle_images,
-    insert_sales_trend_images,
-    insert_price_trend_images,
-    insert_product_images,
-    delete_column_from_excel
-)
-from format_excel_style import format_excel_style
+from data_processor import extract_themes_from_titles
+from merge_cache import load_and_merge_data_cached, read_excel_cached
+from price_trend_store import load_price_trend_store
+from result_store import RowResultStore
+from row_engine import process_rows
+from title_features import add_title_features
+from fake_llm import FakeThemeLLM
+from excel_handler import REPORT_BACKENDS
+from plot_search_trend import DEFAULT_CHART_DPI
+from pipeline_log import LOG_LEVELS, PipelineLog, get_pipeline_log, set_pipeline_log
+from pipeline_timing import PROFILERS, RunProfiler, StageTimer, get_stage_timer, set_stage_timer, step_clock
 from langchain_openai import ChatOpenAI
 from analyze_product_value import analyze_product_value_nr, analyze_product_value_bs
 
@@ -113,7 +111,51 @@ def prepare_dataframe_columns(df: pd.DataFrame) -> list:
     return columns_order
 
 
+def parse_args() -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description='商品流量周期分析')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='逐行处理使用的进程数，1 为串行处理，0 为使用全部 CPU 核心')
+    parser.add_argument('--theme-batch-size', type=int, default=50,
+                        help='主题提取每次请求包含的标题数')
+    parser.add_argument('--theme-concurrency', type=int, default=4,
+                        help='主题提取的最大并发请求数')
+    parser.add_argument('--fake-llm', action='store_true',
+                        help='使用本地假模型提取主题（离线测试用，不需要 API key）')
+    parser.add_argument('--no-input-cache', action='store_true',
+                        help='不使用输入数据缓存，每次重新解析 Excel 和价格趋势 JSON')
+    parser.add_argument('--write-merged', action='store_true',
+                        help='保存中间结果 merged.xlsx')
+    parser.add_argument('--chart-dpi', type=int, default=DEFAULT_CHART_DPI,
+                        help=f'趋势图 PNG 的分辨率（默认 {DEFAULT_CHART_DPI}，报告中按 350~400 像素显示）')
+    parser.add_argument('--incremental', action='store_true',
+                        help='增量模式：输入数据与上次相同的 ASIN 复用保存的结果和趋势图，只处理新增或变化的行')
+    parser.add_argument('--report-backend', choices=list(REPORT_BACKENDS), default='openpyxl',
+                        help='写出报告的方式：openpyxl（默认）或 xlsxwriter（constant_memory 模式，逐行写出，内存占用更低）')
+    parser.add_argument('--timing', action='store_true',
+                        help='统计各阶段和逐行子步骤的耗时，运行结束时打印汇总并保存 JSON 到结果目录')
+    parser.add_argument('--profile', choices=PROFILERS,
+                        help='对整次运行做性能分析（cprofile 或 pyinstrument），结果保存到结果目录')
+    parser.add_argument('--log-level', choices=list(LOG_LEVELS), default='warning',
+                        help='控制台日志级别（默认 warning：只显示进度条、出错消息和最终汇总；debug 显示每行的处理过程）')
+    parser.add_argument('--log-jsonl',
+                        help='把所有日志消息（不限流，含出错堆栈）逐条写到该 JSONL 文件')
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
+    args = parse_args()
+
+    # 日志：逐行消息按级别输出并限流，出错原因计数，结束时打印汇总
+    set_pipeline_log(PipelineLog(level=LOG_LEVELS[args.log_level], jsonl_path=args.log_jsonl))
+
+    # 阶段计时（未指定 --timing 时所有计时都是空操作）
+    if args.timing:
+        set_stage_timer(StageTimer())
+    profiler = RunProfiler(args.profile) if args.profile else None
+    if profiler is not None:
+        profiler.start()
+    clock = step_clock()
 
     # 哪种模式开发
     development_kind = os.getenv('DEVELOPMENT_KIND')
@@ -132,12 +174,14 @@ if __name__ == '__main__':
         price_trend_file_path = f'input_file/rank/{today}/crawl-{today.replace("-", "")}-price-trend.json'
         rank_name = 'bs'
         print(f'正在合并{development_kind}数据')
-        df = load_and_merge_data(file_path1, file_path2)
+        df = load_and_merge_data_cached(file_path1, file_path2, use_cache=not args.no_input_cache)
+        # 追加标题特征列，规则判断时直接使用（pcs 数量、9inch / 7inch），不再逐行解析标题
+        df = add_title_features(df)
         output_dir = f'./result/bs'
     elif development_kind == '店铺开发':
         file_path1 = f'input_file/store/{today}/crawl-{today.replace("-", "")}-store.xlsx'
         price_trend_file_path = f'input_file/store/{today}/crawl-{today.replace("-", "")}-price-trend.json'
-        df = pd.read_excel(file_path1)
+        df = read_excel_cached(file_path1, use_cache=not args.no_input_cache)
         df = df.rename(columns={
             'price':'价格',
             "title": "产品标题",
@@ -147,17 +191,16 @@ if __name__ == '__main__':
         })
 
         if '产品标题' in df.columns:
-            # 创建排序键：包含photography的为1（排后），不包含的为0（排前）
-            df['_sort_key'] = df['产品标题'].astype(str).str.contains('photography', case=False, na=False).astype(int)
-            # 按照排序键排序，然后删除临时列
-            df = df.sort_values('_sort_key', kind='stable').drop(columns='_sort_key')
+            # 追加标题特征列（规则判断时直接使用 pcs 数量），包含photography的排后，不包含的排前
+            df = add_title_features(df)
+            df = df.sort_values('标题_photography', kind='stable')
             # 重置索引
             df = df.reset_index(drop=True)
         output_dir = f'./result/store'
     elif development_kind == '类目开发':
         file_path1 = f'input_file/kinds/{today}/asin详细数据-{today}.xlsx'
         price_trend_file_path = f'input_file/kinds/{today}/asin详细数据-{today}.json'
-        df = pd.read_excel(file_path1)
+        df = read_excel_cached(file_path1, use_cache=not args.no_input_cache)
         df = df.rename(columns={
             'price':'价格',
             "title": "产品标题",
@@ -173,30 +216,45 @@ if __name__ == '__main__':
         sys.exit("df is None, exiting.")
 
     print(df.head())
+    clock.lap('加载数据')
 
     # 保存中间结果
-    df.to_excel("merged.xlsx", index=False)
+    if args.write_merged:
+        df.to_excel("merged.xlsx", index=False)
 
     # 2. 提取主题
     titles = df['产品标题'].dropna().astype(str).tolist()
 
-    # 从环境变量读取API key
-    api_key = os.getenv('AI_KEY_302')
-    if not api_key:
-        raise ValueError("未找到 OPENAI_API_KEY 环境变量，请在 .env 文件中设置")
-
-    llm = ChatOpenAI(
-        model="gpt-5",
-        api_key=api_key,
-        base_url="https://api.302.ai/v1"
+    if args.fake_llm:
+        llm = FakeThemeLLM()
+    else:
+        # 从环境变量读取API key
+        api_key = os.getenv('AI_KEY_302')
+        if not api_key:
+            raise ValueError("未找到 OPENAI_API_KEY 环境变量，请在 .env 文件中设置")
+
+        llm = ChatOpenAI(
+            model="gpt-5",
+            api_key=api_key,
+            base_url="https://api.302.ai/v1"
+        )
+
+    title_theme = extract_themes_from_titles(
+        titles,
+        llm,
+        batch_size=args.theme_batch_size,
+        max_concurrency=args.theme_concurrency
     )
-
-    title_theme = extract_themes_from_titles(titles, llm)
     df['主题'] = title_theme
     # df['主题'] = [i for i in range(0,100)]
+    clock.lap('主题提取')
 
     # 3. 加载价格趋势数据
-    price_trend_data = load_price_trend_data(price_trend_file_path)
+    # 只解码当前表格中的 ASIN，价格为 float64 数组、时间为时间戳数组
+    price_trend_data = load_price_trend_store(
+        price_trend_file_path, asins=df['asin'], use_cache=not args.no_input_cache
+    )
+    clock.lap('价格趋势数据')
 
     # 4. 初始化图片存储字典
     traffic_cycle_images: Dict[int, Optional[bytes]] = {}
@@ -204,48 +262,30 @@ if __name__ == '__main__':
     price_trend_images: Dict[int, Optional[bytes]] = {}
 
     # 5. 处理每一行数据
-    i = 0
-    for idx, row in df.iterrows():
-        print(f'第{i}行')
-        if i in [21]:
-            print(i)
-        i = i + 1
-        # if i == 21:
-        #     break
-        if development_kind == '榜单开发':
-            process_row_data(
-                idx=idx,
-                row=row,
-                df=df,
-                price_trend_data=price_trend_data,
-                traffic_cycle_images=traffic_cycle_images,
-                sales_trend_images=sales_trend_images,
-                price_trend_images=price_trend_images,
-                masterKind=masterKind,
-                slaverKind=slaverKind
-            )
-        elif development_kind == '店铺开发':
-            process_row_data(
-                idx=idx,
-                row=row,
-                df=df,
-                price_trend_data=price_trend_data,
-                traffic_cycle_images=traffic_cycle_images,
-                sales_trend_images=sales_trend_images,
-                price_trend_images=price_trend_images,
-            )
-        elif development_kind == '类目开发':
-            process_row_data(
-                idx=idx,
-                row=row,
-                df=df,
-                price_trend_data=price_trend_data,
-                traffic_cycle_images=traffic_cycle_images,
-                sales_trend_images=sales_trend_images,
-                price_trend_images=price_trend_images,
-            )
-        else:
-            sys.exit("没有指定开发类型")
+    if development_kind == '榜单开发':
+        kind_kwargs = {'masterKind': masterKind, 'slaverKind': slaverKind}
+    elif development_kind in ('店铺开发', '类目开发'):
+        kind_kwargs = {}
+    else:
+        sys.exit("没有指定开发类型")
+
+    result_store = RowResultStore() if args.incremental else None
+    try:
+        process_rows(
+            df=df,
+            price_trend_data=price_trend_data,
+            traffic_cycle_images=traffic_cycle_images,
+            sales_trend_images=sales_trend_images,
+            price_trend_images=price_trend_images,
+            workers=args.workers,
+            chart_dpi=args.chart_dpi,
+            result_store=result_store,
+            **kind_kwargs
+        )
+    finally:
+        if result_store is not None:
+            result_store.close()
+    clock.lap('逐行处理')
 
     # 6. 准备输出路径和列顺序
     date_str = datetime.now().strftime("%Y%m%d")
@@ -264,29 +304,34 @@ if __name__ == '__main__':
     elif development_kind == '店铺开发':
         df = analyze_product_value_bs(data=df)
     print('产品潜在价值分析完成')
+    clock.lap('产品价值分析')
 
     columns_order = prepare_dataframe_columns(df)
     df = df[columns_order]
 
-    # 7. 保存DataFrame到Excel
-    df.to_excel(output_path, index=False)
-
-    # 8. 插入各种图片（需要传递索引映射）
-    df_index_mapping = list(df.index)
-    insert_traffic_cycle_images(output_path, traffic_cycle_images, df_index_mapping)
-    insert_sales_trend_images(output_path, sales_trend_images, df_index_mapping)
-    insert_price_trend_images(output_path, price_trend_images, df_index_mapping)
-    insert_product_images(output_path)
-
-    # 8.1 删除"图片链接"列
-    delete_column_from_excel(output_path, "图片链接")
-
-    # 9. 调整Excel文件样式
-    print(f'调整{output_path}文件样式')
-    format_excel_style(output_path)
+    # 7. 一次性写出报告（表格数据、图表、产品图片、样式）
+    REPORT_BACKENDS[args.report_backend](
+        df=df,
+        output_path=output_path,
+        traffic_cycle_images=traffic_cycle_images,
+        sales_trend_images=sales_trend_images,
+        price_trend_images=price_trend_images,
+    )
+    clock.lap('写出报告')
 
     print(f'分析结果已保存到 {output_path}')
 
+    if profiler is not None:
+        profiler.stop(f'{output_dir}/性能分析_{date_str}')
+    get_pipeline_log().report()
+    timer = get_stage_timer()
+    if timer is not None:
+        keyword_cache = get_pipeline_log().summary().get('流量周期关键词缓存', {})
+        timer.report(f'{output_dir}/运行耗时_{date_str}.json', rows=len(df), workers=args.workers,
+                     report_backend=args.report_backend,
+                     keyword_cache={outcome: sum(reasons.values()) for outcome, reasons in keyword_cache.items()})
+    get_pipeline_log().close()
+
     #*
     # 按照不同类目调用不同分割文件函数
     # *#
\ No newline at end of file
@@ -0,0 +1,230 @@
+import math
+from collections import namedtuple
+from statistics import NormalDist
+from typing import List, Sequence
+
+import numpy as np
+
+# 与 pymannkendall.original_test 的同名字段含义相同（不计算 Tau / Sen 斜率）
+MannKendallResult = namedtuple('MannKendallResult', ['trend', 'h', 'p', 'z', 's', 'var_s'])
+
+# n 不超过该值时用符号矩阵计算 S（O(n²) 但全在 NumPy 中），更长的序列用树状数组（O(n log n)）
+SIGN_MATRIX_MAX_N = 256
+
+# 批量计算时每块符号矩阵的元素数上限（控制内存）
+BATCH_MATRIX_ELEMENTS = 4_000_000
+
+
+# =========================================================
+# S 统计量
+# =========================================================
+def _clean_series(x) -> np.ndarray:
+    """转成一维 float 数组并去掉 NaN（与 pymannkendall 的 skip 处理一致）"""
+    arr = np.asarray(x, dtype=float).ravel()
+    return arr[~np.isnan(arr)]
+
+
+def _mk_score_sign_matrix(x: np.ndarray) -> int:
+    # greater[i, j] = x[j] > x[i]；上三角计数为「后面更大」，下三角为「后面更小」
+    greater = x[None, :] > x[:, None]
+    return 2 * int(np.count_nonzero(np.triu(greater, 1))) - int(np.count_nonzero(greater))
+
+
+def _mk_score_fenwick(x: np.ndarray) -> int:
+    """按出现顺序把秩插入树状数组，S = Σ(之前更小的个数 - 之前更大的个数)"""
+    ranks = np.unique(x, return_inverse=True)[1].ravel() + 1
+    size = int(ranks.max())
+    tree = [0] * (size + 1)
+    same = [0] * (size + 1)
+    s = 0
+    for seen, r in enumerate(ranks.tolist()):
+        less = 0
+        i = r - 1
+        while i > 0:
+            less += tree[i]
+            i -= i & -i
+        s += less - (seen - less - same[r])
+        same[r] += 1
+        i = r
+        while i <= size:
+            tree[i] += 1
+            i += i & -i
+    return s
+
+
+def mk_score(x) -> int:
+    """Mann-Kendall S 统计量：Σ_{i<j} sign(x[j] - x[i])"""
+    x = _clean_series(x)
+    if len(x) <= SIGN_MATRIX_MAX_N:
+        return _mk_score_sign_matrix(x)
+    return _mk_score_fenwick(x)
+
+
+# =========================================================
+# 方差（含结值修正）
+# =========================================================
+def mk_variance(x) -> float:
+    """S 的方差：(n(n-1)(2n+5) - Σ t(t-1)(2t+5)) / 18，t 为每组相同取值的个数"""
+    x = _clean_series(x)
+    n = len(x)
+    counts = np.unique(x, return_counts=True)[1]
+    return float((n * (n - 1) * (2 * n + 5) - np.sum(counts * (counts - 1) * (2 * counts + 5))) / 18)
+
+
+# =========================================================
+# 检验
+# =========================================================
+def _z_p_h(s: np.ndarray, var_s: np.ndarray, alpha: float):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sd = np.sqrt(var_s)
+        z = np.where(s > 0, (s - 1) / sd, np.where(s < 0, (s + 1) / sd, 0.0))
+    # 双尾检验：p = 2 * (1 - Φ(|z|))，Φ(x) = erfc(-x / √2) / 2
+    cdf = 0.5 * np.array([math.erfc(-v / math.sqrt(2)) for v in np.abs(z)])
+    p = 2 * (1 - cdf)
+    h = np.abs(z) > NormalDist().inv_cdf(1 - alpha / 2)
+    return z, p, h
+
+
+def _results(s: np.ndarray, var_s: np.ndarray, alpha: float) -> List[MannKendallResult]:
+    z, p, h = _z_p_h(s, var_s, alpha)
+    results = []
+    for si, vi, zi, pi, hi in zip(s.tolist(), var_s.tolist(), z.tolist(), p.tolist(), h.tolist()):
+        if zi < 0 and hi:
+            trend = 'decreasing'
+        elif zi > 0 and hi:
+            trend = 'increasing'
+        else:
+            trend = 'no trend'
+        results.append(MannKendallResult(trend, hi, pi, zi, si, vi))
+    return results
+
+
+def mann_kendall_test(x, alpha: float = 0.05) -> MannKendallResult:
+    """
+    Mann-Kendall 趋势检验（结果与 pymannkendall.original_test 一致）
+
+    参数
+    ------
+    x : array-like
+        按时间排序的序列（NaN 会被跳过）
+    alpha : float
+        显著性水平
+
+    返回
+    ------
+    MannKendallResult
+        trend: increasing / decreasing / no trend；h: 是否有显著趋势；p: p 值；z: 标准化统计量；s: S 统计量；var_s: S 的方差
+    """
+    return _results(np.array([float(mk_score(x))]), np.array([mk_variance(x)]), alpha)[0]
+
+
+def _mk_scores_padded(padded: np.ndarray) -> np.ndarray:
+    """一批等长（NaN 补齐）序列的 S，NaN 参与的比较为 False，不计入"""
+    greater = padded[:, None, :] > padded[:, :, None]
+    return 2 * np.count_nonzero(np.triu(greater, 1), axis=(1, 2)) - np.count_nonzero(greater, axis=(1, 2))
+
+
+def _tie_terms_padded(padded: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """一批序列的 Σ t(t-1)(2t+5)：每行排序后按相同取值分段，t 为段长"""
+    rows, width = padded.shape
+    ordered = np.sort(padded, axis=1)  # NaN 排在每行末尾
+    starts = np.arange(width)[None, :] < lengths[:, None]
+    starts[:, 1:] &= ordered[:, 1:] != ordered[:, :-1]
+    flat_starts = np.flatnonzero(starts.ravel())
+    row_ids = flat_starts // width
+    next_starts = np.append(flat_starts[1:], rows * width)
+    ends = np.minimum(next_starts, row_ids * width + lengths[row_ids])
+    t = (ends - flat_starts).astype(np.int64)
+    return np.bincount(row_ids, weights=t * (t - 1) * (2 * t + 5), minlength=rows)
+
+
+def mann_kendall_batch(series: Sequence, alpha: float = 0.05) -> List[MannKendallResult]:
+    """
+    批量 Mann-Kendall 检验（结果与逐条调用 mann_kendall_test 一致）
+
+    长度相近的序列补齐成矩阵后一起计算符号矩阵和结值修正，超过 SIGN_MATRIX_MAX_N 的序列单独用树状数组计算。
+
+    参数
+    ------
+    series : Sequence
+        多条按时间排序的序列
+    alpha : float
+        显著性水平
+
+    返回
+    ------
+    List[MannKendallResult]
+        与 series 顺序一一对应
+    """
+    cleaned = [_clean_series(x) for x in series]
+    lengths = np.array([len(x) for x in cleaned], dtype=np.int64)
+    s = np.zeros(len(cleaned))
+    var_s = np.zeros(len(cleaned))
+
+    order = np.argsort(lengths, kind='stable')
+    short = [i for i in order.tolist() if lengths[i] <= SIGN_MATRIX_MAX_N]
+    start = 0
+    while start < len(short):
+        # 按长度从小到大切块，每块补齐到块内最长序列
+        width = max(int(lengths[short[start]]), 1)
+        stop = start + 1
+        while stop < len(short):
+            next_width = max(int(lengths[short[stop]]), 1)
+            if (stop - start + 1) * next_width * next_width > BATCH_MATRIX_ELEMENTS:
+                break
+            width = next_width
+            stop += 1
+        chunk = short[start:stop]
+        padded = np.full((len(chunk), width), np.nan)
+        for row, i in enumerate(chunk):
+            padded[row, :lengths[i]] = cleaned[i]
+        n = lengths[chunk]
+        s[chunk] = _mk_scores_padded(padded)
+        var_s[chunk] = (n * (n - 1) * (2 * n + 5) - _tie_terms_padded(padded, n)) / 18
+        start = stop
+
+    for i in order.tolist():
+        if lengths[i] > SIGN_MATRIX_MAX_N:
+            s[i] = _mk_score_fenwick(cleaned[i])
+            var_s[i] = mk_variance(cleaned[i])
+
+    return _results(s, var_s, alpha)
+
+
+if __name__ == '__main__':
+    # 与 pymannkendall.original_test 的一致性检查 + 耗时对比（使用 input_file 下所有价格趋势数据的分析窗口）
+    import glob
+    import json
+    import time
+
+    import pymannkendall as mk
+
+    from price_trend_detector import _trend_window
+
+    series = []
+    for path in sorted(glob.glob('input_file/*/*/*.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for info in data.values():
+            for days in (30, 60, 365):
+                _, recent_prices, unknown = _trend_window(info.get('price_trend', []), info.get('times', []), None, days)
+                if unknown is None:
+                    series.append(recent_prices)
+    rng = np.random.default_rng(0)
+    series += [rng.integers(0, 4, n).astype(float) for n in (4, 50, 300, 2000)]
+    series += [rng.normal(size=n) for n in (4, 50, 300, 2000)]
+
+    t0 = time.perf_counter()
+    expected = [mk.original_test(x) for x in series]
+    t1 = time.perf_counter()
+    single = [mann_kendall_test(x) for x in series]
+    t2 = time.perf_counter()
+    batch = mann_kendall_batch(series)
+    t3 = time.perf_counter()
+
+    assert single == batch
+    for x, e, a in zip(series, expected, single):
+        assert (a.trend, a.h, a.s, a.var_s) == (e.trend, e.h, e.s, e.var_s), (len(x), e, a)
+        assert abs(a.z - e.z) < 1e-12 and abs(a.p - e.p) < 1e-12, (len(x), e, a)
+    print(f'一致性检查通过：{len(series)} 条序列（最长 {max(len(x) for x in series)} 点）；'
+          f'pymannkendall {t1 - t0:.2f}s，逐条 {t2 - t1:.3f}s，批量 {t3 - t2:.3f}s')
@@ -0,0 +1,168 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+from data_processor import load_and_merge_data
+from trend_decoder import decode_payload
+
+# 输入数据缓存目录
+CACHE_DIR = 'cache/merged'
+# 缓存格式或合并逻辑变化时加 1，旧缓存自动失效
+CACHE_VERSION = 1
+# 需要预先解析的大字段（统一保存为 JSON 文本，读取时走 JSON 快速路径）
+PAYLOAD_COLUMNS = ('销量数据', '核心词周期数据', 'sell_trend', 'search_trend')
+
+
+def file_fingerprint(path: str) -> Dict:
+    """文件指纹：(路径, 大小, 修改时间, 内容 sha1)"""
+    stat = os.stat(path)
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha1.update(chunk)
+    return {
+        'path': os.path.abspath(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha1': sha1.hexdigest(),
+    }
+
+
+def _normalize_payload(value):
+    """把 Python 字面量格式的单元格改写成 JSON 文本；被截断的单元格保持原样，由后续处理报告"""
+    if not isinstance(value, str):
+        return value
+    try:
+        return json.dumps(decode_payload(value), ensure_ascii=False)
+    except ValueError:
+        return value
+
+
+def normalize_payload_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """把 sell_trend / search_trend 列统一成 JSON 文本（解析结果不变）"""
+    for col in PAYLOAD_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].map(_normalize_payload)
+    return df
+
+
+def _write_frame(df: pd.DataFrame, base_path: str) -> str:
+    """优先保存为 Parquet，没有 pyarrow 或列类型不支持时保存为 pickle"""
+    try:
+        df.to_parquet(f'{base_path}.parquet', index=True)
+        return f'{base_path}.parquet'
+    except (ImportError, TypeError, ValueError) as e:
+        print(f'Parquet 保存失败，改用 pickle: {e}')
+        if os.path.exists(f'{base_path}.parquet'):
+            os.remove(f'{base_path}.parquet')
+    with open(f'{base_path}.pkl', 'wb') as f:
+        pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return f'{base_path}.pkl'
+
+
+def _read_frame(path: str) -> pd.DataFrame:
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def load_cached_frame(
+    name: str,
+    source_paths: List[str],
+    loader: Callable[[], pd.DataFrame],
+    cache_dir: str = CACHE_DIR
+) -> pd.DataFrame:
+    """
+    读取带缓存的输入数据
+
+    以所有源文件的指纹为 key，命中时直接读取缓存（不解析 Excel）；
+    未命中时调用 loader 加载，预先把大字段改写成 JSON 文本后写入缓存。
+    同一组源文件只保留最新的一份缓存。
+
+    参数
+    ------
+    name : str
+        缓存名称（区分不同的加载方式）
+    source_paths : List[str]
+        源文件路径
+    loader : Callable
+        未命中缓存时加载数据的函数
+
+    返回
+    ------
+    pd.DataFrame
+    """
+    fingerprints = [file_fingerprint(path) for path in source_paths]
+    key = hashlib.sha1(json.dumps(
+        {'version': CACHE_VERSION, 'name': name, 'files': fingerprints}, sort_keys=True
+    ).encode('utf-8')).hexdigest()
+    # 同一组源文件的缓存前缀相同，用于清理旧缓存
+    sources = hashlib.sha1('|'.join(f['path'] for f in fingerprints).encode('utf-8')).hexdigest()
+    prefix = os.path.join(cache_dir, f'{name}_{sources[:12]}_')
+    base_path = f'{prefix}{key[:16]}'
+
+    for path in (f'{base_path}.parquet', f'{base_path}.pkl'):
+        if os.path.exists(path):
+            try:
+                df = _read_frame(path)
+                print(f'命中输入数据缓存: {path}')
+                return df
+            except Exception as e:
+                print(f'读取输入数据缓存失败，重新加载: {e}')
+
+    df = normalize_payload_columns(loader())
+
+    os.makedirs(cache_dir, exist_ok=True)
+    for old_path in glob.glob(f'{glob.escape(prefix)}*'):
+        os.remove(old_path)
+    saved_path = _write_frame(df, base_path)
+    print(f'已写入输入数据缓存: {saved_path}')
+    return df
+
+
+def read_excel_cached(file_path: str, use_cache: bool = True) -> pd.DataFrame:
+    """带缓存的 pd.read_excel"""
+    if not use_cache:
+        return pd.read_excel(file_path)
+    return load_cached_frame('read_excel', [file_path], lambda: pd.read_excel(file_path))
+
+
+def load_and_merge_data_cached(file_path1: str, file_path2: str, use_cache: bool = True) -> pd.DataFrame:
+    """带缓存的 load_and_merge_data"""
+    if not use_cache:
+        return load_and_merge_data(file_path1, file_path2)
+    return load_cached_frame(
+        'load_and_merge_data',
+        [file_path1, file_path2],
+        lambda: load_and_merge_data(file_path1, file_path2)
+    )
+
+
+if __name__ == '__main__':
+    import time
+
+    today = '2026-01-20'
+    path1 = f'input_file/rank/{today}/best-sellers-{today.replace("-", "")}.xlsx'
+    path2 = f'input_file/rank/{today}/crawl-{today.replace("-", "")}-bsr.xlsx'
+
+    t0 = time.perf_counter()
+    raw = load_and_merge_data(path1, path2)
+    t1 = time.perf_counter()
+    load_and_merge_data_cached(path1, path2)
+    t2 = time.perf_counter()
+    cached = load_and_merge_data_cached(path1, path2)
+    t3 = time.perf_counter()
+
+    # 解析结果与直接读取 Excel 一致
+    for col in ('销量数据', '核心词周期数据'):
+        assert [decode_payload(v) if isinstance(v, str) else v for v in raw[col]] == \
+               [decode_payload(v) if isinstance(v, str) else v for v in cached[col]]
+    pd.testing.assert_frame_equal(raw.drop(columns=['销量数据', '核心词周期数据']),
+                                  cached.drop(columns=['销量数据', '核心词周期数据']))
+    print(f'读取 Excel {t1 - t0:.3f}s，首次（写缓存）{t2 - t1:.3f}s，命中缓存 {t3 - t2:.3f}s')
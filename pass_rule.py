@@ -1,11 +1,18 @@
 import os
-from typing import Tuple, Union, Optional
-
 import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
 
-from sqlalchemy.util.langhelpers import repr_tuple_names
+from price_rules import PRICE_RULES_BY_MENU, PriceRules
+from title_features import NON_ALNUM_RE, PCS_RE, SPACES_RE, get_title_features
 
-from price_rules import get_price_rules
+# 价格中的第一个数字（标题相关的正则在 title_features 中）
+_PRICE_RE = re.compile(r"(\d+(?:\.\d+)?)")
+
+RuleResult = Tuple[bool, Optional[str], Optional[int]]
 
 
 def normalize_title(title: str) -> str:
@@ -16,8 +23,8 @@ def normalize_title(title: str) -> str:
     if not title:
         return ""
     t = title.lower()
-    t = re.sub(r"[^a-z0-9\s]", " ", t)
-    t = re.sub(r"\s+", " ", t)
+    t = NON_ALNUM_RE.sub(" ", t)
+    t = SPACES_RE.sub(" ", t)
     return t.strip()
 
 
@@ -26,7 +33,7 @@ def extract_pcs(title: str):
     从 title 中提取数量，如：
     96pcs / 96 pcs / 96 PCS / 96 Pieces / 96-piece
     """
-    m = re.search(r"(\d+)\s*(pcs|pc|pieces|piece)", title)
+    m = PCS_RE.search(title)
     if m:
         return int(m.group(1))
     return None
@@ -45,18 +52,159 @@ def parse_price(value):
         return float(value)
 
     text = str(value)
-    m = re.search(r"(\d+(?:\.\d+)?)", text)
+    m = _PRICE_RE.search(text)
     if m:
         return float(m.group(1))
     return None
 
 
+# ---------- 类目规则 ----------
+def _parse_title(title, title_features=None) -> Tuple[Optional[int], bool, bool]:
+    """
+    (pcs 数量, 是否含 9inch, 是否含 7inch)
+
+    title_features 为 title_features.add_title_features 追加的 标题_* 特征（如该行的 row），给出时直接使用，不再解析标题
+    """
+    if title_features is not None:
+        pcs = title_features['标题_pcs']
+        return (None if pd.isna(pcs) else int(pcs)), bool(title_features['标题_9inch']), bool(title_features['标题_7inch'])
+    norm_title = normalize_title(str(title or ""))
+    return extract_pcs(norm_title), "9inch" in norm_title, "7inch" in norm_title
+
+
+def _passed_with_pcs(title, title_features=None) -> RuleResult:
+    """通过规则时解析 pcs 数量（解析失败仍算通过）"""
+    pcs, _, _ = _parse_title(title, title_features)
+    if pcs is None:
+        return True, '通过规则校验，pcs解析失败', None
+    return True, '通过规则校验', pcs
+
+
+def _paper_free_or_cardboard(material: str) -> bool:
+    """纸杯架材质：含 cardboard，或不含 paper"""
+    material = material.lower().strip()
+    return 'cardboard' in material or 'paper' not in material
+
+
+@dataclass(frozen=True)
+class ThresholdRuleSpec:
+    """
+    按 价格 / 销量 / 价格趋势（/ 材质）阈值判断的类目规则
+
+    required 为按顺序检查的必填字段及缺失时的原因；
+    条件按 材质 → 价格 → 销量 → 价格趋势 的顺序判断。
+    """
+    required: Tuple[Tuple[str, str], ...]
+    min_sales: float = 50
+    price_trend: str = '上升'
+    min_price: Optional[float] = None
+    material_ok: Optional[Callable[[str], bool]] = None
+
+
+_SALES_TREND = (('sales', '没有销量'), ('price_trend', '没有价格趋势'))
+
+# (开发类型, 一级类目, 二级类目) → 规则说明；
+# 'price_table' 表示按标题 pcs 数量查 price_rules.PRICE_RULES_BY_MENU 中的价格阈值，
+# 店铺开发不区分类目（类目为 None）
+RULE_SPECS: Dict[Tuple[str, Optional[str], Optional[str]], Union[str, ThresholdRuleSpec]] = {
+    ('榜单开发', 'toys&games', 'plates'): 'price_table',
+    # 销量≥50 and 价格趋势上升
+    ('榜单开发', 'toys&games', 'banners'): ThresholdRuleSpec(required=_SALES_TREND),
+    # price>=9.99 sales>=50 price_trend上升
+    ('榜单开发', 'toys&games', 'centerpieces'): ThresholdRuleSpec(
+        required=(('price', '没有价格'),) + _SALES_TREND,
+        min_price=9.99,
+    ),
+    # 材质为纸质（Cardboard Paper），price>=9.99 sales>=50 price_trend上升
+    ('榜单开发', 'toys&games', 'cupcake stands'): ThresholdRuleSpec(
+        required=(('material', '没有材质'), ('price', '没有价格')) + _SALES_TREND,
+        min_price=9.99,
+        material_ok=_paper_free_or_cardboard,
+    ),
+    # 销量≥50 and 价格趋势上升
+    ('店铺开发', None, None): ThresholdRuleSpec(required=_SALES_TREND),
+}
+
+
+def _compile_price_table_rule(price_rules: PriceRules) -> Callable[..., RuleResult]:
+    """按 pcs 数量查价格阈值的规则（60pcs 等按 9inch / 7inch 细分）"""
+    def rule(title=None, price=None, title_features=None, **_) -> RuleResult:
+        # 1. 标准化标题并解析 pcs 数量（有预先提取的标题特征时直接使用）
+        pcs, has_9inch, has_7inch = _parse_title(title, title_features)
+        if pcs is None:
+            return False, 'pcs解析失败', None
+
+        # 2. 解析价格
+        numeric_price = parse_price(price)
+        if numeric_price is None:
+            return False, '解析价格失败', pcs
+
+        # 3. 对应类目的规则表
+        if not price_rules:
+            # 未配置规则，默认不通过
+            return False, '该类目下没有指定规则', pcs
+        threshold = price_rules.get(pcs)
+        if threshold is None:
+            return False, f'该类目下没有{pcs}pcs规则', pcs
+
+        # 4. 应用规则
+        if isinstance(threshold, dict):
+            # 60pcs 等特殊尺寸规则，找不到尺寸信息则视为不通过
+            for size, has_size in (("9inch", has_9inch), ("7inch", has_7inch)):
+                if has_size:
+                    if threshold.get(size) is None:
+                        return False, f'该类目下没有{size}规则', pcs
+                    return numeric_price >= threshold[size], '通过规则校验', pcs
+            return False, f'该类目下没有{pcs}pcs规则', pcs
+
+        # 普通规则：只比较价格是否达到阈值
+        if numeric_price >= float(threshold):
+            return True, '通过规则校验', pcs
+        return False, '价格过低', pcs
+
+    return rule
+
+
+def _compile_threshold_rule(spec: ThresholdRuleSpec) -> Callable[..., RuleResult]:
+    def rule(title=None, price=None, sales=None, price_trend=None, material=None, title_features=None) -> RuleResult:
+        values = {'price': price, 'sales': sales, 'price_trend': price_trend, 'material': material}
+        for name, reason in spec.required:
+            if values[name] is None:
+                return False, reason, None
+
+        if ((spec.material_ok is None or spec.material_ok(material))
+                and (spec.min_price is None or parse_price(price) >= spec.min_price)
+                and sales >= spec.min_sales and price_trend == spec.price_trend):
+            return _passed_with_pcs(title, title_features)
+        return False, '没有通过规则校验', None
+
+    return rule
+
+
+def build_rule_registry() -> Dict[Tuple[str, Optional[str], Optional[str]], Callable[..., RuleResult]]:
+    """把 RULE_SPECS 编译成 (开发类型, 一级类目, 二级类目) → 规则函数"""
+    registry = {}
+    for key, spec in RULE_SPECS.items():
+        if spec == 'price_table':
+            registry[key] = _compile_price_table_rule(PRICE_RULES_BY_MENU.get(key[1:], {}))
+        else:
+            registry[key] = _compile_threshold_rule(spec)
+    return registry
+
+
+_RULE_REGISTRY = build_rule_registry()
+
+
+def _rule_key(development_kind: Optional[str], main_menu: Optional[str], sub_menu: Optional[str]):
+    if development_kind == '店铺开发':
+        return development_kind, None, None
+    return development_kind, main_menu, sub_menu
+
+
 def pass_rule(main_menu: str = None, sub_menu: str = None,
               sales: int = None, price:str = None,
               title: str = None, price_trend: str = None,
-              material: str = None, ) -> \
-        Union[None, Tuple[bool, str, None], Tuple[bool, str, int], bool, Tuple[bool, str, Optional[int]], Tuple[
-            bool, None, None]]:
+              material: str = None, title_features=None) -> Optional[RuleResult]:
     """
     根据「大类(main_menu) + 小类(sub_menu) + 标题 + 价格」判断该产品是否通过价格规则。
 
@@ -65,7 +213,7 @@ def pass_rule(main_menu: str = None, sub_menu: str = None,
     - 从标题中解析出数量（pcs），根据数量找到对应的价格阈值
     - 若为 60pcs，则进一步根据 9inch / 7inch 细分规则
     - 价格达到阈值 => 通过；否则不通过
-    - 如果规则是特殊规则（如 banners_rule），则使用特殊处理逻辑
+    - 其他类目按 RULE_SPECS 中的价格 / 销量 / 价格趋势 / 材质条件判断
 
     参数
     ------
@@ -74,165 +222,239 @@ def pass_rule(main_menu: str = None, sub_menu: str = None,
     sub_menu : str, optional
         二级类目，用于选择规则
     sales : int, optional
-        销量（当前规则未使用，预留扩展）
+        上月销量
     price : optional
         价格，可以是 float / int / 字符串（如 '$19.75'）
     title : str, optional
         产品标题
-    trend_result : str, optional
+    price_trend : str, optional
         价格趋势 上升/下降/波动/平稳
+    material : str, optional
+        材质（cupcake stands 使用）
+    title_features : optional
+        title_features.add_title_features 追加的 标题_* 特征（如该行的 row），给出时不再解析标题
 
     返回
     ------
     Tuple[bool, str, Optional[int]]
         (是否通过规则, 原因, pcs数量)
         True 表示通过当前规则；False 表示不通过（包括缺少规则/解析失败等情况）。
+        榜单开发下没有对应类目时返回 (False, None, None)，其他开发类型返回 None。
     """
     development_kind = os.getenv('DEVELOPMENT_KIND')
-    if development_kind == '榜单开发':
-        if main_menu == 'toys&games' and sub_menu == 'plates':
-            reason = None
-            # 1. 标准化标题并解析 pcs 数量
-            norm_title = normalize_title(str(title or ""))
-            pcs = extract_pcs(norm_title)
-            if pcs is None:
-                reason = 'pcs解析失败'
-                return False, reason, None
-
-            # 2. 解析价格
-            numeric_price = parse_price(price)
-            if numeric_price is None:
-                reason = '解析价格失败'
-                return False,reason, pcs
-
-            # 3. 获取对应类目的规则表
-            price_rules = get_price_rules(main_menu, sub_menu)
-            if not price_rules:
-                # 未配置规则，默认不通过；如需“未配置也通过”，可在此返回 True
-                reason = '该类目下没有指定规则'
-                return False, reason, pcs
-
-            rule = price_rules.get(pcs)
-            if rule is None:
-                reason = f'该类目下没有{pcs}pcs规则'
-                return False, reason, pcs
-
-            # 4. 应用规则
-            if isinstance(rule, dict):
-                # 60pcs 等特殊尺寸规则
-                if "9inch" in norm_title:
-                    threshold = rule.get("9inch")
-                    if threshold is None:
-                        return False, '该类目下没有9inch规则', pcs
-                    return numeric_price >= threshold, '通过规则校验', pcs
-                if "7inch" in norm_title:
-                    threshold = rule.get("7inch")
-                    if threshold is None:
-                        return False, '该类目下没有7inch规则', pcs
-                    return numeric_price >= threshold, '通过规则校验', pcs
-                # 找不到尺寸信息则视为不通过
-                reason = f'该类目下没有{pcs}pcs规则'
-                return False, reason, pcs
-
-            # 普通规则：只比较价格是否达到阈值
-            if numeric_price >= float(rule):
-                reason = '通过规则校验'
-                return True, reason, pcs
-            reason = '价格过低'
-            return False, reason, pcs
-        elif main_menu == 'toys&games' and sub_menu == 'banners':
-            # 销量≥50 and 价格趋势上升
-
-            if sales is None:
-                reason = '没有销量'
-                return False, reason, None
-
-            if price_trend is None:
-                reason = '没有价格趋势'
-                return False, reason, None
-
-            # 普通规则：只比较价格是否达到阈值
-            if sales >= 50 and price_trend == '上升':
-                norm_title = normalize_title(str(title or ""))
-                pcs = extract_pcs(norm_title)
-                if pcs is None:
-                    reason = '通过规则校验，pcs解析失败'
-                else:
-                    reason = f'通过规则校验'
-                return True, reason, pcs
-            return False, '没有通过规则校验', None
-        elif main_menu == 'toys&games' and sub_menu == 'centerpieces':
-            # price>=9.99 sales>=50 price_trend上升
-            if price is None:
-                reason = '没有价格'
-                return False, reason, None
-
-            if sales is None:
-                reason = '没有销量'
-                return False, reason, None
-
-            if price_trend is None:
-                reason = '没有价格趋势'
-                return False, reason, None
-
-            # 普通规则：只比较价格是否达到阈值
-            if parse_price(price)>=9.99 and sales >= 50 and price_trend == '上升':
-                norm_title = normalize_title(str(title or ""))
-                pcs = extract_pcs(norm_title)
-                if pcs is None:
-                    reason = '通过规则校验，pcs解析失败'
-                else:
-                    reason = f'通过规则校验'
-                return True, reason, pcs
-            return False, '没有通过规则校验', None
-        elif main_menu == 'toys&games' and sub_menu == 'cupcake stands':
-            # 材质为纸质，price>=9.99 sales>=50 price_trend上升
-            # Cardboard Paper
-            if material is None:
-                reason = '没有材质'
-                return False, reason, None
-            if price is None:
-                reason = '没有价格'
-                return False, reason, None
-
-            if sales is None:
-                reason = '没有销量'
-                return False, reason, None
-
-            if price_trend is None:
-                reason = '没有价格趋势'
-                return False, reason, None
-
-            if (('cardboard' in material.lower().strip() or 'paper' not in material.lower().strip())
-                    and parse_price(price)>=9.99 and sales >= 50 and price_trend == '上升'):
-                norm_title = normalize_title(str(title or ""))
-                pcs = extract_pcs(norm_title)
-                if pcs is None:
-                    reason = '通过规则校验，pcs解析失败'
-                else:
-                    reason = f'通过规则校验'
-                return True, reason, pcs
-            return False, '没有通过规则校验', None
-        else:
-            return False, None, None
-    if development_kind == '店铺开发':
-        # 销量≥50 and 价格趋势上升
+    rule = _RULE_REGISTRY.get(_rule_key(development_kind, main_menu, sub_menu))
+    if rule is None:
+        return (False, None, None) if development_kind == '榜单开发' else None
+    return rule(title=title, price=price, sales=sales, price_trend=price_trend, material=material,
+                title_features=title_features)
+
+
+# ---------- 批量判断 ----------
+def _column(df: pd.DataFrame, col: str) -> pd.Series:
+    """取出一列（缺失值统一为 None），没有该列时全部为 None"""
+    if col not in df.columns:
+        return pd.Series([None] * len(df), index=df.index, dtype=object)
+    values = df[col].astype(object)
+    return values.where(values.notna(), None)
+
+
+def _parse_price_column(prices: pd.Series) -> pd.Series:
+    """parse_price 的批量版本（无法解析为 NaN）"""
+    return pd.Series(prices.map(parse_price).tolist(), index=prices.index, dtype=float)
+
+
+def _batch_price_table(df: pd.DataFrame, price_rules: PriceRules) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    features = get_title_features(df)
+    pcs = features['标题_pcs'].astype(float)
+    price = _parse_price_column(_column(df, '价格'))
+    has_pcs = pcs.notna().to_numpy()
+    has_price = price.notna().to_numpy()
+    pcs_text = pcs.map(lambda v: '' if pd.isna(v) else str(int(v))).to_numpy(dtype=object)
+
+    # 普通阈值和 9inch / 7inch 细分阈值
+    scalar_rules = {k: float(v) for k, v in price_rules.items() if not isinstance(v, dict)}
+    size_rules = {k: v for k, v in price_rules.items() if isinstance(v, dict)}
+    scalar_threshold = pcs.map(scalar_rules).to_numpy(dtype=float)
+    is_size_rule = pcs.isin(list(size_rules)).to_numpy()
+    has_9 = features['标题_9inch'].to_numpy(dtype=bool)
+    has_7 = features['标题_7inch'].to_numpy(dtype=bool)
+    size_threshold = np.full(len(df), np.nan)
+    size_missing = np.zeros(len(df), dtype=bool)
+    for pcs_value, sizes in size_rules.items():
+        rows = (pcs == pcs_value).to_numpy()
+        for size, has_size in (("9inch", has_9), ("7inch", has_7 & ~has_9)):
+            hit = rows & has_size
+            if sizes.get(size) is None:
+                size_missing |= hit
+            else:
+                size_threshold[hit] = sizes[size]
+    price_values = price.to_numpy(dtype=float)
+
+    conditions = [
+        ~has_pcs,
+        ~has_price,
+        np.full(len(df), not price_rules),
+        ~is_size_rule & np.isnan(scalar_threshold),
+        is_size_rule & size_missing,
+        is_size_rule & ~has_9 & ~has_7,
+        is_size_rule,
+        price_values >= scalar_threshold,
+    ]
+    reasons = np.select(conditions, [
+        'pcs解析失败',
+        '解析价格失败',
+        '该类目下没有指定规则',
+        np.char.add(np.char.add('该类目下没有', pcs_text.astype(str)), 'pcs规则'),
+        np.where(has_9, '该类目下没有9inch规则', '该类目下没有7inch规则'),
+        np.char.add(np.char.add('该类目下没有', pcs_text.astype(str)), 'pcs规则'),
+        '通过规则校验',
+        '通过规则校验',
+    ], default='价格过低').astype(object)
+    passed = np.select(conditions[:6] + [conditions[6]], [False] * 6 + [price_values >= size_threshold],
+                       default=price_values >= scalar_threshold)
+    pcs_out = np.where(has_pcs, pcs.to_numpy(dtype=float), np.nan)
+    return passed.astype(bool), reasons, pcs_out
+
+
+def _batch_threshold(df: pd.DataFrame, spec: ThresholdRuleSpec) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    columns = {
+        'price': _column(df, '价格'),
+        'sales': _column(df, '上月销量'),
+        'price_trend': _column(df, '价格趋势类型'),
+        'material': _column(df, '材质'),
+    }
+    n_rows = len(df)
+    decided = np.zeros(n_rows, dtype=bool)
+    reasons = np.full(n_rows, '', dtype=object)
+    for name, reason in spec.required:
+        missing = columns[name].isna().to_numpy() & ~decided
+        reasons[missing] = reason
+        decided |= missing
+
+    # 与逐行逻辑相同的短路顺序：材质 → 价格 → 销量 → 价格趋势
+    candidate = ~decided
+    if spec.material_ok is not None:
+        candidate &= columns['material'].map(lambda m: m is not None and spec.material_ok(m)).to_numpy(dtype=bool)
+    if spec.min_price is not None:
+        price = _parse_price_column(columns['price']).to_numpy(dtype=float)
+        invalid = candidate & np.isnan(price)
+        if invalid.any():
+            rows = df.index[invalid].tolist()
+            values = columns['price'][invalid].tolist()
+            raise ValueError(f'无法解析价格: 第{rows}行 {values}')
+        candidate &= np.where(candidate, price, -np.inf) >= spec.min_price
+    sales = columns['sales'].where(candidate, 0).astype(float).to_numpy()
+    candidate &= sales >= spec.min_sales
+    candidate &= (columns['price_trend'] == spec.price_trend).to_numpy(dtype=bool)
+
+    pcs = np.full(n_rows, np.nan)
+    if candidate.any():
+        pcs[candidate] = get_title_features(df[candidate])['标题_pcs'].to_numpy(dtype=float, na_value=np.nan)
+    reasons[~decided & ~candidate] = '没有通过规则校验'
+    reasons[candidate] = np.where(np.isnan(pcs[candidate]), '通过规则校验，pcs解析失败', '通过规则校验')
+    pcs_out = np.where(candidate, pcs, np.nan)
+    return candidate, reasons, pcs_out
+
+
+def pass_rule_batch(
+    df: pd.DataFrame,
+    main_menu: str = None,
+    sub_menu: str = None,
+    development_kind: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    对整张表批量执行 pass_rule（结果与逐行调用一致）
 
-        if sales is None:
-            reason = '没有销量'
-            return False, reason, None
+    参数
+    ------
+    df : pd.DataFrame
+        使用 产品标题 / 价格 / 上月销量 / 价格趋势类型 / 材质 列（没有的列视为全部缺失，空值视为 None）
+        已有 title_features.add_title_features 追加的标题特征列时直接复用，不再重新解析标题
+    main_menu, sub_menu : str
+        一级、二级类目
+    development_kind : str
+        开发类型，默认读取 DEVELOPMENT_KIND 环境变量
 
-        if price_trend is None:
-            reason = '没有价格趋势'
-            return False, reason, None
+    返回
+    ------
+    pd.DataFrame
+        与 df 索引一致，列为 是否通过规则 / 原因 / pcs（与 pass_rule 返回的三元组对应）。
+        没有对应规则时 原因 为 None（榜单开发）或整列为 None（其他开发类型）。
 
-        # 普通规则：只比较价格是否达到阈值
-        if sales >= 50 and price_trend == '上升':
-            norm_title = normalize_title(str(title or ""))
-            pcs = extract_pcs(norm_title)
-            if pcs is None:
-                reason = '通过规则校验，pcs解析失败'
-            else:
-                reason = f'通过规则校验'
-            return True, reason, pcs
-        return False, '没有通过规则校验', None
\ No newline at end of file
+    需要比较价格的类目中，有价格但无法解析的行（逐行调用时比较出错）抛出 ValueError，消息中列出行号和价格
+    """
+    if development_kind is None:
+        development_kind = os.getenv('DEVELOPMENT_KIND')
+    key = _rule_key(development_kind, main_menu, sub_menu)
+    spec = RULE_SPECS.get(key)
+
+    if spec is None:
+        passed = False if development_kind == '榜单开发' else None
+        return pd.DataFrame({'是否通过规则': [passed] * len(df), '原因': [None] * len(df), 'pcs': [None] * len(df)},
+                            index=df.index, dtype=object)
+
+    if spec == 'price_table':
+        passed, reasons, pcs = _batch_price_table(df, PRICE_RULES_BY_MENU.get(key[1:], {}))
+    else:
+        passed, reasons, pcs = _batch_threshold(df, spec)
+    return pd.DataFrame({
+        '是否通过规则': pd.Series(passed.tolist(), index=df.index, dtype=object),
+        '原因': pd.Series(reasons.tolist(), index=df.index, dtype=object),
+        'pcs': pd.Series([None if np.isnan(v) else int(v) for v in pcs], index=df.index, dtype=object),
+    })
+
+
+if __name__ == '__main__':
+    # 批量判断与逐行 pass_rule 的一致性检查 + 耗时对比（使用 input_file/rank 下的标题）
+    import glob
+    import itertools
+    import time
+
+    from title_features import TITLE_FEATURE_COLUMNS, add_title_features
+
+    titles = ['60pcs 9inch plates', '60 pcs 7-inch plates', '60pcs plates', '40 pieces', None, '']
+    for best_sellers in sorted(glob.glob('input_file/rank/*/best-sellers-*.xlsx')):
+        titles += pd.read_excel(best_sellers)['产品标题'].dropna().astype(str).tolist()
+    grid = pd.DataFrame(
+        list(itertools.product(titles, ['$5.99', '$16.99', 25, None], [None, 10, 60],
+                               ['上升', '下降', None], ['paper', 'Cardboard', 'plastic'])),
+        columns=['产品标题', '价格', '上月销量', '价格趋势类型', '材质'],
+        dtype=object,
+    )
+    records = grid.to_dict('records')
+    # 逐行调用时传入预先提取的标题特征，结果应与解析标题相同
+    feature_rows = add_title_features(grid)[list(TITLE_FEATURE_COLUMNS)].to_dict('records')
+
+    elapsed = {'row': 0.0, 'batch': 0.0}
+    for development_kind, sub_menu in [('榜单开发', 'plates'), ('榜单开发', 'banners'), ('榜单开发', 'centerpieces'),
+                                       ('榜单开发', 'cupcake stands'), ('榜单开发', 'cups'), ('店铺开发', None)]:
+        os.environ['DEVELOPMENT_KIND'] = development_kind
+        t0 = time.perf_counter()
+        expected = [pass_rule('toys&games', sub_menu, r['上月销量'], r['价格'], r['产品标题'],
+                              r['价格趋势类型'], r['材质']) for r in records]
+        t1 = time.perf_counter()
+        actual = pass_rule_batch(grid, 'toys&games', sub_menu)
+        t2 = time.perf_counter()
+        assert list(actual.itertuples(index=False, name=None)) == expected, (development_kind, sub_menu)
+        with_features = [pass_rule('toys&games', sub_menu, r['上月销量'], r['价格'], r['产品标题'],
+                                   r['价格趋势类型'], r['材质'], title_features=f)
+                         for r, f in zip(records, feature_rows)]
+        assert with_features == expected, (development_kind, sub_menu)
+        elapsed['row'] += t1 - t0
+        elapsed['batch'] += t2 - t1
+    # 有价格但无法解析时，逐行规则在比较时抛出 TypeError，批量判断抛出 ValueError（列出行号和取值）
+    os.environ['DEVELOPMENT_KIND'] = '榜单开发'
+    bad = grid.head(2).assign(价格=['N/A', '$12.50'], 上月销量=60, 价格趋势类型='上升', 材质='paper')
+    try:
+        pass_rule('toys&games', 'centerpieces', 60, 'N/A', bad.at[0, '产品标题'], '上升', 'paper')
+        raise AssertionError('pass_rule 应抛出 TypeError')
+    except TypeError:
+        pass
+    try:
+        pass_rule_batch(bad, 'toys&games', 'centerpieces')
+        raise AssertionError('pass_rule_batch 应抛出 ValueError')
+    except ValueError:
+        pass
+
+    print(f'一致性检查通过：{len(grid)} 行 × 6 个类目；'
+          f'逐行 {elapsed["row"]:.2f}s，批量 {elapsed["batch"]:.2f}s')
@@ -0,0 +1,285 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# 命令行 --log-level 可选的级别
+LOG_LEVELS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+}
+# 同一类逐行消息（事件 + 结果 + 原因）在控制台最多显示的条数，之后只计数
+ROW_MESSAGE_LIMIT = 5
+
+# 逐行事件的结果（RETRIED 为失败后还会重试的中间结果）
+OK, SKIPPED, FAILED, RETRIED = '成功', '跳过', '失败', '重试'
+
+
+class _ConsoleHandler(logging.StreamHandler):
+    """输出前先清掉进度条所在的行，输出后重画进度条"""
+
+    def __init__(self, pipeline_log: 'PipelineLog'):
+        super().__init__(sys.stderr)
+        self._pipeline_log = pipeline_log
+
+    def emit(self, record: logging.LogRecord):
+        self._pipeline_log._clear_progress()
+        super().emit(record)
+        self._pipeline_log._redraw_progress()
+
+
+class _RowMessageLimit(logging.Filter):
+    """同一类逐行消息只显示前 limit 条，超出时提示一次"""
+
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit = limit
+        self._shown: Counter = Counter()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, 'row_key', None)
+        if key is None:
+            return True
+        self._shown[key] += 1
+        if self._shown[key] == self.limit + 1:
+            event, outcome, reason = key
+            record.msg = f'{event}{outcome}（{reason}）超过 {self.limit} 条，后续同类消息不再显示，见最终汇总'
+            record.args = None
+            record.exc_info = record.exc_text = None
+            return True
+        return self._shown[key] <= self.limit
+
+
+class PipelineLog:
+    """
+    流水线日志：按级别输出到控制台（逐行消息限流），逐行事件按 (事件, 结果, 原因) 计数，
+    可选把每条消息（不限流）写到 JSONL 文件，另外提供一个紧凑的进度条
+
+    参数
+    ------
+    level : int
+        控制台输出级别（logging.DEBUG / INFO / WARNING / ERROR），默认 WARNING：
+        逐行的成功消息是 DEBUG，跳过（数据为空等）是 INFO，出错是 WARNING
+    jsonl_path : str
+        JSONL 文件路径，None 表示不写
+    row_message_limit : int
+        同一类逐行消息在控制台最多显示的条数
+    progress : bool
+        是否显示进度条
+    buffer_records : bool
+        把 JSONL 记录留在内存中（进程池子进程使用，由主进程 merge 后写出）
+    """
+
+    def __init__(self, level: int = logging.WARNING, jsonl_path: Optional[str] = None,
+                 row_message_limit: int = ROW_MESSAGE_LIMIT, progress: bool = True, buffer_records: bool = False):
+        self.level = level
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()  # 产品图片在线程池中下载
+        self.show_progress = progress
+        self._records: Optional[List[Dict]] = [] if buffer_records else None
+        self._jsonl = None
+        if jsonl_path:
+            if os.path.dirname(jsonl_path):
+                os.makedirs(os.path.dirname(jsonl_path), exist_ok=True)
+            self._jsonl = open(jsonl_path, 'a', encoding='utf-8')
+        self._progress_line = ''
+        self._progress_state: Optional[Tuple[str, int, int]] = None
+        self._last_progress_pct = -1
+
+        self._logger = logging.getLogger(f'{__name__}.{id(self)}')
+        self._logger.setLevel(logging.DEBUG)
+        self._logger.propagate = False
+        handler = _ConsoleHandler(self)
+        handler.setLevel(level)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        handler.addFilter(_RowMessageLimit(row_message_limit))
+        self._logger.addHandler(handler)
+
+    @property
+    def has_jsonl(self) -> bool:
+        return self._jsonl is not None
+
+    # ---------------- 消息 ----------------
+    def log(self, level: int, message: str, exc_info: bool = False, **fields):
+        self._write_record(level, message, exc_info, fields)
+        self._logger.log(level, message, exc_info=exc_info)
+
+    def row_event(self, event: str, outcome: str, reason: str, idx=None, message: Optional[str] = None,
+                  level: Optional[int] = None, exc_info: bool = False):
+        """
+        记录一条逐行事件（如 event="流量周期图"，outcome=SKIPPED，reason="data 为空"）
+
+        reason 用于汇总计数，应是有限的几类；具体数值放在 message 中。
+        level 默认按结果决定：成功 DEBUG，跳过 INFO，失败 WARNING
+        """
+        with self._lock:
+            self.counts[(event, outcome, reason)] += 1
+        if level is None:
+            level = {OK: logging.DEBUG, SKIPPED: logging.INFO}.get(outcome, logging.WARNING)
+        if message is None:
+            message = f'{event}{outcome}：{reason}'
+        if idx is not None:
+            message = f'第{idx}行: {message}'
+        fields = {'event': event, 'outcome': outcome, 'reason': reason, 'idx': idx}
+        self._write_record(level, message, exc_info, fields)
+        if level >= self.level:
+            self._logger.log(level, message, exc_info=exc_info, extra={'row_key': (event, outcome, reason)})
+
+    def count(self, event: str, outcome: str, reason: str = '', n: int = 1):
+        """只计数、不输出消息（如缓存命中条数），计入最终汇总；reason 为空时汇总中不列原因"""
+        if n:
+            with self._lock:
+                self.counts[(event, outcome, reason)] += n
+
+    def _write_record(self, level: int, message: str, exc_info: bool, fields: Dict):
+        if self._jsonl is None and self._records is None:
+            return
+        record = {'time': time.time(), 'level': logging.getLevelName(level), 'message': message, **fields}
+        if exc_info:
+            import traceback
+            record['traceback'] = traceback.format_exc()
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._jsonl is not None:
+                self._jsonl.write(line + '\n')
+            else:
+                self._records.append(record)
+
+    # ---------------- 进度条 ----------------
+    def progress(self, done: int, total: int, label: str = '逐行处理'):
+        """更新进度条（终端中原地刷新；输出被重定向时每 10% 打印一行）"""
+        if not self.show_progress or total <= 0:
+            return
+        pct = done * 100 // total
+        if sys.stderr.isatty():
+            if pct == self._last_progress_pct and done < total:
+                return
+            self._progress_state = (label, done, total)
+            self._draw_progress()
+            if done >= total:
+                sys.stderr.write('\n')
+                self._progress_state = None
+                self._progress_line = ''
+        elif pct // 10 != self._last_progress_pct // 10 or done >= total:
+            print(f'{label}: {done}/{total}（{pct}%）', file=sys.stderr)
+        self._last_progress_pct = -1 if done >= total else pct
+
+    def _draw_progress(self):
+        label, done, total = self._progress_state
+        filled = done * 30 // total
+        self._progress_line = f'{label} [{"#" * filled}{"." * (30 - filled)}] {done}/{total} {done * 100 // total}%'
+        sys.stderr.write('\r' + self._progress_line)
+        sys.stderr.flush()
+
+    def _clear_progress(self):
+        if self._progress_state is not None:
+            sys.stderr.write('\r\033[K')
+
+    def _redraw_progress(self):
+        if self._progress_state is not None:
+            self._draw_progress()
+
+    # ---------------- 汇总 ----------------
+    def drain(self) -> Dict:
+        """取出并清空计数和缓存的 JSONL 记录（子进程把每个任务的日志带回主进程）"""
+        drained = {'counts': self.counts, 'records': self._records or []}
+        self.counts = Counter()
+        if self._records is not None:
+            self._records = []
+        return drained
+
+    def merge(self, drained: Optional[Dict]):
+        if not drained:
+            return
+        self.counts.update(drained['counts'])
+        for record in drained['records']:
+            if self._jsonl is not None:
+                self._jsonl.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+            elif self._records is not None:
+                self._records.append(record)
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """{事件: {结果: {原因: 次数}}}"""
+        result: Dict[str, Dict[str, Dict[str, int]]] = {}
+        for (event, outcome, reason), count in self.counts.items():
+            result.setdefault(event, {}).setdefault(outcome, {})[reason] = count
+        return result
+
+    def report(self):
+        """打印逐行事件汇总，并把汇总写到 JSONL 文件末尾"""
+        summary = self.summary()
+        if summary:
+            print('\n逐行事件汇总：')
+            for event, outcomes in summary.items():
+                parts = []
+                for outcome in sorted(outcomes, key=lambda o: (o != OK, o != SKIPPED, o)):
+                    reasons = outcomes[outcome]
+                    text = f'{outcome} {sum(reasons.values())}'
+                    if outcome != OK and set(reasons) != {''}:
+                        text += '（' + '，'.join(f'{reason} {n}' for reason, n in
+                                                sorted(reasons.items(), key=lambda item: -item[1])) + '）'
+                    parts.append(text)
+                print(f'  {event}：' + '，'.join(parts))
+        if self._jsonl is not None:
+            self._jsonl.write(json.dumps({'time': time.time(), 'summary': summary}, ensure_ascii=False) + '\n')
+            self._jsonl.flush()
+
+    def close(self):
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+
+
+# 当前进程的日志对象（第一次使用时按默认配置创建）
+_pipeline_log: Optional[PipelineLog] = None
+
+
+def get_pipeline_log() -> PipelineLog:
+    global _pipeline_log
+    if _pipeline_log is None:
+        _pipeline_log = PipelineLog()
+    return _pipeline_log
+
+
+def set_pipeline_log(pipeline_log: Optional[PipelineLog]):
+    """设置当前进程的日志对象（None 表示下次使用时按默认配置重新创建）"""
+    global _pipeline_log
+    if _pipeline_log is not None and _pipeline_log is not pipeline_log:
+        _pipeline_log.close()
+    _pipeline_log = pipeline_log
+
+
+def row_event(event: str, outcome: str, reason: str, idx=None, message: Optional[str] = None,
+              level: Optional[int] = None, exc_info: bool = False):
+    get_pipeline_log().row_event(event, outcome, reason, idx=idx, message=message, level=level, exc_info=exc_info)
+
+
+def count(event: str, outcome: str, reason: str = '', n: int = 1):
+    get_pipeline_log().count(event, outcome, reason, n)
+
+
+def debug(message: str, **fields):
+    get_pipeline_log().log(logging.DEBUG, message, **fields)
+
+
+def info(message: str, **fields):
+    get_pipeline_log().log(logging.INFO, message, **fields)
+
+
+def warning(message: str, exc_info: bool = False, **fields):
+    get_pipeline_log().log(logging.WARNING, message, exc_info=exc_info, **fields)
+
+
+def error(message: str, exc_info: bool = True, **fields):
+    """错误消息，默认附带当前异常的堆栈（替代 traceback.print_exc）"""
+    get_pipeline_log().log(logging.ERROR, message, exc_info=exc_info, **fields)
+
+
+def progress(done: int, total: int, label: str = '逐行处理'):
+    get_pipeline_log().progress(done, total, label)
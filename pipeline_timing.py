@@ -0,0 +1,258 @@
+import functools
+import json
+import os
+import time
+import unicodedata
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def pad_display(text: str, width: int, right: bool = False) -> str:
+    """按显示宽度补齐空格（中文字符占两格）"""
+    display = sum(2 if unicodedata.east_asian_width(ch) in 'WF' else 1 for ch in text)
+    fill = ' ' * max(width - display, 0)
+    return fill + text if right else text + fill
+
+
+# =========================================================
+# 计时注册表
+# =========================================================
+class StageTimer:
+    """
+    按阶段名累计耗时：每次计时记录一条（逐行的子步骤每行一条），最后汇总成
+    总耗时 / 次数 / p50 / p95 / 占整次运行的比例
+
+    阶段名用 "/" 表示层级（如 "逐行处理/单行/价格趋势图"），只影响汇总时的缩进。
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.records: Dict[str, List[float]] = {}
+
+    def record(self, name: str, seconds: float):
+        self.records.setdefault(name, []).append(seconds)
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - t0)
+
+    def drain(self) -> Dict[str, List[float]]:
+        """取出并清空已记录的耗时（子进程把每个任务的耗时带回主进程）"""
+        records, self.records = self.records, {}
+        return records
+
+    def merge(self, records: Optional[Dict[str, List[float]]]):
+        for name, seconds in (records or {}).items():
+            self.records.setdefault(name, []).extend(seconds)
+
+    def _ordered_names(self) -> List[str]:
+        """子阶段排在父阶段之后，同级按第一次记录的先后（子阶段通常先于父阶段记录完）"""
+        first_seen: Dict[str, int] = {}
+        for i, name in enumerate(self.records):
+            parts = name.split('/')
+            for depth in range(1, len(parts) + 1):
+                first_seen.setdefault('/'.join(parts[:depth]), i)
+
+        def key(name: str):
+            parts = name.split('/')
+            return tuple(first_seen['/'.join(parts[:depth])] for depth in range(1, len(parts) + 1))
+
+        return sorted(self.records, key=key)
+
+    def summary(self, **meta) -> Dict:
+        """
+        汇总结果
+
+        返回
+        ------
+        dict
+            {"total_seconds": 整次运行耗时, **meta, "stages": {阶段名: {"count", "total", "mean", "p50", "p95", "max", "share"}}}
+            share 为该阶段总耗时占整次运行的比例（多进程时逐行子步骤是各进程耗时之和，可能超过 1）
+        """
+        total = time.perf_counter() - self.started
+        stages = {}
+        for name in self._ordered_names():
+            values = np.asarray(self.records[name], dtype=float)
+            stages[name] = {
+                "count": int(values.size),
+                "total": float(values.sum()),
+                "mean": float(values.mean()),
+                "p50": float(np.percentile(values, 50)),
+                "p95": float(np.percentile(values, 95)),
+                "max": float(values.max()),
+                "share": float(values.sum() / total) if total > 0 else 0.0,
+            }
+        return {"total_seconds": total, **meta, "stages": stages}
+
+    def report(self, json_path: Optional[str] = None, **meta) -> Dict:
+        """在控制台打印汇总，并写出 JSON（json_path 为 None 时只打印；meta 为附加信息，如行数）"""
+        summary = self.summary(**meta)
+        print(f'\n运行耗时汇总：共 {summary["total_seconds"]:.2f}s')
+        columns = (('次数', 8), ('总耗时', 10), ('占比', 8), ('p50', 10), ('p95', 10))
+        print(pad_display('阶段', 28) + ''.join(pad_display(title, width, right=True) for title, width in columns))
+        for name, stat in summary["stages"].items():
+            label = '  ' * name.count('/') + name.rsplit('/', 1)[-1]
+            if stat["count"] > 1:
+                p50, p95 = f'{stat["p50"] * 1e3:.1f}ms', f'{stat["p95"] * 1e3:.1f}ms'
+            else:
+                p50 = p95 = '-'
+            print(f'{pad_display(label, 28)}{stat["count"]:>8}{stat["total"]:>9.2f}s{stat["share"]:>8.1%}{p50:>10}{p95:>10}')
+        if json_path:
+            if os.path.dirname(json_path):
+                os.makedirs(os.path.dirname(json_path), exist_ok=True)
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+            print(f'耗时明细已保存到 {json_path}')
+        return summary
+
+
+class StepClock:
+    """
+    逐行子步骤计时：每次 lap(name) 记录距上一次 lap（或创建时）的耗时，
+    不需要把每一段代码包进 with 块
+    """
+
+    def __init__(self, timer: StageTimer, prefix: str):
+        self._timer = timer
+        self._prefix = prefix
+        self._last = time.perf_counter()
+
+    def lap(self, name: str):
+        now = time.perf_counter()
+        self._timer.record(f'{self._prefix}/{name}' if self._prefix else name, now - self._last)
+        self._last = now
+
+
+class _NullStepClock:
+    def lap(self, name: str):
+        pass
+
+
+_NULL_STEP_CLOCK = _NullStepClock()
+
+# 当前进程的计时注册表，为 None 时所有计时都是空操作（默认不计时）
+_stage_timer: Optional[StageTimer] = None
+
+
+def get_stage_timer() -> Optional[StageTimer]:
+    return _stage_timer
+
+
+def set_stage_timer(timer: Optional[StageTimer]):
+    """设置当前进程的计时注册表（None 表示不计时）"""
+    global _stage_timer
+    _stage_timer = timer
+
+
+def stage(name: str):
+    """阶段计时的上下文管理器：with stage("写出报告"): ..."""
+    return _stage_timer.stage(name) if _stage_timer is not None else nullcontext()
+
+
+def timed(name: str):
+    """阶段计时的装饰器：被装饰函数的每次调用记录一条"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def step_clock(prefix: str = ''):
+    """子步骤计时器，prefix 为空时记录顶层阶段（不计时时返回空操作对象）"""
+    return StepClock(_stage_timer, prefix) if _stage_timer is not None else _NULL_STEP_CLOCK
+
+
+# =========================================================
+# 性能分析
+# =========================================================
+PROFILERS = ('cprofile', 'pyinstrument')
+
+
+class RunProfiler:
+    """
+    整次运行的性能分析：cProfile（标准库，结果保存为 .prof，可用 snakeviz 等查看）
+    或 pyinstrument（需要另外安装，结果保存为 .html）
+
+    参数
+    ------
+    kind : str
+        'cprofile' 或 'pyinstrument'
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._profiler = None
+
+    def start(self):
+        if self.kind == 'cprofile':
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.kind == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                print('未安装 pyinstrument（pip install pyinstrument），本次不做性能分析')
+                return
+            self._profiler = Profiler()
+            self._profiler.start()
+        else:
+            raise ValueError(f'未知的性能分析方式: {self.kind}')
+
+    def stop(self, output_base: str) -> Optional[str]:
+        """停止分析并保存结果，返回结果文件路径（output_base 不含扩展名）"""
+        if self._profiler is None:
+            return None
+        if os.path.dirname(output_base):
+            os.makedirs(os.path.dirname(output_base), exist_ok=True)
+        if self.kind == 'cprofile':
+            import pstats
+
+            self._profiler.disable()
+            path = f'{output_base}.prof'
+            self._profiler.dump_stats(path)
+            print('\n累计耗时最多的 15 个函数：')
+            pstats.Stats(self._profiler).sort_stats('cumulative').print_stats(15)
+        else:
+            self._profiler.stop()
+            path = f'{output_base}.html'
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self._profiler.output_html())
+        self._profiler = None
+        print(f'性能分析结果已保存到 {path}')
+        return path
+
+
+if __name__ == '__main__':
+    # 不计时 / 计时两种情况下每次调用的开销
+    def work(n: int = 200) -> int:
+        return sum(range(n))
+
+    n_calls = 200000
+    results = {}
+    for name, timer in (('不计时', None), ('计时', StageTimer())):
+        set_stage_timer(timer)
+        t0 = time.perf_counter()
+        for _ in range(n_calls):
+            with stage('阶段'):
+                clock = step_clock('阶段')
+                work()
+                clock.lap('子步骤')
+        results[name] = (time.perf_counter() - t0) / n_calls
+    set_stage_timer(None)
+    t0 = time.perf_counter()
+    for _ in range(n_calls):
+        work()
+    bare = (time.perf_counter() - t0) / n_calls
+    for name, per_call in results.items():
+        print(f'{name}: 每次 {per_call * 1e6:.2f}µs（其中计时开销 {(per_call - bare) * 1e6:.2f}µs）')
@@ -1,5 +1,6 @@
 import io
 import json
+import os
 import re
 from datetime import datetime
 from io import BytesIO
@@ -8,49 +9,398 @@ import platform
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib
-from matplotlib.ticker import ScalarFormatter, FuncFormatter, FixedLocator
-import xlsxwriter
 
-# 设置中文字体支持
-def setup_chinese_font():
-    """设置 matplotlib 支持中文字体"""
+from chart_cache import CHART_CACHE_VERSION, ChartCache, content_key
+from pipeline_log import FAILED, SKIPPED, debug, row_event
+from price_series import parse_times
+
+# matplotlib 和 xlsxwriter 在第一次绘图 / 写 Excel 时才导入，不绘图的模式启动更快
+
+# 已解析的中文字体缓存（字体名和字体文件路径），避免每个进程启动时重新查找系统字体
+FONT_CACHE_PATH = 'cache/matplotlib_font.json'
+
+_matplotlib = None
+
+
+def _candidate_chinese_fonts() -> list:
+    """当前系统常用的中文字体名（按优先级排列）"""
     system = platform.system()
     if system == 'Windows':
         # Windows 系统常用中文字体
-        fonts = ['Microsoft YaHei', 'SimHei', 'SimSun', 'KaiTi']
+        return ['Microsoft YaHei', 'SimHei', 'SimSun', 'KaiTi']
     elif system == 'Darwin':  # macOS
-        fonts = ['Arial Unicode MS', 'PingFang SC', 'STHeiti']
+        return ['Arial Unicode MS', 'PingFang SC', 'STHeiti']
     else:  # Linux
-        fonts = ['WenQuanYi Micro Hei', 'WenQuanYi Zen Hei', 'Noto Sans CJK SC']
-    
-    # 尝试设置字体
-    from matplotlib.font_manager import FontManager
-    fm = FontManager()
-    available_fonts = [f.name for f in fm.ttflist]
-    
-    for font in fonts:
-        if font in available_fonts:
-            try:
-                plt.rcParams['font.sans-serif'] = [font] + plt.rcParams['font.sans-serif']
-                plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
-                return font
-            except:
-                continue
-    
-    # 如果所有字体都不可用，至少设置基本配置
-    plt.rcParams['axes.unicode_minus'] = False
-    # 尝试使用系统默认的sans-serif字体
-    plt.rcParams['font.sans-serif'] = ['DejaVu Sans', 'Arial', 'sans-serif'] + plt.rcParams['font.sans-serif']
-    return None
+        return ['WenQuanYi Micro Hei', 'WenQuanYi Zen Hei', 'Noto Sans CJK SC']
+
+
+def _font_cache_key(matplotlib_version: str) -> dict:
+    return {'system': platform.system(), 'matplotlib': matplotlib_version, 'candidates': _candidate_chinese_fonts()}
+
+
+def _load_cached_font(key: dict, cache_path: Optional[str]) -> Optional[dict]:
+    """读取字体缓存；系统、matplotlib 版本或字体文件发生变化时视为未命中"""
+    if not cache_path or not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('key') != key:
+        return None
+    if cached.get('path') and not os.path.exists(cached['path']):
+        return None
+    return cached
+
+
+def _save_cached_font(key: dict, font: Optional[str], path: Optional[str], cache_path: Optional[str]):
+    if not cache_path:
+        return
+    try:
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'font': font, 'path': path}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"保存字体缓存失败: {e}")
+
 
-# 初始化中文字体
-_chinese_font = setup_chinese_font()
-if _chinese_font:
-    print(f"已设置中文字体: {_chinese_font}")
-else:
-    print("警告: 未找到可用的中文字体，中文可能显示为方框")
+# 设置中文字体支持
+def setup_chinese_font(cache_path: Optional[str] = FONT_CACHE_PATH) -> Optional[str]:
+    """
+    设置 matplotlib 支持中文字体
+
+    优先使用缓存中的字体文件（直接 addfont，不查找系统字体）；未命中时在 matplotlib
+    已加载的字体列表中查找（不再新建 FontManager 扫描全部系统字体），并把结果写入缓存。
+
+    返回
+    ------
+    str
+        使用的中文字体名，没有可用的中文字体时返回 None
+    """
+    import matplotlib
+    from matplotlib import font_manager
+
+    key = _font_cache_key(matplotlib.__version__)
+    cached = _load_cached_font(key, cache_path)
+    if cached is not None:
+        font, path = cached.get('font'), cached.get('path')
+        if path:
+            font_manager.fontManager.addfont(path)
+    else:
+        font, path = None, None
+        font_paths = {f.name: f.fname for f in font_manager.fontManager.ttflist}
+        for candidate in _candidate_chinese_fonts():
+            if candidate in font_paths:
+                font, path = candidate, font_paths[candidate]
+                break
+        _save_cached_font(key, font, path, cache_path)
+
+    matplotlib.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+    if font:
+        matplotlib.rcParams['font.sans-serif'] = [font] + matplotlib.rcParams['font.sans-serif']
+    else:
+        # 如果所有字体都不可用，尝试使用系统默认的sans-serif字体
+        matplotlib.rcParams['font.sans-serif'] = ['DejaVu Sans', 'Arial', 'sans-serif'] + matplotlib.rcParams['font.sans-serif']
+    return font
+
+
+def _get_matplotlib():
+    """第一次调用时导入 matplotlib 并设置中文字体"""
+    global _matplotlib
+    if _matplotlib is None:
+        import matplotlib
+
+        chinese_font = setup_chinese_font()
+        if chinese_font:
+            print(f"已设置中文字体: {chinese_font}")
+        else:
+            print("警告: 未找到可用的中文字体，中文可能显示为方框")
+        _matplotlib = matplotlib
+    return _matplotlib
+
+
+def _get_pyplot():
+    """第一次调用时导入 matplotlib.pyplot（并设置中文字体）"""
+    _get_matplotlib()
+    import matplotlib.pyplot as plt
+    return plt
+
+
+# ---------- 图表渲染器（复用 Figure 和绘图元素） ----------
+# Excel 中图表按 350~400 像素显示，默认不需要 150 dpi
+DEFAULT_CHART_DPI = 80
+
+# 每类图表固定的边距（代替 tight_layout / bbox_inches="tight"）
+CHART_LAYOUTS = {
+    "traffic_cycle": dict(left=0.07, right=0.99, top=0.9, bottom=0.25),
+    "sales_trend": dict(left=0.09, right=0.98, top=0.92, bottom=0.17),
+    "price_trend": dict(left=0.09, right=0.98, top=0.92, bottom=0.2),
+}
+
+
+def _dollar_formatter(x, pos):
+    """格式化函数：将数字转换为美元格式，不保留小数"""
+    return f'${int(x)}'
+
+
+class ChartRenderer:
+    """
+    图表渲染器：每类图表（按 figsize 区分）只创建一次 Figure 和 Axes，
+    折线、柱体、文字标注放在对象池中原地更新，使用固定边距保存，不再重复计算 tight bbox。
+
+    一个进程使用一个渲染器（不是线程安全的），通过 set_chart_renderer 安装。
+
+    参数
+    ------
+    dpi : int
+        保存 PNG 的分辨率
+    """
+
+    def __init__(self, dpi: int = DEFAULT_CHART_DPI):
+        self.dpi = dpi
+        self._charts = {}
+
+    def _chart(self, kind: str, figsize) -> dict:
+        """取出（或首次创建）某类图表的 Figure、Axes 和对象池"""
+        key = (kind, tuple(figsize))
+        chart = self._charts.get(key)
+        if chart is None:
+            _get_matplotlib()
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            fig = Figure(figsize=figsize)
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+            fig.subplots_adjust(**CHART_LAYOUTS[kind])
+            chart = {"fig": fig, "ax": ax, "lines": [], "bars": [], "texts": []}
+            self._charts[key] = chart
+        return chart
+
+    def _save(self, fig) -> BytesIO:
+        image_data = io.BytesIO()
+        fig.savefig(image_data, format="png", dpi=self.dpi)
+        image_data.seek(0)
+        return image_data
+
+    @staticmethod
+    def _use_lines(ax, pool: list, data: list, **style) -> list:
+        """
+        按 data [(x, y), ...] 更新对象池中的折线，不够时新建，多余的移除
+        （隐藏的折线仍会影响图例 loc='best' 的位置，保留会使同一数据的图随之前画过的图变化）
+        """
+        for i, (x, y) in enumerate(data):
+            if i < len(pool):
+                pool[i].set_data(x, y)
+                pool[i].set(**style)
+            else:
+                pool.append(ax.plot(x, y, **style)[0])
+        for line in pool[len(data):]:
+            line.remove()
+        del pool[len(data):]
+        return pool
+
+    @staticmethod
+    def _use_texts(ax, pool: list, data: list, **style):
+        """按 data [(x, y, 文本), ...] 更新对象池中的文字标注"""
+        for i, (x, y, text) in enumerate(data):
+            if i < len(pool):
+                pool[i].set_position((x, y))
+                pool[i].set_text(text)
+                pool[i].set_visible(True)
+            else:
+                pool.append(ax.text(x, y, text, **style))
+        for text in pool[len(data):]:
+            text.set_visible(False)
+
+    @staticmethod
+    def _rescale(ax):
+        ax.relim(visible_only=True)
+        ax.autoscale_view()
+
+    def render_traffic_cycle(self, lines: list, month_range, figsize=(14, 4)) -> BytesIO:
+        """
+        绘制核心词搜索趋势图
+
+        lines : [(关键词, 月份, 搜索量, 颜色), ...]
+        month_range : 横坐标的全部月份
+        """
+        chart = self._chart("traffic_cycle", figsize)
+        ax = chart["ax"]
+        if not chart["lines"]:
+            from matplotlib.ticker import ScalarFormatter
+
+            ax.set_title("核心词搜索趋势图（近三年）", fontsize=14, fontweight='bold')
+            ax.set_xlabel("月份", fontsize=12)
+            ax.set_ylabel("搜索量", fontsize=12)
+            ax.grid(True, linestyle="--", alpha=0.4)
+            # 设置纵坐标格式：使用完整数字，不使用科学计数法
+            y_formatter = ScalarFormatter(useOffset=False, useMathText=False)
+            y_formatter.set_scientific(False)
+            ax.yaxis.set_major_formatter(y_formatter)
+
+        handles = self._use_lines(ax, chart["lines"], [(months, searches) for _, months, searches, _ in lines],
+                                  linewidth=2)
+        for handle, (keyword, _, _, color) in zip(handles, lines):
+            handle.set_color(color)
+            handle.set_label(keyword)
+        self._rescale(ax)
+
+        # 设置横坐标：每个月份都显示标签
+        ax.set_xticks(month_range)
+        ax.set_xticklabels([dt.strftime("%Y-%m") for dt in month_range], rotation=45, ha='right', fontsize=8)
+        ax.legend(handles=handles, loc='best', fontsize=8)
+        return self._save(chart["fig"])
+
+    def render_sales_trend(self, labels: list, sales: list, figsize=(10, 5)) -> BytesIO:
+        """绘制销量趋势柱状图（labels 为横坐标月份，sales 为对应销量）"""
+        chart = self._chart("sales_trend", figsize)
+        ax = chart["ax"]
+        if not chart["bars"]:
+            from matplotlib.ticker import ScalarFormatter
+
+            ax.set_title("销量趋势图", fontsize=12, fontweight='bold')
+            ax.set_xlabel("月份", fontsize=10)
+            ax.set_ylabel("销量", fontsize=10)
+            y_formatter = ScalarFormatter(useOffset=False, useMathText=False)
+            y_formatter.set_scientific(False)
+            ax.yaxis.set_major_formatter(y_formatter)
+            ax.grid(True, linestyle="--", alpha=0.3, axis='y')
+
+        # 柱体：复用已有的，不够时补建
+        bars = chart["bars"]
+        for i, value in enumerate(sales):
+            if i < len(bars):
+                bars[i].set_x(i - 0.3)
+                bars[i].set_height(value)
+                bars[i].set_visible(True)
+            else:
+                bars.extend(ax.bar([i], [value], width=0.6, color='steelblue', edgecolor='navy', linewidth=0.5))
+        for bar in bars[len(sales):]:
+            bar.set_visible(False)
+
+        # 在每个柱体上方标注sales值
+        self._use_texts(ax, chart["texts"], [(i, value, f'{int(value)}') for i, value in enumerate(sales)],
+                        ha='center', va='bottom', fontsize=8)
+        self._rescale(ax)
+
+        ax.set_xticks(range(len(labels)))
+        ax.set_xticklabels(labels, rotation=45, ha='right', fontsize=8)
+        return self._save(chart["fig"])
+
+    def render_price_trend(self, segments: list, annotations: list, y_ticks: list, tick_dates: list,
+                           tick_format: str, figsize=(10, 5)) -> BytesIO:
+        """
+        绘制价格趋势阶梯图
+
+        segments : 连续有效数据段 [(时间, 价格), ...]
+        annotations : 首尾数据点标注 [(时间, 价格, 文本), ...]
+        y_ticks : 纵坐标刻度
+        tick_dates / tick_format : 横坐标刻度和标签格式
+        """
+        from matplotlib.ticker import FixedLocator, FuncFormatter
+
+        chart = self._chart("price_trend", figsize)
+        ax = chart["ax"]
+        if not chart["lines"]:
+            ax.set_title("价格趋势图", fontsize=12, fontweight='bold')
+            ax.set_xlabel("日期", fontsize=10)
+            ax.set_ylabel("价格", fontsize=10)
+            ax.yaxis.set_major_formatter(FuncFormatter(_dollar_formatter))
+            ax.grid(True, linestyle="--", alpha=0.3)
+
+        # 绘制阶梯图（竖线和横线，不使用直接连接）
+        self._use_lines(ax, chart["lines"], segments, drawstyle='steps-post', linewidth=1, color='red')
+        self._use_texts(ax, chart["texts"], annotations, fontsize=8, ha='left', va='bottom')
+        self._rescale(ax)
+
+        # 使用FixedLocator固定刻度位置，避免matplotlib自动添加额外刻度
+        ax.yaxis.set_major_locator(FixedLocator(y_ticks))
+        ax.yaxis.set_major_formatter(FuncFormatter(_dollar_formatter))
+        ax.set_xticks(tick_dates)
+        ax.set_xticklabels([dt.strftime(tick_format) for dt in tick_dates], rotation=45, ha='right', fontsize=8)
+        return self._save(chart["fig"])
+
+
+_chart_renderer: Optional[ChartRenderer] = None
+
+
+def get_chart_renderer() -> ChartRenderer:
+    """当前进程的图表渲染器（首次使用时按默认 dpi 创建）"""
+    global _chart_renderer
+    if _chart_renderer is None:
+        _chart_renderer = ChartRenderer()
+    return _chart_renderer
+
+
+def set_chart_renderer(renderer: ChartRenderer):
+    """安装当前进程的图表渲染器（进程池中可作为 initializer 使用）"""
+    global _chart_renderer
+    _chart_renderer = renderer
+
+
+def init_chart_renderer(dpi: int = DEFAULT_CHART_DPI):
+    """按指定 dpi 创建并安装图表渲染器"""
+    set_chart_renderer(ChartRenderer(dpi=dpi))
+
+
+# ---------- 图表缓存（相同数据的图只画一次） ----------
+_chart_cache: Optional[ChartCache] = None
+_chart_cache_installed = False
+_matplotlib_version: Optional[str] = None
+
+
+def get_chart_cache() -> Optional[ChartCache]:
+    """当前进程的图表缓存（首次使用时创建默认的内存 + 磁盘缓存），None 表示不使用缓存"""
+    global _chart_cache, _chart_cache_installed
+    if not _chart_cache_installed:
+        _chart_cache = ChartCache()
+        _chart_cache_installed = True
+    return _chart_cache
+
+
+def set_chart_cache(cache: Optional[ChartCache]):
+    """安装当前进程的图表缓存（None 表示每张图都重新绘制）"""
+    global _chart_cache, _chart_cache_installed
+    _chart_cache = cache
+    _chart_cache_installed = True
+
+
+def _chart_key(kind: str, figsize, *payload) -> Optional[str]:
+    """
+    图表缓存的 key：绘图数据 + 图表类型、尺寸、dpi 和 matplotlib 版本（不导入 matplotlib）
+    数据无法计算 key 时返回 None（不使用缓存）
+    """
+    global _matplotlib_version
+    if _matplotlib_version is None:
+        from importlib.metadata import version
+        _matplotlib_version = version('matplotlib')
+    try:
+        return content_key(CHART_CACHE_VERSION, _matplotlib_version, kind, list(figsize),
+                           get_chart_renderer().dpi, *payload)
+    except Exception:
+        return None
+
+
+def _cached_chart(kind: str, figsize, *payload):
+    """查找图表缓存，返回 (key, 缓存的 PNG)；不使用缓存时 key 为 None"""
+    cache = get_chart_cache()
+    if cache is None:
+        return None, None
+    key = _chart_key(kind, figsize, *payload)
+    if key is None:
+        return None, None
+    data = cache.get(key)
+    return key, (io.BytesIO(data) if data is not None else None)
+
+
+def _store_chart(key: Optional[str], image: Optional[BytesIO]) -> Optional[BytesIO]:
+    if key is not None and image is not None:
+        get_chart_cache().put(key, image.getvalue())
+    return image
 
 
 # ---------- 安全 sheet 名 ----------
@@ -71,6 +421,7 @@ def plot_keyword_search_trend_to_bytes(
         "search": searches
     }).sort_values("month")
 
+    plt = _get_pyplot()
     fig, ax = plt.subplots(figsize=figsize)
 
     ax.plot(df["month"], df["search"], linewidth=2)
@@ -125,12 +476,19 @@ def plot_traffic_cycle_json_to_bytes(traffic_cycle_json: dict, figsize=(14, 4))
     data_list = traffic_cycle_json.get("data", [])
     if not data_list:
         return None
-    
-    # 创建图表
-    fig, ax = plt.subplots(figsize=figsize)
+
+    # 图中只用到每个关键词的 keyword / months / searches
+    try:
+        payload = [(item.get("keyword"), item.get("months"), item.get("searches")) for item in data_list]
+    except AttributeError:
+        payload = None
+    key, cached = _cached_chart("traffic_cycle", figsize, payload) if payload is not None else (None, None)
+    if cached is not None:
+        return cached
     
     # 为每个关键词绘制一条线
-    colors = plt.cm.tab10(range(len(data_list)))
+    colors = _get_matplotlib().colormaps["tab10"](range(len(data_list)))
+    lines = []  # 待绘制的趋势线 (关键词, 月份, 搜索量, 颜色)
     plotted_count = 0  # 记录成功绘制的数据条数
     all_months_dt = []  # 收集所有月份，用于设置横坐标
     
@@ -141,11 +499,13 @@ def plot_traffic_cycle_json_to_bytes(traffic_cycle_json: dict, figsize=(14, 4))
         
         # 检查数据有效性
         if not months or not searches:
-            print(f"  警告: 关键词 {keyword} 的 months 或 searches 为空，跳过")
+            row_event('关键词趋势线', SKIPPED, 'months 或 searches 为空',
+                      message=f'关键词 {keyword} 的 months 或 searches 为空，跳过')
             continue
         
         if len(months) != len(searches):
-            print(f"  警告: 关键词 {keyword} 的 months 和 searches 长度不一致 ({len(months)} vs {len(searches)})，跳过")
+            row_event('关键词趋势线', SKIPPED, 'months 和 searches 长度不一致',
+                      message=f'关键词 {keyword} 的 months 和 searches 长度不一致 ({len(months)} vs {len(searches)})，跳过')
             continue
         
         try:
@@ -158,7 +518,8 @@ def plot_traffic_cycle_json_to_bytes(traffic_cycle_json: dict, figsize=(14, 4))
                 filtered_searches = searches
             
             if not filtered_months:
-                print(f"  警告: 关键词 {keyword} 在近三年范围内没有数据，跳过")
+                row_event('关键词趋势线', SKIPPED, '近三年没有数据',
+                          message=f'关键词 {keyword} 在近三年范围内没有数据，跳过')
                 continue
             
             # 转换月份格式
@@ -170,64 +531,29 @@ def plot_traffic_cycle_json_to_bytes(traffic_cycle_json: dict, figsize=(14, 4))
             
             # 检查搜索量数据是否有效（不能全为0或全为空）
             if df["search"].sum() == 0 and df["search"].max() == 0:
-                print(f"  警告: 关键词 {keyword} 的搜索量全为0，跳过")
+                row_event('关键词趋势线', SKIPPED, '搜索量全为0', message=f'关键词 {keyword} 的搜索量全为0，跳过')
                 continue
             
             # 收集所有月份用于横坐标
             all_months_dt.extend(df["month"].tolist())
             
             # 绘制趋势线
-            ax.plot(df["month"], df["search"], 
-                   linewidth=2, 
-                   label=keyword,
-                   color=colors[idx % len(colors)])
+            lines.append((keyword, df["month"], df["search"], colors[idx % len(colors)]))
             plotted_count += 1
         except Exception as e:
-            print(f"  绘制关键词 {keyword} 时出错: {e}")
+            row_event('关键词趋势线', FAILED, '绘制出错', message=f'绘制关键词 {keyword} 时出错: {e}')
             continue
     
     # 如果没有任何数据被绘制，返回 None
     if plotted_count == 0:
-        plt.close(fig)
-        print(f"  警告: 没有有效数据可绘制，data_list 有 {len(data_list)} 项但都无法绘制")
+        debug(f'没有有效数据可绘制，data_list 有 {len(data_list)} 项但都无法绘制')
         return None
     
-    ax.set_title("核心词搜索趋势图（近三年）", fontsize=14, fontweight='bold')
-    ax.set_xlabel("月份", fontsize=12)
-    ax.set_ylabel("搜索量", fontsize=12)
-    ax.grid(True, linestyle="--", alpha=0.4)
-    
-    # 设置纵坐标格式：使用完整数字，不使用科学计数法
-    y_formatter = ScalarFormatter(useOffset=False, useMathText=False)
-    y_formatter.set_scientific(False)
-    ax.yaxis.set_major_formatter(y_formatter)
-    
-    # 设置横坐标：每个月份都显示标签
-    if all_months_dt:
-        # 获取所有唯一的月份（已排序）
-        unique_months = sorted(set(all_months_dt))
-        # 生成完整的月份序列（从最小月份到最大月份，每月一个）
-        if unique_months:
-            min_month = unique_months[0]
-            max_month = unique_months[-1]
-            # 生成完整的月份序列
-            month_range = pd.date_range(start=min_month, end=max_month, freq='MS')  # MS = Month Start
-            # 设置x轴刻度为每个月份
-            ax.set_xticks(month_range)
-            # 设置x轴标签格式为 "YYYY-MM"
-            ax.set_xticklabels([dt.strftime("%Y-%m") for dt in month_range], rotation=45, ha='right', fontsize=8)
-    
-    # 只有当有图例时才显示
-    if plotted_count > 0:
-        ax.legend(loc='best', fontsize=8)
-    
-    # 保存到内存
-    image_data = io.BytesIO()
-    fig.savefig(image_data, format="png", dpi=150, bbox_inches="tight")
-    plt.close(fig)
+    # 生成完整的月份序列（从最小月份到最大月份，每月一个），每个月份都显示标签
+    unique_months = sorted(set(all_months_dt))
+    month_range = pd.date_range(start=unique_months[0], end=unique_months[-1], freq='MS')  # MS = Month Start
     
-    image_data.seek(0)
-    return image_data
+    return _store_chart(key, get_chart_renderer().render_traffic_cycle(lines, month_range, figsize=figsize))
 
 
 # ---------- 从 sell_trend 数据绘制销量趋势柱状图（返回 BytesIO） ----------
@@ -250,6 +576,10 @@ def plot_sales_trend_to_bytes(sell_trend: list, figsize=(10, 5)) -> Optional[Byt
     """
     if not sell_trend or not isinstance(sell_trend, list):
         return None
+
+    key, cached = _cached_chart("sales_trend", figsize, sell_trend)
+    if cached is not None:
+        return cached
     
     # 提取dk和sales，并转换日期格式
     dk_list = []
@@ -280,50 +610,34 @@ def plot_sales_trend_to_bytes(sell_trend: list, figsize=(10, 5)) -> Optional[Byt
     if not dk_list:
         return None
     
-    # 创建图表
-    fig, ax = plt.subplots(figsize=figsize)
-    
-    # 绘制柱状图
-    bars = ax.bar(range(len(dk_list)), sales_list, width=0.6, color='steelblue', edgecolor='navy', linewidth=0.5)
-    
-    # 在每个柱体上方标注sales值
-    for i, (bar, sales) in enumerate(zip(bars, sales_list)):
-        height = bar.get_height()
-        # 在柱体上方标注数值
-        ax.text(bar.get_x() + bar.get_width() / 2., height,
-                f'{int(sales)}',
-                ha='center', va='bottom', fontsize=8)
-    
-    # 设置标题和标签
-    ax.set_title("销量趋势图", fontsize=12, fontweight='bold')
-    ax.set_xlabel("月份", fontsize=10)
-    ax.set_ylabel("销量", fontsize=10)
-    
-    # 设置x轴刻度，使用格式化后的日期
-    ax.set_xticks(range(len(dk_list)))
-    ax.set_xticklabels(dk_formatted_list, rotation=45, ha='right', fontsize=8)
-    
-    # 设置纵坐标格式：使用完整数字，不使用科学计数法
-    y_formatter = ScalarFormatter(useOffset=False, useMathText=False)
-    y_formatter.set_scientific(False)
-    ax.yaxis.set_major_formatter(y_formatter)
-    
-    # 添加网格
-    ax.grid(True, linestyle="--", alpha=0.3, axis='y')
-    
-    # 调整布局
-    plt.tight_layout()
-    
-    # 保存到内存
-    image_data = io.BytesIO()
-    fig.savefig(image_data, format="png", dpi=150, bbox_inches="tight")
-    plt.close(fig)
-    
-    image_data.seek(0)
-    return image_data
+    return _store_chart(key, get_chart_renderer().render_sales_trend(dk_formatted_list, sales_list, figsize=figsize))
 
 
 # ---------- 从价格趋势数据绘制价格趋势图（返回 BytesIO） ----------
+def price_trend_window_start(now: Optional[datetime] = None) -> datetime:
+    """价格趋势图只画这个时间之后的数据（近三年）"""
+    current_date = now or datetime.now()
+    return current_date.replace(year=current_date.year - 3)
+
+
+def _parse_price_time(time_str: str):
+    """解析单个非 'YYYY-MM-DD HH:MM' 格式的时间字符串"""
+    if len(time_str) == 6 and time_str.isdigit():
+        # 格式：YYYYMM，转换为该月第一天
+        return datetime.strptime(time_str, "%Y%m")
+    if len(time_str) == 7 and '-' in time_str:
+        # 格式：YYYY-MM，转换为该月第一天
+        return datetime.strptime(time_str, "%Y-%m")
+    if len(time_str) == 8 and time_str.isdigit():
+        # 格式：YYYYMMDD
+        return datetime.strptime(time_str, "%Y%m%d")
+    if len(time_str) == 10 and '-' in time_str:
+        # 格式：YYYY-MM-DD
+        return datetime.strptime(time_str, "%Y-%m-%d")
+    # 其他格式，尝试解析
+    return pd.to_datetime(time_str)
+
+
 def plot_price_trend_to_bytes(price_trend: list, times: list, figsize=(10, 5)) -> Optional[BytesIO]:
     """
     根据价格趋势数据绘制价格趋势折线图（仅使用近三年数据）
@@ -331,9 +645,10 @@ def plot_price_trend_to_bytes(price_trend: list, times: list, figsize=(10, 5)) -
     参数
     ------
     price_trend : list
-        价格数据列表
+        价格数据列表（或 price_trend_store 的 float64 数组）
     times : list
         时间数据列表，格式：["202509", "202510", ...] 或 ["2025-09", "2025-10", ...]
+        （或 price_trend_store 的 int64 秒级时间戳数组）
     figsize : tuple
         图片大小，默认 (10, 5)
     
@@ -342,13 +657,33 @@ def plot_price_trend_to_bytes(price_trend: list, times: list, figsize=(10, 5)) -
     io.BytesIO
         图片的二进制数据流，如果数据无效则返回 None
     """
-    if not price_trend or not times or len(price_trend) != len(times):
+    if price_trend is None or times is None or len(price_trend) == 0 or len(price_trend) != len(times):
         return None
     
     # 计算近三年的起始时间
-    current_date = datetime.now()
-    three_years_ago = current_date.replace(year=current_date.year - 3)
-    
+    three_years_ago = price_trend_window_start()
+
+    # 图表缓存的 key 包含近三年窗口之前的点数：日期推移、有点移出窗口时才重新绘制
+    # （时间不全是 'YYYY-MM-DD HH:MM' 格式时不使用缓存）
+    parsed = parse_times(times, fallback=False)
+    key, cached = None, None
+    if not np.isnat(parsed).any():
+        before_window = int(np.count_nonzero(parsed < np.datetime64(three_years_ago)))
+        if isinstance(times, np.ndarray):
+            key, cached = _cached_chart("price_trend", figsize, price_trend, times, before_window)
+        else:
+            key, cached = _cached_chart("price_trend", figsize, list(price_trend), list(times), before_window)
+    if cached is not None:
+        return cached
+
+    if isinstance(times, np.ndarray) and times.dtype == np.int64:
+        # price_trend_store 的定长数组：时间为秒级时间戳，null 价格已是 NaN，-1 同样视为断点
+        stamps = pd.to_datetime(times, unit='s')
+        recent = stamps >= three_years_ago
+        filtered_times = list(stamps[recent])
+        filtered_prices = np.where(price_trend == -1, np.nan, price_trend)[recent].tolist()
+        return _store_chart(key, _render_price_trend(filtered_times, filtered_prices, figsize))
+
     # 在进行绘制之前，将list中的null替换为-1
     processed_price_trend = []
     for price in price_trend:
@@ -357,28 +692,17 @@ def plot_price_trend_to_bytes(price_trend: list, times: list, figsize=(10, 5)) -
         else:
             processed_price_trend.append(price)
     
+    # 'YYYY-MM-DD HH:MM' 格式的时间已整列解析（其他格式为 None，逐个按下面的格式解析）
+    parsed_times = parsed.astype(object).tolist()
+
     # 过滤出近三年的数据，保留所有时间点（包括-1对应的），-1值将形成断点
     filtered_times = []
     filtered_prices = []
     
-    for time_str, price in zip(times, processed_price_trend):
+    for time_str, price, time_dt in zip(times, processed_price_trend, parsed_times):
         try:
-            # 解析时间字符串
-            if len(time_str) == 6 and time_str.isdigit():
-                # 格式：YYYYMM，转换为该月第一天
-                time_dt = datetime.strptime(time_str, "%Y%m")
-            elif len(time_str) == 7 and '-' in time_str:
-                # 格式：YYYY-MM，转换为该月第一天
-                time_dt = datetime.strptime(time_str, "%Y-%m")
-            elif len(time_str) == 8 and time_str.isdigit():
-                # 格式：YYYYMMDD
-                time_dt = datetime.strptime(time_str, "%Y%m%d")
-            elif len(time_str) == 10 and '-' in time_str:
-                # 格式：YYYY-MM-DD
-                time_dt = datetime.strptime(time_str, "%Y-%m-%d")
-            else:
-                # 其他格式，尝试解析
-                time_dt = pd.to_datetime(time_str)
+            if time_dt is None:
+                time_dt = _parse_price_time(time_str)
             
             # 只保留近三年的数据
             if time_dt >= three_years_ago:
@@ -389,15 +713,17 @@ def plot_price_trend_to_bytes(price_trend: list, times: list, figsize=(10, 5)) -
                 else:
                     filtered_prices.append(price)
         except Exception as e:
-            print(f"  解析时间字符串 '{time_str}' 时出错: {e}")
+            row_event('价格时间', SKIPPED, '无法解析', message=f"解析时间字符串 '{time_str}' 时出错: {e}")
             continue
-    
+
+    return _store_chart(key, _render_price_trend(filtered_times, filtered_prices, figsize))
+
+
+def _render_price_trend(filtered_times: list, filtered_prices: list, figsize) -> Optional[BytesIO]:
+    """按近三年的时间点和价格（NaN 为断点）分段、计算刻度并绘制价格趋势图"""
     if not filtered_times:
         return None
     
-    # 创建图表
-    fig, ax = plt.subplots(figsize=figsize)
-    
     # 将数据分成连续的有效数据段，每个段单独绘制
     # 这样可以避免-1值（NaN）被连接，形成断点
     filtered_prices_array = np.array(filtered_prices)
@@ -436,137 +762,66 @@ def plot_price_trend_to_bytes(price_trend: list, times: list, figsize=(10, 5)) -
                 first_valid_idx = i
             last_valid_idx = i
     
-    # 绘制每个连续的有效数据段
-    for start_idx, end_idx in segments:
-        segment_times = filtered_times[start_idx:end_idx + 1]
-        segment_prices = filtered_prices[start_idx:end_idx + 1]
-        
-        # 绘制阶梯图（竖线和横线，不使用直接连接）
-        # drawstyle='steps-post' 表示先画横线，然后在点之后画竖线改变值
-        ax.plot(segment_times, segment_prices, drawstyle='steps-post', linewidth=1, color='red')
+    # 每个连续的有效数据段单独绘制
+    segment_data = [
+        (filtered_times[start_idx:end_idx + 1], filtered_prices[start_idx:end_idx + 1])
+        for start_idx, end_idx in segments
+    ]
     
     # 在第一个和最后一个数据点处添加文本标注
-    if first_valid_idx is not None and last_valid_idx is not None:
-        first_time = filtered_times[first_valid_idx]
-        first_price = filtered_prices[first_valid_idx]
-        last_time = filtered_times[last_valid_idx]
-        last_price = filtered_prices[last_valid_idx]
-        
-        # 标注第一个数据点
-        ax.text(first_time, first_price, f'${first_price:.2f}', 
-                fontsize=8, ha='left', va='bottom')
-        
-        # 标注最后一个数据点
-        ax.text(last_time, last_price, f'${last_price:.2f}', 
-                fontsize=8, ha='left', va='bottom')
-    
-    # 设置标题和标签
-    ax.set_title("价格趋势图", fontsize=12, fontweight='bold')
-    ax.set_xlabel("日期", fontsize=10)
-    ax.set_ylabel("价格", fontsize=10)
+    annotations = []
+    for i in (first_valid_idx, last_valid_idx):
+        annotations.append((filtered_times[i], filtered_prices[i], f'${filtered_prices[i]:.2f}'))
     
     # 手动设置y轴刻度，避免重复的标签
-    if filtered_prices:
-        # 过滤掉 None 和 NaN 值，确保只处理有效的价格数据
-        valid_prices = [p for p in filtered_prices if p is not None and not (isinstance(p, float) and np.isnan(p))]
-        if not valid_prices:
-            return None
-        
-        min_price = min(valid_prices)
-        max_price = max(valid_prices)
-        
-        # 固定使用1美元为间隔
-        # 从最小价格的整数部分开始，到最大价格的整数部分+1结束，间隔为1
-        y_ticks = list(range(int(min_price), int(max_price) + 2))
-        
-        # 确保刻度点不重复
-        y_ticks = sorted(set(y_ticks))
-        # 使用FixedLocator固定刻度位置，避免matplotlib自动添加额外刻度
-        ax.yaxis.set_major_locator(FixedLocator(y_ticks))
+    # 过滤掉 None 和 NaN 值，确保只处理有效的价格数据
+    valid_prices = [p for p in filtered_prices if p is not None and not (isinstance(p, float) and np.isnan(p))]
+    if not valid_prices:
+        return None
+    
+    # 固定使用1美元为间隔
+    # 从最小价格的整数部分开始，到最大价格的整数部分+1结束，间隔为1
+    y_ticks = list(range(int(min(valid_prices)), int(max(valid_prices)) + 2))
     
     # 设置x轴刻度
-    if filtered_times:
-        # 获取所有时间点
-        unique_times = sorted(set(filtered_times))
-        if unique_times:
-            min_time = unique_times[0]
-            max_time = unique_times[-1]
-            
-            # 计算时间跨度（月份数）
-            # 计算两个日期之间的月份差
-            months_diff = (max_time.year - min_time.year) * 12 + (max_time.month - min_time.month)
-            
-            # 如果时间跨度小于等于2个月，使用日期标注（年-月-日）
-            if months_diff <= 2:
-                # 按日期去重，每天只保留一个刻度点（使用每天的第一个时间点）
-                # 这样可以避免同一天有多个数据点时，x轴显示重复的日期标签
-                daily_times = {}
-                for dt in unique_times:
-                    date_key = dt.date()  # 只使用日期部分（不包含时间）
-                    if date_key not in daily_times:
-                        daily_times[date_key] = dt
-                tick_dates = sorted(daily_times.values())
-                ax.set_xticks(tick_dates)
-                # 设置x轴标签格式为 "YYYY-MM-DD"（年-月-日）
-                ax.set_xticklabels([dt.strftime("%Y-%m-%d") for dt in tick_dates], rotation=45, ha='right', fontsize=8)
+    unique_times = sorted(set(filtered_times))
+    min_time = unique_times[0]
+    max_time = unique_times[-1]
+    
+    # 计算时间跨度（月份数）
+    months_diff = (max_time.year - min_time.year) * 12 + (max_time.month - min_time.month)
+    
+    if months_diff <= 2:
+        # 时间跨度小于等于2个月，使用日期标注（年-月-日）
+        # 按日期去重，每天只保留一个刻度点（使用每天的第一个时间点），避免x轴显示重复的日期标签
+        daily_times = {}
+        for dt in unique_times:
+            daily_times.setdefault(dt.date(), dt)
+        tick_dates = sorted(daily_times.values())
+        tick_format = "%Y-%m-%d"
+    else:
+        # 时间跨度大于2个月，使用月份标注（年-月），标注数据范围内的每月1日
+        tick_dates = []
+        current_date = min_time.replace(day=1)
+        while current_date <= max_time:
+            if min_time <= current_date:
+                tick_dates.append(current_date)
+            # 移动到下一个月
+            if current_date.month == 12:
+                current_date = current_date.replace(year=current_date.year + 1, month=1, day=1)
             else:
-                # 如果时间跨度大于2个月，使用月份标注（年-月）
-                # 生成所有需要标注的月份点（每月1日）
-                tick_dates = []
-                # 从最小日期的月初开始
-                current_date = min_time.replace(day=1)
-                
-                while current_date <= max_time:
-                    # 只添加在数据范围内的日期
-                    if min_time <= current_date <= max_time:
-                        tick_dates.append(current_date)
-                    
-                    # 移动到下一个月
-                    if current_date.month == 12:
-                        current_date = current_date.replace(year=current_date.year + 1, month=1, day=1)
-                    else:
-                        current_date = current_date.replace(month=current_date.month + 1, day=1)
-                
-                # 去重并排序
-                tick_dates = sorted(set(tick_dates))
-                
-                # 设置x轴刻度
-                if tick_dates:
-                    ax.set_xticks(tick_dates)
-                    # 设置x轴标签格式为 "YYYY-MM"（只显示年-月）
-                    ax.set_xticklabels([dt.strftime("%Y-%m") for dt in tick_dates], rotation=45, ha='right', fontsize=8)
-                else:
-                    # 如果没有生成标注点，使用默认的自动标注
-                    ax.tick_params(axis='x', rotation=45)
-        else:
-            # 如果没有时间点，使用默认的自动标注
-            ax.tick_params(axis='x', rotation=45)
-    
-    # 设置纵坐标格式：显示美元符号，不保留小数
-    def dollar_formatter(x, pos):
-        """格式化函数：将数字转换为美元格式，不保留小数"""
-        return f'${int(x)}'
-    
-    y_formatter = FuncFormatter(dollar_formatter)
-    ax.yaxis.set_major_formatter(y_formatter)
+                current_date = current_date.replace(month=current_date.month + 1, day=1)
+        tick_format = "%Y-%m"
     
-    # 添加网格
-    ax.grid(True, linestyle="--", alpha=0.3)
-    
-    # 调整布局
-    plt.tight_layout()
-    
-    # 保存到内存
-    image_data = io.BytesIO()
-    fig.savefig(image_data, format="png", dpi=150, bbox_inches="tight")
-    plt.close(fig)
-    
-    image_data.seek(0)
-    return image_data
+    return get_chart_renderer().render_price_trend(
+        segment_data, annotations, y_ticks, tick_dates, tick_format, figsize=figsize
+    )
 
 
 # ---------- 核心：json → Excel ----------
 def traffic_cycle_json_to_excel(traffic_cycle_json: dict, excel_path: str):
+    import xlsxwriter
+
     workbook = xlsxwriter.Workbook(excel_path)
 
     data_list = traffic_cycle_json.get("data", [])
@@ -647,5 +902,55 @@ def main():
     print(f"\n[DONE] Excel 已生成: {excel_path}")
 
 
+# ---------- 渲染速度对比 ----------
+def benchmark_chart_rendering(data_file: str, rounds: int = 3):
+    """
+    对比每张图新建 Figure（150 dpi，原做法）和复用 Figure（默认 dpi）的出图速度
+
+    参数
+    ------
+    data_file : str
+        asin详细数据 Excel 路径（使用其中的 核心词周期数据 / 销量数据 列）
+    """
+    import contextlib
+    import time
+    from trend_decoder import decode_payload
+
+    # 只比较绘图本身，不使用图表缓存
+    set_chart_cache(None)
+    df = pd.read_excel(data_file)
+    traffic = [decode_payload(v) for v in df["核心词周期数据"].dropna()]
+    sales = [decode_payload(v) for v in df["销量数据"].dropna()]
+
+    def run(fresh_figure: bool):
+        count, size = 0, 0
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(rounds):
+                for traffic_json, sell_trend in zip(traffic, sales):
+                    for plot, data in ((plot_traffic_cycle_json_to_bytes, traffic_json),
+                                       (plot_sales_trend_to_bytes, sell_trend)):
+                        if fresh_figure:
+                            set_chart_renderer(ChartRenderer(dpi=150))
+                        image = plot(data)
+                        if image is not None:
+                            count += 1
+                            size += len(image.getvalue())
+        return count / (time.perf_counter() - start), size / max(count, 1)
+
+    # 原做法：每张图新建 Figure
+    fresh = run(fresh_figure=True)
+    # 复用同一个 Figure
+    init_chart_renderer()
+    reused = run(fresh_figure=False)
+    print(f"新建 Figure（150 dpi）: {fresh[0]:.1f} 张/秒，平均 {fresh[1] / 1024:.0f} KB")
+    print(f"复用 Figure（{DEFAULT_CHART_DPI} dpi）: {reused[0]:.1f} 张/秒，平均 {reused[1] / 1024:.0f} KB")
+
+
 if __name__ == "__main__":
-    main()
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        benchmark_chart_rendering("input_file/kinds/2026-02-02/asin详细数据-2026-02-02.xlsx")
+    else:
+        main()
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Dict, Tuple, Union, Mapping, Literal
 
 
@@ -76,8 +77,12 @@ def get_price_rules(main_menu: str, sub_menu: str) -> PriceRules:
     1. 只尝试精确匹配 (main_menu.lower(), sub_menu.lower())
     2. 若未命中，则返回空字典（表示当前类目未配置价格规则）
     """
-    key = (main_menu.strip().lower(), sub_menu.strip().lower())
+    return PRICE_RULES_BY_MENU.get(_menu_key(main_menu, sub_menu), {})
 
-    return PRICE_RULES_BY_MENU.get(key, {})
+
+@lru_cache(maxsize=None)
+def _menu_key(main_menu: str, sub_menu: str) -> Tuple[str, str]:
+    """类目名标准化（每种组合只计算一次）"""
+    return main_menu.strip().lower(), sub_menu.strip().lower()
 
 
@@ -0,0 +1,243 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# 价格趋势数据中时间的格式
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+# 解析后的时间统一为微秒精度（datetime 对象可以无损转换）
+TIME_DTYPE = 'datetime64[us]'
+
+
+# =========================================================
+# 时间解析
+# =========================================================
+def parse_time(t):
+    if isinstance(t, datetime):
+        return t
+    return datetime.strptime(t, TIME_FORMAT)
+
+
+def _parse_canonical(strings: List[str]) -> np.ndarray:
+    """按 TIME_FORMAT 整列解析，只接受补零的标准写法（解析结果回写成字符串必须与原文一致），其余为 NaT"""
+    try:
+        minutes = np.array(strings, dtype='datetime64[m]')
+    except ValueError:
+        # 有无法解析的元素时逐个解析
+        minutes = np.array([_try_datetime64(s) for s in strings], dtype='datetime64[m]')
+    canonical = np.datetime_as_string(minutes, unit='m') == np.array([s.replace(' ', 'T') for s in strings])
+    return np.where(canonical, minutes.astype(TIME_DTYPE), np.datetime64('NaT'))
+
+
+def _try_datetime64(s: str):
+    try:
+        return np.datetime64(s, 'm')
+    except ValueError:
+        return np.datetime64('NaT')
+
+
+def parse_times(times, fallback: bool = True) -> np.ndarray:
+    """
+    批量解析时间列（只解析一次）
+
+    参数
+    ------
+    times : list / np.ndarray
+        'YYYY-MM-DD HH:MM' 字符串或 datetime 列表，或 price_trend_store 的 int64 秒级时间戳数组
+    fallback : bool
+        为 True 时非标准写法（如不补零）的字符串再逐个用 parse_time 解析，结果与逐个调用 parse_time 一致；
+        为 False 时只接受标准写法
+
+    返回
+    ------
+    np.ndarray
+        datetime64[us] 数组，无法解析的元素为 NaT
+    """
+    if isinstance(times, np.ndarray):
+        if times.dtype == np.int64:
+            return times.astype('datetime64[s]').astype(TIME_DTYPE)
+        if np.issubdtype(times.dtype, np.datetime64):
+            return times.astype(TIME_DTYPE)
+    times = list(times)
+    result = np.full(len(times), np.datetime64('NaT'), dtype=TIME_DTYPE)
+
+    str_idx = [i for i, t in enumerate(times) if isinstance(t, str)]
+    if str_idx:
+        result[str_idx] = _parse_canonical([times[i] for i in str_idx])
+    dt_idx = [i for i, t in enumerate(times) if isinstance(t, datetime)]
+    if dt_idx:
+        result[dt_idx] = np.array([times[i] for i in dt_idx], dtype=TIME_DTYPE)
+
+    if fallback:
+        for i in str_idx:
+            if np.isnat(result[i]):
+                try:
+                    result[i] = np.datetime64(parse_time(times[i]), 'us')
+                except Exception:
+                    continue
+    return result
+
+
+def month_keys(times: np.ndarray) -> np.ndarray:
+    """datetime64 数组转成 int 形式的 YYYYMM"""
+    months = times.astype('datetime64[M]').astype(np.int64)
+    return (months // 12 + 1970) * 100 + months % 12 + 1
+
+
+# =========================================================
+# price 规范化（支持 list / tuple / 标量）
+# =========================================================
+def normalize_price(p):
+    if p is None:
+        return None
+
+    # 如果是列表，取最后一个有效值
+    if isinstance(p, (list, tuple)):
+        for v in reversed(p):
+            if v is None:
+                continue
+            try:
+                return float(v)
+            except Exception:
+                continue
+        return None
+
+    try:
+        return float(p)
+    except Exception:
+        return None
+
+
+def normalize_prices(prices) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批量规范化价格（结果与逐个调用 normalize_price 一致）
+
+    返回
+    ------
+    (float64 价格数组, 是否有效的 bool 数组)
+    """
+    prices = list(prices)
+    if {type(p) for p in prices} <= {int, float, bool, type(None)}:
+        try:
+            values = np.array(prices, dtype=np.float64)
+        except OverflowError:
+            values = None
+        # None 转成了 NaN；原数据中本身就有 NaN 时无法区分，逐个处理
+        if values is not None:
+            missing = np.isnan(values)
+            if np.count_nonzero(missing) == prices.count(None):
+                return values, ~missing
+    normalized = [normalize_price(p) for p in prices]
+    valid = np.array([v is not None for v in normalized], dtype=bool)
+    values = np.array([np.nan if v is None else v for v in normalized], dtype=np.float64)
+    return values, valid
+
+
+# =========================================================
+# 价格时间序列
+# =========================================================
+@dataclass
+class PriceTimeSeries:
+    """清洗后的价格时间序列（只含有效点）"""
+    prices: np.ndarray  # float64
+    times: np.ndarray  # datetime64[us]
+    months: Optional[np.ndarray] = None  # int64，YYYYMM
+
+    def __post_init__(self):
+        if self.months is None:
+            self.months = month_keys(self.times)
+
+    @classmethod
+    def from_raw(cls, prices, times) -> 'PriceTimeSeries':
+        """
+        清洗原始价格和时间（与 filter_valid_data 的逐点处理一致：时间无法解析或价格无效的点去掉，顺序不变）
+
+        prices / times 可以是 JSON 中的原始列表，也可以是 price_trend_store 的数组（NaN 价格视为无效）
+        """
+        n = min(len(prices), len(times))
+        if isinstance(prices, np.ndarray) and prices.dtype == np.float64:
+            values = prices[:n]
+            valid = ~np.isnan(values)
+        else:
+            values, valid = normalize_prices(list(prices)[:n])
+        stamps = parse_times(times[:n] if isinstance(times, np.ndarray) else list(times)[:n])
+        keep = valid & ~np.isnat(stamps)
+        return cls(values[keep], stamps[keep])
+
+    def __len__(self):
+        return len(self.prices)
+
+    def take(self, index) -> 'PriceTimeSeries':
+        """按 bool 掩码或下标取子序列"""
+        return PriceTimeSeries(self.prices[index], self.times[index], self.months[index])
+
+    def sorted(self) -> 'PriceTimeSeries':
+        """按时间排序（时间相同的点保持原顺序）"""
+        return self.take(np.argsort(self.times, kind='stable'))
+
+    def last_n_days(self, days) -> 'PriceTimeSeries':
+        """最后一个时间点往前 days 天内的点"""
+        if not len(self):
+            return self
+        return self.take(self.times >= self.times.max() - np.timedelta64(timedelta(days=days)))
+
+    def in_sales_months(self, sales_data) -> 'PriceTimeSeries':
+        """
+        只保留有销量的月份的点
+
+        sales_data 为 [{'dk': 'YYYYMM', 'sales': int}, ...]；不是列表或没有销量大于 0 的月份时不筛选
+        """
+        if not sales_data or not isinstance(sales_data, list):
+            return self
+        sales_months = set()
+        for item in sales_data:
+            if isinstance(item, dict):
+                dk = item.get('dk')
+                sales = item.get('sales', 0)
+                if dk and sales and sales > 0:
+                    sales_months.add(dk)
+        if not sales_months:
+            return self
+        # 只有 'YYYYMM' 字符串能与时间对应的月份匹配
+        keys = [int(dk) for dk in sales_months if isinstance(dk, str) and len(dk) == 6 and dk.isascii() and dk.isdigit()]
+        return self.take(np.isin(self.months, keys))
+
+    def datetimes(self) -> List[datetime]:
+        return self.times.astype(datetime).tolist()
+
+
+
+if __name__ == '__main__':
+    # 与逐点调用 parse_time / normalize_price 的一致性检查 + 耗时对比（使用 input_file 下所有价格趋势数据）
+    import glob
+    import json
+    import time
+
+    series = []
+    for path in sorted(glob.glob('input_file/*/*/*.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            for info in json.load(f).values():
+                if isinstance(info, dict):
+                    series.append((info.get('price_trend') or [], info.get('times') or []))
+    series.append(([1, None, '2.5', [3, None], True, 'x'],
+                   ['2025-01-05 03:07', '2025-1-5 3:07', None, '2025-01-05', datetime(2025, 3, 1, 12, 0, 5), '']))
+
+    def _parse_one(t):
+        try:
+            return parse_time(t)
+        except Exception:
+            return None
+
+    t0 = time.perf_counter()
+    expected = [([normalize_price(p) for p in prices], [_parse_one(t) for t in times]) for prices, times in series]
+    t1 = time.perf_counter()
+    actual = [(normalize_prices(prices), parse_times(times)) for prices, times in series]
+    t2 = time.perf_counter()
+
+    for (prices, times), ((values, valid), stamps) in zip(expected, actual):
+        assert [p is not None for p in prices] == valid.tolist()
+        assert [p for p in prices if p is not None] == values[valid].tolist()
+        assert times == stamps.astype(object).tolist()
+    print(f'一致性检查通过：{len(series)} 条序列，{sum(len(t) for _, t in series)} 个时间点；'
+          f'逐点解析 {t1 - t0:.3f}s，整列解析 {t2 - t1:.3f}s')
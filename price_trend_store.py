@@ -0,0 +1,370 @@
+import glob
+import hashlib
+import json
+import os
+import re
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from merge_cache import file_fingerprint
+from pipeline_log import error
+from price_series import parse_times
+
+# 价格趋势二进制索引的缓存目录
+PRICE_TREND_CACHE_DIR = 'cache/price_trend'
+# 索引格式变化时加 1，旧索引自动失效
+PRICE_TREND_CACHE_VERSION = 1
+# 流式读取 JSON 时每次读入的字符数
+READ_CHUNK_SIZE = 1 << 20
+
+# 不含嵌套对象的值（如 {"price_trend": [...], "times": [...]}）用一次正则匹配整体跳过
+_FLAT_OBJECT_RE = re.compile(r'\{[^{}"]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^{}"]*)*\}')
+# 其他值逐个扫描括号和字符串（单独的引号表示字符串在缓冲区末尾被截断）
+_SKIP_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]{}"]')
+_WHITESPACE_RE = re.compile(r'\s*')
+
+
+# =========================================================
+# 流式读取顶层 JSON 对象
+# =========================================================
+class _JsonObjectReader:
+    """分块读取 {key: value, ...} 形式的 JSON 文件，只解码需要的 key 对应的值"""
+
+    def __init__(self, f, chunk_size: int = READ_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """丢弃已处理的部分并读入下一块，文件已读完时返回 False"""
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError('价格趋势 JSON 不完整')
+
+    def _expect(self, chars: str) -> str:
+        ch = self._peek()
+        if ch not in chars:
+            raise ValueError(f'价格趋势 JSON 格式错误：位置 {self.pos} 处应为 {chars!r}，实际为 {ch!r}')
+        self.pos += 1
+        return ch
+
+    def _decode(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # 值恰好结束在缓冲区末尾时（如数字）可能还没读完
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def _skip(self):
+        """跳过一个值（不构造 Python 对象）"""
+        if self._peek() not in '[{':
+            self._decode()
+            return
+        m = _FLAT_OBJECT_RE.match(self.buf, self.pos)
+        if m:
+            self.pos = m.end()
+            return
+        depth = 0
+        while True:
+            for m in _SKIP_TOKEN_RE.finditer(self.buf, self.pos):
+                token = m.group()
+                if token == '"':
+                    # 字符串被截断，从引号处继续
+                    self.pos = m.start()
+                    break
+                if token in '[{':
+                    depth += 1
+                elif token in ']}':
+                    depth -= 1
+                    if depth == 0:
+                        self.pos = m.end()
+                        return
+            else:
+                self.pos = len(self.buf)
+            if not self._fill():
+                raise ValueError('价格趋势 JSON 不完整')
+
+    def items(self, wanted: Optional[set] = None) -> Iterator[Tuple[str, Any]]:
+        """逐个返回 (key, value)，wanted 不为 None 时只解码其中的 key"""
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._decode()
+            self._expect(':')
+            if wanted is None or key in wanted:
+                yield key, self._decode()
+            else:
+                self._skip()
+            if self._expect(',}') == '}':
+                return
+
+
+def iter_price_trend_json(file_path: str, asins: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, Any]]:
+    """
+    流式读取价格趋势 JSON，逐个返回 (asin, 原始数据)
+
+    asins 不为 None 时只解码其中的 ASIN，其余 ASIN 的数据直接跳过
+    """
+    wanted = None if asins is None else set(asins)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        yield from _JsonObjectReader(f).items(wanted)
+
+
+# =========================================================
+# 转为定长数组
+# =========================================================
+def to_typed_series(info: Any) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    把 {'price_trend': [...], 'times': [...]} 转成 (价格 float64 数组, 时间 int64 秒级时间戳数组)
+
+    价格只能是数字或 null（null 转为 NaN），时间必须都是 'YYYY-MM-DD HH:MM' 格式；
+    其他数据返回 None，保持原样使用，保证下游判断结果不变。
+    """
+    if not isinstance(info, dict):
+        return None
+    prices = info.get('price_trend')
+    times = info.get('times')
+    if not isinstance(prices, list) or not isinstance(times, list) or len(prices) != len(times):
+        return None
+    if not {type(p) for p in prices} <= {int, float, type(None)} or not {type(t) for t in times} <= {str}:
+        return None
+    # null 转为 NaN；原数据中本身就是 NaN 的价格无法与 null 区分，保持原样
+    price_values = np.array(prices, dtype=np.float64)
+    if np.count_nonzero(np.isnan(price_values)) != prices.count(None):
+        return None
+    # 只接受标准写法的时间，其他写法保持原样交给 parse_time 逐个处理
+    stamps = parse_times(times, fallback=False)
+    if np.isnat(stamps).any():
+        return None
+    return price_values, stamps.astype('datetime64[s]').astype(np.int64)
+
+
+class PriceTrendStore(Mapping):
+    """
+    价格趋势数据：asin → {'price_trend': 价格, 'times': 时间}
+
+    能转成定长数组的 ASIN 返回 float64 价格数组和 int64 秒级时间戳数组（null 价格为 NaN，
+    数组可以直接是内存映射的视图），其余 ASIN 返回原始数据。
+    """
+
+    def __init__(self, prices: np.ndarray, times: np.ndarray,
+                 spans: Dict[str, Tuple[int, int]], raw: Dict[str, Any]):
+        self._prices = prices
+        self._times = times
+        self._spans = spans
+        self._raw = raw
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[str, Any]]) -> 'PriceTrendStore':
+        price_parts, time_parts = [], []
+        spans, raw = {}, {}
+        offset = 0
+        for asin, info in items:
+            typed = to_typed_series(info)
+            if typed is None:
+                raw[asin] = info
+                spans.pop(asin, None)
+                continue
+            price_parts.append(typed[0])
+            time_parts.append(typed[1])
+            spans[asin] = (offset, len(typed[0]))
+            raw.pop(asin, None)
+            offset += len(typed[0])
+        prices = np.concatenate(price_parts) if price_parts else np.empty(0, dtype=np.float64)
+        times = np.concatenate(time_parts) if time_parts else np.empty(0, dtype=np.int64)
+        return cls(prices, times, spans, raw)
+
+    def subset(self, asins: Iterable[str]) -> 'PriceTrendStore':
+        """只保留指定 ASIN（共用同一份数组）"""
+        wanted = set(asins)
+        return PriceTrendStore(
+            self._prices, self._times,
+            {a: span for a, span in self._spans.items() if a in wanted},
+            {a: info for a, info in self._raw.items() if a in wanted},
+        )
+
+    def __getitem__(self, asin):
+        span = self._spans.get(asin)
+        if span is None:
+            return self._raw[asin]
+        start, length = span
+        return {
+            'price_trend': self._prices[start:start + length],
+            'times': self._times[start:start + length],
+        }
+
+    def __iter__(self):
+        yield from self._spans
+        yield from self._raw
+
+    def __len__(self):
+        return len(self._spans) + len(self._raw)
+
+    def __contains__(self, asin):
+        return asin in self._spans or asin in self._raw
+
+
+# =========================================================
+# 二进制索引（sidecar）
+# =========================================================
+def _sidecar_base(file_path: str, cache_dir: str) -> Tuple[str, str]:
+    """返回 (同一源文件的缓存前缀, 当前内容对应的缓存路径前缀)"""
+    fingerprint = file_fingerprint(file_path)
+    key = hashlib.sha1(json.dumps(
+        {'version': PRICE_TREND_CACHE_VERSION, 'file': fingerprint}, sort_keys=True
+    ).encode('utf-8')).hexdigest()
+    source = hashlib.sha1(fingerprint['path'].encode('utf-8')).hexdigest()
+    prefix = os.path.join(cache_dir, f'price_trend_{source[:12]}_')
+    return prefix, f'{prefix}{key[:16]}'
+
+
+def write_sidecar(store: PriceTrendStore, base_path: str):
+    """
+    写出二进制索引：{base_path}.bin 依次保存所有价格（float64）和所有时间（int64），
+    {base_path}.json 保存每个 ASIN 的 (起始位置, 长度) 以及无法转为数组的原始数据
+    """
+    with open(f'{base_path}.bin.tmp', 'wb') as f:
+        f.write(np.ascontiguousarray(store._prices, dtype=np.float64).tobytes())
+        f.write(np.ascontiguousarray(store._times, dtype=np.int64).tobytes())
+    with open(f'{base_path}.json.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'count': len(store._prices), 'spans': store._spans, 'raw': store._raw}, f, ensure_ascii=False)
+    os.replace(f'{base_path}.bin.tmp', f'{base_path}.bin')
+    os.replace(f'{base_path}.json.tmp', f'{base_path}.json')
+
+
+def read_sidecar(base_path: str) -> PriceTrendStore:
+    """内存映射读取二进制索引，不解析价格趋势 JSON"""
+    with open(f'{base_path}.json', 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    count = index['count']
+    if count:
+        data = np.memmap(f'{base_path}.bin', dtype=np.float64, mode='r', shape=(2 * count,))
+        prices = data[:count]
+        times = data[count:].view(np.int64)
+    else:
+        prices, times = np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64)
+    spans = {asin: (start, length) for asin, (start, length) in index['spans'].items()}
+    return PriceTrendStore(prices, times, spans, index['raw'])
+
+
+# =========================================================
+# 加载入口
+# =========================================================
+def load_price_trend_store(
+    file_path: str,
+    asins: Optional[Iterable] = None,
+    use_cache: bool = True,
+    cache_dir: str = PRICE_TREND_CACHE_DIR
+) -> PriceTrendStore:
+    """
+    加载价格趋势 JSON（替代 load_price_trend_data）
+
+    使用缓存时以文件指纹为 key 查找二进制索引，命中时直接内存映射，不解析 JSON；
+    未命中时流式解析整个文件写出索引。不使用缓存时只流式解码 asins 中的 ASIN。
+
+    参数
+    ------
+    file_path : str
+        价格趋势 JSON 路径
+    asins : Iterable, optional
+        需要的 ASIN（如合并后 DataFrame 的 asin 列），None 表示全部
+    use_cache : bool
+        是否使用 / 写入二进制索引
+
+    返回
+    ------
+    PriceTrendStore
+        asin → {'price_trend', 'times'}，读取失败时为空
+    """
+    wanted = None if asins is None else {asin for asin in asins if isinstance(asin, str)}
+    try:
+        if not use_cache:
+            store = PriceTrendStore.from_items(iter_price_trend_json(file_path, wanted))
+            print(f'成功读取价格趋势数据，共 {len(store)} 个ASIN')
+            return store
+
+        prefix, base_path = _sidecar_base(file_path, cache_dir)
+        store = None
+        if os.path.exists(f'{base_path}.json') and os.path.exists(f'{base_path}.bin'):
+            try:
+                store = read_sidecar(base_path)
+                print(f'命中价格趋势索引: {base_path}.bin')
+            except Exception as e:
+                print(f'读取价格趋势索引失败，重新解析: {e}')
+        if store is None:
+            store = PriceTrendStore.from_items(iter_price_trend_json(file_path))
+            os.makedirs(cache_dir, exist_ok=True)
+            for old_path in glob.glob(f'{glob.escape(prefix)}*'):
+                os.remove(old_path)
+            write_sidecar(store, base_path)
+            print(f'已写入价格趋势索引: {base_path}.bin')
+        total = len(store)
+        if wanted is not None:
+            store = store.subset(wanted)
+        print(f'成功读取价格趋势数据，共 {total} 个ASIN，本次使用 {len(store)} 个')
+        return store
+    except FileNotFoundError:
+        print(f'警告: 未找到价格趋势文件 {file_path}，将跳过价格趋势图')
+    except Exception as e:
+        error(f'读取价格趋势文件时出错: {e}')
+    return PriceTrendStore.from_items([])
+
+
+if __name__ == '__main__':
+    # 与 json.load 的一致性检查 + 耗时对比（使用 input_file 下所有价格趋势数据，索引写到临时目录）
+    import json
+    import math
+    import tempfile
+    import time
+
+    def _as_raw(info):
+        if not isinstance(info.get('times'), np.ndarray):
+            return info
+        return {'price_trend': [None if math.isnan(p) else p for p in info['price_trend'].tolist()],
+                'times': [str(t).replace('T', ' ') for t in info['times'].astype('datetime64[s]').astype('datetime64[m]')]}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for path in sorted(glob.glob('input_file/*/*/*.json')):
+            t0 = time.perf_counter()
+            with open(path, 'r', encoding='utf-8') as f:
+                expected = json.load(f)
+            t1 = time.perf_counter()
+            wanted = list(expected)[::3]
+            streamed = load_price_trend_store(path, wanted, use_cache=False)
+            t2 = time.perf_counter()
+            built = load_price_trend_store(path, cache_dir=tmp_dir)
+            t3 = time.perf_counter()
+            mapped = load_price_trend_store(path, list(expected), cache_dir=tmp_dir)
+            t4 = time.perf_counter()
+
+            assert {a: _as_raw(streamed[a]) for a in streamed} == {a: expected[a] for a in wanted}
+            for store in (built, mapped):
+                assert {a: _as_raw(store[a]) for a in store} == expected
+            typed = sum(isinstance(mapped[a].get('times'), np.ndarray) for a in mapped)
+            print(f'一致性检查通过：{path}（{typed}/{len(expected)} 个ASIN 转为数组）；'
+                  f'json.load {t1 - t0:.3f}s，流式读取 1/3 {t2 - t1:.3f}s，建索引 {t3 - t2:.3f}s，命中索引 {t4 - t3:.4f}s')
@@ -0,0 +1,266 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class ValueRule:
+    """
+    一条开发结论规则：when 中的条件全部满足时给出 decision 和 reason
+
+    when 的 key 为特征名（见 build_rule_features），value 为要求的取值，
+    多个可选取值用 tuple 表示。
+    """
+    when: Dict[str, Any]
+    decision: str
+    reason: str
+
+
+# 流量周期状态（由 规则层建议 中的 can_develop 说明判断）
+_TRAFFIC_STATES = ('能赶上', '赶不上', '识别不到')
+
+
+def _grid_rules(when: Dict[str, Any], prefix: str, grid: Dict[str, Any], flat_values=('平稳', '其他')) -> List[ValueRule]:
+    """
+    按 价格趋势 × 流量周期状态 的决策表生成规则
+
+    grid 的 key 为价格趋势分组（上升 / 波动/下降 / 平稳），value 为按 能赶上、赶不上、识别不到
+    排列的三个结论；value 为单个字符串时表示与流量周期无关。
+    flat_values 为“平稳”分支实际匹配的趋势分组（原逻辑中平稳分支是 else，会包含其他趋势）。
+    """
+    rules = []
+    for trend_label, decisions in grid.items():
+        trend = flat_values if trend_label == '平稳' else trend_label
+        if isinstance(decisions, str):
+            rules.append(ValueRule({**when, 'trend': trend}, decisions, f'{prefix}，价格趋势{trend_label}'))
+            continue
+        for traffic, decision in zip(_TRAFFIC_STATES, decisions):
+            rules.append(ValueRule(
+                {**when, 'trend': trend, 'traffic': traffic},
+                decision,
+                f'{prefix}，价格趋势{trend_label}，{traffic}流量周期'
+            ))
+    return rules
+
+
+# 榜单开发 toys&games / plates：数据完整性 → 人工规则 → 流量周期 → 价格趋势
+PLATES_RULES = [
+    *[
+        ValueRule({'complete': True, 'person_rule': True, 'pass_rule': True, 'traffic': traffic, 'trend': trend},
+                  decision, f'数据完整，通过人工规则，{traffic}流量周期，价格趋势{trend}')
+        for traffic, grid in (('能赶上', {'上升': '开发', '波动/下降': '追踪', '平稳': '开发'}),
+                              ('赶不上', {'上升': '追踪', '波动/下降': '待定', '平稳': '追踪'}))
+        for trend, decision in grid.items()
+    ],
+    ValueRule({'complete': True, 'person_rule': True, 'pass_rule': True, 'traffic': '识别不到', 'trend': '上升'},
+              '追踪', '数据完整，通过人工规则，没有识别到流量周期，价格趋势上升'),
+    ValueRule({'complete': True, 'person_rule': True, 'pass_rule': True, 'traffic': '识别不到',
+               'trend': ('波动/下降', '平稳')},
+              '待定', '数据完整，没通过人工规则，识别不到流量周期，价格波动/下降/平稳'),
+    ValueRule({'complete': True, 'person_rule': True, 'pass_rule': False}, '不开发', '数据完整，没通过人工规则'),
+    ValueRule({'complete': True, 'person_rule': False, 'trend': '上升'}, '追踪', '数据完整，没有对应人工规则，价格趋势上升'),
+    ValueRule({'complete': True, 'person_rule': False, 'trend': ('波动/下降', '平稳')},
+              '不开发', '数据完整，没有对应人工规则，价格趋势波动/下降/平稳'),
+    ValueRule({'complete': False, 'price_missing': True}, '待定', '数据不完整，缺少价格'),
+    ValueRule({'complete': False, 'cycle_missing': True}, '待定', '数据不完整，缺少流量周期'),
+    ValueRule({'complete': False, 'trend': '上升'}, '追踪', '数据不完整，缺少pcs，价格趋势上升'),
+    ValueRule({'complete': False, 'trend': '波动/下降'}, '不开发', '数据不完整，缺少pcs，价格趋势波动/下降'),
+    ValueRule({'complete': False, 'trend': '平稳'}, '待定', '数据不完整，有价格，有流量周期，价格趋势平稳'),
+]
+
+# 榜单开发 toys&games / banners：销量 → 价格趋势 → 流量周期
+BANNERS_RULES = [
+    *_grid_rules({'complete': True, 'sales_ge_50': True}, '数据完整，销量≥50', {
+        '上升': ('开发', '追踪', '开发'),
+        '波动/下降': ('追踪', '不开发', '追踪'),
+        '平稳': ('开发', '追踪', '开发'),
+    }),
+    *_grid_rules({'complete': True, 'sales_ge_50': False}, '数据完整，销量<50', {
+        '上升': ('追踪', '不开发', '追踪'),
+        '波动/下降': ('待定', '不开发', '待定'),
+        '平稳': ('追踪', '待定', '追踪'),
+    }),
+    ValueRule({'complete': False, 'sales_missing': True}, '待定', '数据不完整，没有销量'),
+    ValueRule({'complete': False, 'trend_missing': True}, '待定', '数据不完整，有销量没有价格趋势'),
+    ValueRule({'complete': False}, '追踪', '数据不完整，有销量，有价格趋势，没有流量周期'),
+]
+
+# 榜单开发 toys&games / centerpieces 和 店铺开发：价格 → 销量 → 价格趋势 → 流量周期
+PRICE_SALES_RULES = [
+    *_grid_rules({'complete': True, 'price_ge_999': True, 'sales_ge_50': True}, '数据完整，价格≥$9.99，销量≥50', {
+        '上升': ('开发', '追踪', '开发'),
+        '波动/下降': ('追踪', '待定', '追踪'),
+        '平稳': ('开发', '追踪', '追踪'),
+    }),
+    *_grid_rules({'complete': True, 'price_ge_999': True, 'sales_ge_50': False}, '数据完整，价格≥$9.99，销量<50', {
+        '上升': ('追踪', '待定', '追踪'),
+        '波动/下降': ('待定', '不开发', '待定'),
+        '平稳': ('追踪', '待定', '追踪'),
+    }),
+    *_grid_rules({'complete': True, 'price_ge_999': False, 'sales_ge_50': True}, '数据完整，价格<$9.99，销量≥50', {
+        '上升': ('追踪', '待定', '追踪'),
+        '波动/下降': ('待定', '不开发', '待定'),
+        '平稳': ('追踪', '待定', '追踪'),
+    }),
+    *_grid_rules({'complete': True, 'price_ge_999': False, 'sales_ge_50': False}, '数据完整，价格<$9.99，销量<50', {
+        '上升': ('待定', '不开发', '待定'),
+        '波动/下降': '不开发',
+        '平稳': ('待定', '不开发', '待定'),
+    }),
+    ValueRule({'complete': False, 'price_missing': True}, '待定', '数据不完整，没有价格'),
+    ValueRule({'complete': False, 'sales_missing': True}, '待定', '数据不完整，有价格，没有销量'),
+    ValueRule({'complete': False, 'trend_missing': True}, '待定', '数据不完整，有价格，有销量，没有价格趋势'),
+    # 与原逻辑一致：这一条的结论和说明是互换的
+    ValueRule({'complete': False}, '数据不完整，有价格，有销量，有价格趋势，没有流量周期', '追踪'),
+]
+
+# (开发类型, 主类目, 子类目) → 规则表；店铺开发不区分类目
+RULE_TABLES = {
+    ('榜单开发', 'toys&games', 'plates'): PLATES_RULES,
+    ('榜单开发', 'toys&games', 'banners'): BANNERS_RULES,
+    ('榜单开发', 'toys&games', 'centerpieces'): PRICE_SALES_RULES,
+    ('店铺开发', None, None): PRICE_SALES_RULES,
+}
+
+# 价格字符串中的第一个数字（与 pass_rule.parse_price 一致）
+_PRICE_RE = r"(\d+(?:\.\d+)?)"
+
+
+def _text_column(df: pd.DataFrame, col: str) -> np.ndarray:
+    """与原逻辑 str(row.get(col, '')).strip() 相同的文本列（空值为 'nan'）"""
+    if col not in df.columns:
+        return np.full(len(df), '', dtype=object)
+    return np.array([str(value).strip() for value in df[col].tolist()], dtype=object)
+
+
+def _contains(values: np.ndarray, text: str) -> np.ndarray:
+    return pd.Series(values, dtype=object).str.contains(text, regex=False).to_numpy(dtype=bool)
+
+
+def _sales_at_least(sales: np.ndarray, mask: np.ndarray, threshold: float) -> np.ndarray:
+    """mask 内的行按 float(销量) >= threshold 判断；无法转换时与原逻辑一样抛出 ValueError"""
+    result = np.zeros(len(sales), dtype=bool)
+    if mask.any():
+        result[mask] = sales[mask].astype(str).astype(float) >= threshold
+    return result
+
+
+def _price_at_least(price: np.ndarray, mask: np.ndarray, threshold: float, index: pd.Index) -> np.ndarray:
+    """mask 内的行按 parse_price(价格) >= threshold 判断；有价格无法解析时抛出 ValueError（列出行号和取值）"""
+    result = np.zeros(len(price), dtype=bool)
+    if mask.any():
+        numbers = pd.Series(price[mask], index=index[mask], dtype=object).str.extract(_PRICE_RE, expand=False)
+        invalid = numbers.isna()
+        if invalid.any():
+            rows = invalid.index[invalid.to_numpy()].tolist()
+            values = price[mask][invalid.to_numpy()].tolist()
+            raise ValueError(f'无法解析价格: 第{rows}行 {values}')
+        result[mask] = numbers.astype(float).to_numpy() >= threshold
+    return result
+
+
+def build_rule_features(df: pd.DataFrame, scope: Tuple[str, Optional[str], Optional[str]]) -> Dict[str, np.ndarray]:
+    """
+    按列计算规则表用到的特征
+
+    参数
+    ------
+    df : pd.DataFrame
+        含 核心词周期 / 价格趋势类型 / 价格 / 规则层建议 / 上月销量 列的数据
+    scope : tuple
+        RULE_TABLES 的 key，决定“数据完整”的判断方式
+
+    返回
+    ------
+    Dict[str, np.ndarray]
+        特征名 → 每行的取值
+    """
+    cycle = _text_column(df, '核心词周期')
+    price_trend = _text_column(df, '价格趋势类型')
+    price = _text_column(df, '价格')
+    reason = _text_column(df, '规则层建议')
+    sales = _text_column(df, '上月销量')
+
+    trend = np.select(
+        [price_trend == '上升', (price_trend == '波动') | (price_trend == '下降'), price_trend == '平稳'],
+        ['上升', '波动/下降', '平稳'],
+        default='其他'
+    ).astype(object)
+    identified = ~_contains(reason, '未识别到流量周期')
+    catch_up = _contains(reason, '可赶上')
+    traffic = np.select([~identified, catch_up], ['识别不到', '能赶上'], default='赶不上').astype(object)
+
+    features = {
+        'trend': trend,
+        'traffic': traffic,
+        'person_rule': ~_contains(reason, '该类目下没有'),
+        'pass_rule': _contains(reason, '通过规则校验'),
+        'price_missing': price == 'nan',
+        'cycle_missing': cycle == 'nan',
+        'sales_missing': sales == 'nan',
+        'trend_missing': price_trend == 'nan',
+    }
+
+    # 数据完整性（与 judgment_data_complete 一致；价格趋势和销量是字符串，永远不是 None）
+    if scope == ('榜单开发', 'toys&games', 'plates'):
+        complete = ~_contains(cycle, '未识别到明显周期') & ~_contains(reason, 'pcs解析失败')
+    elif scope == ('榜单开发', 'toys&games', 'banners'):
+        complete = np.ones(len(df), dtype=bool)
+    else:
+        complete = ~features['price_missing'] & ~features['sales_missing']
+    features['complete'] = complete
+
+    # 数值条件只在数据完整的行上计算（原逻辑也只在这些行上转换）
+    needs_sales = complete if scope != ('榜单开发', 'toys&games', 'plates') else np.zeros(len(df), dtype=bool)
+    features['sales_ge_50'] = _sales_at_least(sales, needs_sales, 50)
+    needs_price = complete if RULE_TABLES.get(scope) is PRICE_SALES_RULES else np.zeros(len(df), dtype=bool)
+    features['price_ge_999'] = _price_at_least(price, needs_price, 9.99, df.index)
+    return features
+
+
+def _rule_mask(rule: ValueRule, features: Dict[str, np.ndarray], n_rows: int) -> np.ndarray:
+    mask = np.ones(n_rows, dtype=bool)
+    for name, expected in rule.when.items():
+        values = features[name]
+        if isinstance(expected, tuple):
+            mask &= np.isin(values, expected)
+        else:
+            mask &= values == expected
+    return mask
+
+
+def evaluate_product_value_rules(
+    df: pd.DataFrame,
+    development_kind: Optional[str],
+    masterKind: Optional[str] = None,
+    slaverKind: Optional[str] = None
+) -> Tuple[List[str], List[str]]:
+    """
+    按规则表批量计算 开发结论 和 开发结论说明
+
+    规则按顺序匹配，第一条满足的规则生效；没有规则满足时结论和说明为空字符串。
+
+    返回
+    ------
+    Tuple[List[str], List[str]]
+        (开发结论列表, 开发结论说明列表)，与 df 的行一一对应
+    """
+    n_rows = len(df)
+    if development_kind == '店铺开发':
+        scope = ('店铺开发', None, None)
+    elif development_kind == '榜单开发':
+        scope = (development_kind, masterKind, slaverKind)
+    else:
+        return ['错误开发类别'] * n_rows, ['错误开发类别'] * n_rows
+
+    rules = RULE_TABLES.get(scope)
+    if not rules:
+        return [''] * n_rows, [''] * n_rows
+
+    features = build_rule_features(df, scope)
+    masks = [_rule_mask(rule, features, n_rows) for rule in rules]
+    decisions = np.select(masks, [rule.decision for rule in rules], default='').astype(object)
+    reasons = np.select(masks, [rule.reason for rule in rules], default='').astype(object)
+    return decisions.tolist(), reasons.tolist()
@@ -0,0 +1,286 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from chart_cache import update_hash
+from data_processor import ROW_RESULT_FIELDS, RowResult
+from plot_search_trend import price_trend_window_start
+from pipeline_log import count, info
+from price_series import parse_times
+
+# 增量模式的逐行结果库
+RESULT_STORE_PATH = 'cache/row_results.sqlite'
+# 逐行处理逻辑或结果格式变化时加 1，旧结果自动失效
+RESULT_STORE_VERSION = 1
+# 每次查询的 ASIN 数（SQLite 的参数个数有上限）
+_QUERY_CHUNK = 500
+
+
+# =========================================================
+# 结果 key
+# =========================================================
+def _price_window_part(price_info: Any, window_start: datetime, today: str) -> str:
+    """
+    价格趋势图只画近三年的数据，日期推移时最早的点会移出窗口。
+    用窗口外的点数作为 key 的一部分；时间不是标准格式时无法判断，按日期失效。
+    """
+    times = price_info.get('times') if isinstance(price_info, dict) else None
+    if times is None or len(times) == 0:
+        return ''
+    try:
+        stamps = parse_times(times, fallback=False)
+    except Exception:
+        return today
+    if np.isnat(stamps).any():
+        return today
+    return str(np.count_nonzero(stamps < np.datetime64(window_start)))
+
+
+def row_result_key(row: pd.Series, price_info: Any, context: Dict[str, Any],
+                   window_start: datetime, today: str) -> str:
+    """
+    单行结果的 key：该行的 sell_trend / search_trend / 价格趋势数据，以及其他会影响结果的输入
+    （标题、价格、材质、run_context 中的运行参数、价格趋势图的时间窗口）
+    """
+    h = hashlib.sha1()
+    update_hash(h, context)
+    for col in ('asin', '销量数据', '核心词周期数据', '产品标题', '价格', '材质'):
+        value = row.get(col)
+        update_hash(h, None if value is None or (isinstance(value, float) and np.isnan(value)) else value)
+    if isinstance(price_info, dict):
+        update_hash(h, price_info.get('price_trend'))
+        update_hash(h, price_info.get('times'))
+    else:
+        update_hash(h, price_info)
+    update_hash(h, _price_window_part(price_info, window_start, today))
+    return h.hexdigest()
+
+
+def run_context(now: datetime, chart_dpi: int, **kind_kwargs) -> Dict[str, Any]:
+    """本次运行中所有行共用的 key 部分"""
+    return {
+        'version': RESULT_STORE_VERSION,
+        'development_kind': os.getenv('DEVELOPMENT_KIND'),
+        'kind': {k: kind_kwargs[k] for k in sorted(kind_kwargs)},
+        'chart_dpi': chart_dpi,
+        # 上月销量、流量周期的统计区间、开发时机都按当前月份计算
+        'month': now.strftime('%Y%m'),
+    }
+
+
+# =========================================================
+# 结果库
+# =========================================================
+class RowResultStore:
+    """
+    逐行处理结果（结果列 + 三类趋势图 PNG），按 (开发模式 / 类目, 结果 key) 保存在 SQLite 文件中
+
+    同一 ASIN 出现在多行且数据不同时，每份数据各保存一份结果；写入时删除该 ASIN 本次不再出现的旧结果。
+    """
+
+    def __init__(self, path: str = RESULT_STORE_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        # 旧版本的表每个 ASIN 只能保存一份结果，直接丢弃重建（只是缓存）
+        schema = self._conn.execute("SELECT sql FROM sqlite_master WHERE name = 'row_results'").fetchone()
+        if schema is not None and 'PRIMARY KEY (scope, asin)' in schema[0]:
+            self._conn.execute('DROP TABLE row_results')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS row_results ('
+            'scope TEXT NOT NULL, asin TEXT NOT NULL, key TEXT NOT NULL, result BLOB NOT NULL, '
+            'updated_at TEXT NOT NULL, PRIMARY KEY (scope, key))'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS row_results_asin ON row_results (scope, asin)')
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get_many(self, scope: str, keys: Iterable[str]) -> Dict[str, Dict]:
+        """取出 keys 中已保存的结果 {key: 结果}"""
+        keys = list(keys)
+        found = {}
+        for start in range(0, len(keys), _QUERY_CHUNK):
+            chunk = keys[start:start + _QUERY_CHUNK]
+            rows = self._conn.execute(
+                f'SELECT key, result FROM row_results WHERE scope = ? AND key IN ({",".join("?" * len(chunk))})',
+                [scope, *chunk],
+            )
+            for key, blob in rows:
+                found[key] = pickle.loads(blob)
+        return found
+
+    def put_many(self, scope: str, items: Iterable[Tuple[str, str, Dict]],
+                 current_keys: Optional[Dict[str, Set[str]]] = None):
+        """
+        写入 (asin, key, 结果)
+
+        current_keys 为本次输入中每个 ASIN 的全部 key {asin: {key}}，这些 ASIN 的其他（旧数据的）结果被删除
+        """
+        updated_at = datetime.now().isoformat(timespec='seconds')
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO row_results (scope, asin, key, result, updated_at) VALUES (?, ?, ?, ?, ?)',
+            [(scope, asin, key, pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL), updated_at)
+             for asin, key, record in items],
+        )
+        if current_keys:
+            asins = list(current_keys)
+            stale = []
+            for start in range(0, len(asins), _QUERY_CHUNK):
+                chunk = asins[start:start + _QUERY_CHUNK]
+                rows = self._conn.execute(
+                    f'SELECT asin, key FROM row_results WHERE scope = ? AND asin IN ({",".join("?" * len(chunk))})',
+                    [scope, *chunk],
+                )
+                stale += [(scope, key) for asin, key in rows if key not in current_keys[asin]]
+            self._conn.executemany('DELETE FROM row_results WHERE scope = ? AND key = ?', stale)
+        self._conn.commit()
+
+
+def _to_record(result: RowResult) -> Dict:
+    return {
+        'fields': {name: getattr(result, name) for _, name in ROW_RESULT_FIELDS},
+        'images': dict(result.images),
+    }
+
+
+def _from_record(idx, record: Dict) -> RowResult:
+    return RowResult(idx=idx, images=dict(record['images']), **record['fields'])
+
+
+# =========================================================
+# 增量处理
+# =========================================================
+class IncrementalRun:
+    """
+    一次增量处理：先按 key 查出可复用的结果，其余行处理完后写回结果库
+
+    参数
+    ------
+    store : RowResultStore
+        结果库
+    df : pd.DataFrame
+        本次要处理的表格
+    price_trend_data : Mapping
+        价格趋势数据 {asin: {'price_trend', 'times'}}
+    chart_dpi : int
+        趋势图分辨率
+    kind_kwargs :
+        类目参数（masterKind / slaverKind）
+    """
+
+    def __init__(self, store: RowResultStore, df: pd.DataFrame, price_trend_data, chart_dpi: int, **kind_kwargs):
+        self.store = store
+        now = datetime.now()
+        context = run_context(now, chart_dpi, **kind_kwargs)
+        window_start, today = price_trend_window_start(now), now.strftime('%Y-%m-%d')
+        self.scope = json.dumps([context['development_kind'], context['kind']], ensure_ascii=False)
+
+        self._keys: Dict[Any, Tuple[str, str]] = {}
+        for idx, row in df.iterrows():
+            asin = row.get('asin')
+            if isinstance(asin, str):
+                self._keys[idx] = (asin, row_result_key(row, price_trend_data.get(asin), context, window_start, today))
+        # 同一 ASIN 出现多次时按各自的 key 查找（数据不同的行各有一份结果）
+        records = store.get_many(self.scope, {key for _, key in self._keys.values()})
+
+        self.reused: List[RowResult] = []
+        for idx, (asin, key) in self._keys.items():
+            if key in records:
+                self.reused.append(_from_record(idx, records[key]))
+        reused_idx = {result.idx for result in self.reused}
+        self.pending = df[[idx not in reused_idx for idx in df.index]]
+        self.total = len(df)
+        self._index = df.index
+
+    def save(self, results: List[RowResult]):
+        """把新计算的结果写回结果库，并删除本次出现的 ASIN 不再使用的旧结果"""
+        current_keys: Dict[str, Set[str]] = {}
+        for asin, key in self._keys.values():
+            current_keys.setdefault(asin, set()).add(key)
+        self.store.put_many(self.scope, [
+            (*self._keys[result.idx], _to_record(result)) for result in results if result.idx in self._keys
+        ], current_keys)
+
+    def merge(self, results: List[RowResult]) -> List[RowResult]:
+        """复用的结果和新计算的结果按原表顺序合并"""
+        merged = self.reused + results
+        positions = self._index.get_indexer([result.idx for result in merged])
+        return [merged[i] for i in np.argsort(positions, kind='stable')]
+
+    def report(self):
+        hits = len(self.reused)
+        ratio = hits / self.total if self.total else 0.0
+        count('增量模式', '复用上次结果', n=hits)
+        count('增量模式', '重新处理', n=len(self.pending))
+        info(f'增量模式：{self.total} 行中 {hits} 行复用上次结果（命中率 {ratio:.1%}），重新处理 {len(self.pending)} 行')
+
+
+if __name__ == '__main__':
+    # 冷启动 / 热启动一致性检查，表中包含同一 ASIN 数据不同的重复行
+    import glob
+    import tempfile
+    import time
+
+    from data_processor import load_and_merge_data
+    from plot_search_trend import DEFAULT_CHART_DPI
+    from row_engine import process_rows
+
+    os.environ['DEVELOPMENT_KIND'] = '榜单开发'
+    kind_kwargs = {'masterKind': 'toys&games', 'slaverKind': 'banners'}
+    day = sorted(glob.glob('input_file/rank/*/'))[-1]
+    base = load_and_merge_data(glob.glob(f'{day}best-sellers-*.xlsx')[0], glob.glob(f'{day}crawl-*-bsr.xlsx')[0])
+    base = base.head(8)
+    # 第 0 行的 ASIN 再出现 3 次（销量数据不同），第 1 行的 ASIN 再出现 1 次（核心词周期数据不同），第 3 行原样重复
+    duplicates = []
+    for n in range(3):
+        row = base.iloc[0].copy()
+        row['销量数据'] = str(row['销量数据']).replace("'sales': ", f"'sales': {n + 1}", 1)
+        duplicates.append(row)
+    row = base.iloc[1].copy()
+    row['核心词周期数据'] = base.iloc[2]['核心词周期数据']
+    duplicates += [row, base.iloc[3].copy()]
+    df = pd.concat([base, pd.DataFrame(duplicates)], ignore_index=True)
+    price_trend_data = {}
+
+    def run(frame: pd.DataFrame, store: RowResultStore):
+        frame = frame.copy()
+        images = ({}, {}, {})
+        t0 = time.perf_counter()
+        process_rows(frame, price_trend_data, *images, result_store=store, **kind_kwargs)
+        return frame, images, time.perf_counter() - t0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with RowResultStore(os.path.join(tmp, 'row_results.sqlite')) as store:
+            expected, expected_images, cold = run(df, None)
+            run(df, store)
+            warm_run = IncrementalRun(store, df, price_trend_data, DEFAULT_CHART_DPI, **kind_kwargs)
+            assert len(warm_run.pending) == 0, f'热启动应全部复用，重新处理了 {len(warm_run.pending)} 行'
+            actual, actual_images, warm = run(df, store)
+            pd.testing.assert_frame_equal(expected, actual)
+            assert expected_images == actual_images
+
+            # 去掉一份重复数据后再运行：该 ASIN 不再出现的结果被删除
+            trimmed = df.drop(index=len(base))
+            run(trimmed, store)
+            asin = base.iloc[0]['asin']
+            (stored,) = store._conn.execute(
+                'SELECT COUNT(*) FROM row_results WHERE asin = ?', [asin]).fetchone()
+            assert stored == 3, f'{asin} 应保留 3 份结果，实际 {stored}'
+    print(f'一致性检查通过：{len(df)} 行（其中 {len(duplicates)} 行 ASIN 重复）；'
+          f'冷启动 {cold:.2f}s，热启动 {warm:.2f}s，命中率 100%')
@@ -0,0 +1,184 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, List, Any, Tuple
+
+import pandas as pd
+
+from data_processor import (
+    RowResult, ROW_RESULT_COLUMNS, IMAGE_KINDS,
+    build_traffic_cycle_table, compute_row_result, apply_row_results
+)
+from pipeline_log import PipelineLog, debug, get_pipeline_log, info, progress, set_pipeline_log
+from pipeline_timing import StageTimer, get_stage_timer, set_stage_timer, stage
+from plot_search_trend import DEFAULT_CHART_DPI, init_chart_renderer
+from result_store import IncrementalRun, RowResultStore
+
+
+def _init_worker(chart_dpi: int, timing: bool, log_level: int, log_records: bool):
+    """
+    子进程初始化：图表渲染器 + 计时注册表（主进程开启计时时子进程也计时）+ 日志
+    （控制台消息直接输出，计数和 JSONL 记录随结果带回主进程）
+    """
+    init_chart_renderer(chart_dpi)
+    set_stage_timer(StageTimer() if timing else None)
+    set_pipeline_log(PipelineLog(level=log_level, progress=False, buffer_records=log_records))
+
+
+def _process_row_task(
+    task: Tuple[Any, pd.Series, Optional[Dict], Dict[str, Any], Optional[Tuple]]
+) -> Tuple[RowResult, Optional[Dict[str, List[float]]], Dict]:
+    """进程池任务入口（必须是模块级函数才能被 pickle），同时返回本任务的计时记录和日志计数"""
+    idx, row, price_info, kind_kwargs, traffic_cycle = task
+    debug(f'处理第{idx}行（进程 {os.getpid()}）')
+    with stage('逐行处理/单行'):
+        result = compute_row_result(idx, row, price_info, precomputed_traffic_cycle=traffic_cycle, **kind_kwargs)
+    timer = get_stage_timer()
+    return result, timer.drain() if timer is not None else None, get_pipeline_log().drain()
+
+
+def process_rows(
+    df: pd.DataFrame,
+    price_trend_data: Dict,
+    traffic_cycle_images: Dict[int, Optional[bytes]],
+    sales_trend_images: Dict[int, Optional[bytes]],
+    price_trend_images: Dict[int, Optional[bytes]],
+    workers: int = 1,
+    chart_dpi: int = DEFAULT_CHART_DPI,
+    result_store: Optional[RowResultStore] = None,
+    **kind_kwargs
+):
+    """
+    处理所有行数据
+
+    参数
+    ------
+    workers : int
+        进程数。1 表示串行处理；大于 1 时使用进程池并行处理，输出与串行处理完全一致；
+        0 表示使用全部 CPU 核心。
+        两种方式都先收集每行的结果记录，最后一次性写回 df 和图片字典。
+    chart_dpi : int
+        趋势图 PNG 的分辨率（每个进程各自创建一个图表渲染器，复用 Figure）
+    result_store : RowResultStore
+        增量模式的结果库。输入数据（sell_trend / search_trend / 价格趋势等）与上次相同的 ASIN
+        直接复用保存的结果列和趋势图，只处理新增或变化的行，处理完写回结果库；为 None 时处理所有行
+    kind_kwargs :
+        透传给 compute_row_result 的类目参数（masterKind / slaverKind）
+    """
+    if workers == 0:
+        workers = os.cpu_count() or 1
+
+    incremental = None
+    pending = df
+    if result_store is not None:
+        incremental = IncrementalRun(result_store, df, price_trend_data, chart_dpi, **kind_kwargs)
+        incremental.report()
+        pending = incremental.pending
+
+    results = _compute_results(pending, price_trend_data, workers, chart_dpi, kind_kwargs)
+
+    if incremental is not None:
+        incremental.save(results)
+        results = incremental.merge(results)
+    with stage('逐行处理/写回结果'):
+        apply_row_results(df, results, traffic_cycle_images, sales_trend_images, price_trend_images)
+
+
+def _compute_results(
+    df: pd.DataFrame,
+    price_trend_data: Dict,
+    workers: int,
+    chart_dpi: int,
+    kind_kwargs: Dict[str, Any]
+) -> List[RowResult]:
+    """逐行计算结果记录（不修改 df）"""
+    if df.empty:
+        return []
+
+    init_chart_renderer(chart_dpi)
+
+    # 整份报告的流量周期一次批量计算
+    with stage('逐行处理/流量周期批量计算'):
+        traffic_cycle_table = build_traffic_cycle_table(df)
+
+    if workers <= 1:
+        results = []
+        for i, (idx, row) in enumerate(df.iterrows()):
+            debug(f'第{i}行')
+            with stage('逐行处理/单行'):
+                results.append(compute_row_result(
+                    idx,
+                    row,
+                    price_trend_data.get(row['asin']),
+                    precomputed_traffic_cycle=traffic_cycle_table.get(idx),
+                    **kind_kwargs
+                ))
+            progress(i + 1, len(df))
+        return results
+
+    # 每个任务只携带本行需要的价格趋势数据，避免把整个字典传给每个进程
+    tasks = [
+        (idx, row, price_trend_data.get(row['asin']), kind_kwargs, traffic_cycle_table.get(idx))
+        for idx, row in df.iterrows()
+    ]
+    chunksize = max(1, len(tasks) // (workers * 4))
+    info(f'使用 {workers} 个进程并行处理 {len(tasks)} 行数据')
+    timer = get_stage_timer()
+    pipeline_log = get_pipeline_log()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(chart_dpi, timer is not None, pipeline_log.level,
+                                       pipeline_log.has_jsonl)) as executor:
+        # executor.map 保证结果顺序与任务顺序一致
+        results = []
+        for result, records, log_records in executor.map(_process_row_task, tasks, chunksize=chunksize):
+            results.append(result)
+            if timer is not None:
+                timer.merge(records)
+            pipeline_log.merge(log_records)
+            progress(len(results), len(tasks))
+        return results
+
+if __name__ == '__main__':
+    import time
+    import numpy as np
+
+    def write_cells_with_loc(df: pd.DataFrame, results: List[RowResult]):
+        """原做法：逐个单元格 df.loc 写入"""
+        for result in results:
+            for col, value in result.cells().items():
+                df.loc[result.idx, col] = value
+
+    # 每行的结果列耗时（不含绘图），对比逐单元格写入和整列写入随行数的变化
+    rng = np.random.default_rng(0)
+    for n_rows in (100, 1000, 5000, 20000):
+        base = pd.DataFrame({
+            'asin': [f'B{i:09d}' for i in range(n_rows)],
+            '价格': rng.uniform(5, 30, n_rows).round(2),
+            '产品标题': ['Dinosaur Party Plates and Napkins Serves 16'] * n_rows,
+        })
+        results = [
+            RowResult(
+                idx=i,
+                price_trend_type=['上升', '下降', '平稳', '数据不足'][i % 4],
+                last_month_sales=int(rng.integers(0, 500)) if i % 7 else None,
+                core_word_cycle=f'{i % 12 + 1}月-{(i + 3) % 12 + 1}月',
+                pcs=f'{i % 50} pcs',
+                development_decision=['是', '否', '待定'][i % 3],
+                rule_suggestion='销量达标；可以开发',
+                images={kind: b'' for kind in IMAGE_KINDS},
+            )
+            for i in range(n_rows)
+        ]
+
+        elapsed = {}
+        frames = {}
+        for name, write in (('df.loc', write_cells_with_loc),
+                            ('apply_row_results', lambda df, rs: apply_row_results(df, rs, {}, {}, {}))):
+            frames[name] = base.copy()
+            t0 = time.perf_counter()
+            write(frames[name], results)
+            elapsed[name] = time.perf_counter() - t0
+        pd.testing.assert_frame_equal(frames['df.loc'][ROW_RESULT_COLUMNS[:6]],
+                                      frames['apply_row_results'][ROW_RESULT_COLUMNS[:6]], check_dtype=False)
+        print(f'{n_rows:>6} 行：df.loc {elapsed["df.loc"] / n_rows * 1e6:8.1f} µs/行，'
+              f'apply_row_results {elapsed["apply_row_results"] / n_rows * 1e6:6.1f} µs/行，'
+              f'加速 {elapsed["df.loc"] / elapsed["apply_row_results"]:.0f}x')
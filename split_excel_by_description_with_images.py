@@ -1,9 +1,23 @@
-from io import BytesIO
-from openpyxl import load_workbook, Workbook
-from openpyxl.drawing.image import Image as XLImage
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Alignment, Font, Fill, PatternFill, Border, Side
 import os
+import pickle
+import posixpath
+import shutil
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Tuple
+
+from openpyxl import load_workbook
+
+from excel_handler import image_size, xlsxwriter_image_scale
+from pipeline_log import FAILED, row_event
+
+# 拆分后的 sheet 顺序（"源数据"之后按主要类别）
+SHEET_ORDER = ["源数据", "开发", "追踪", "待定", "不开发"]
+# 需要设置文本换行的列
+SPLIT_WRAP_COLUMNS = ["商品链接", "产品标题", "主题", "核心词周期", "原因", "商品潜力说明"]
+# openpyxl 中没有设置列宽的列按默认列宽处理
+DEFAULT_COLUMN_WIDTH = 13
 
 
 def excel_colwidth_to_pixels(width):
@@ -34,265 +48,343 @@ def extract_main_category(conclusion_value):
     return conclusion_str
 
 
-def split_excel_by_description_with_images(
-    input_path: str,
-    output_path: str,
-    desc_col_name: str = "开发结论"
-):
-    wb = load_workbook(input_path)
-    src_ws = wb.worksheets[0]
-
-    headers = [cell.value for cell in src_ws[1]]
-    if desc_col_name not in headers:
-        raise ValueError(f"未找到列：{desc_col_name}")
-
-    desc_col_idx = headers.index(desc_col_name) + 1
-    
-    # 找到"开发结论说明"列的索引（如果存在）
-    conclusion_desc_col_idx = None
-    conclusion_desc_col_name = "开发结论说明"
-    if conclusion_desc_col_name in headers:
-        conclusion_desc_col_idx = headers.index(conclusion_desc_col_name) + 1
-    
-    # 找到"图片"列的索引（如果存在）
-    img_col_idx = None
-    if "图片" in headers:
-        img_col_idx = headers.index("图片") + 1
-    
-    # 需要设置文本换行的列
-    wrap_text_columns = ["商品链接", "产品标题", "主题", "核心词周期", "原因", "商品潜力说明"]
-    wrap_text_col_indices = {}
-    for col_name in wrap_text_columns:
-        if col_name in headers:
-            wrap_text_col_indices[headers.index(col_name) + 1] = col_name
-    
-    # 创建文本换行的对齐方式
-    wrap_alignment = Alignment(wrap_text=True, vertical='top')
-
-    # 记录列宽
-    src_col_widths = {
-        idx: src_ws.column_dimensions[get_column_letter(idx)].width
-        for idx in range(1, len(headers) + 1)
+# =========================================================
+# 流式读取报告（不加载图片）
+# =========================================================
+_NS = {
+    "main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+    "xdr": "http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing",
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+}
+
+
+def _resolve(base_dir: str, target: str) -> str:
+    """关系文件中的 Target 转成压缩包内的路径（openpyxl 写绝对路径，xlsxwriter 写相对路径）"""
+    if target.startswith("/"):
+        return target[1:]
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+def _rels(zf: zipfile.ZipFile, part: str) -> Dict[str, Tuple[str, str]]:
+    """某个部件的关系 {rId: (类型, 路径)}"""
+    rels_path = posixpath.join(posixpath.dirname(part), "_rels", posixpath.basename(part) + ".rels")
+    if rels_path not in zf.namelist():
+        return {}
+    root = ET.fromstring(zf.read(rels_path))
+    return {
+        rel.get("Id"): (rel.get("Type"), _resolve(posixpath.dirname(part), rel.get("Target")))
+        for rel in root.iterfind("rel:Relationship", _NS)
     }
 
-    # 记录行高
-    src_row_heights = {
-        row: src_ws.row_dimensions[row].height
-        for row in range(1, src_ws.max_row + 1)
-    }
 
-    # 行 → 图片（预先读取所有图片数据到内存）
-    row_images = {}
-    for img in src_ws._images:
-        row = img.anchor._from.row + 1
+def sheet_parts(zf: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    """工作簿中所有 sheet 的 (名称, 压缩包内路径)，按 sheet 顺序"""
+    workbook_rels = _rels(zf, "xl/workbook.xml")
+    root = ET.fromstring(zf.read("xl/workbook.xml"))
+    return [
+        (sheet.get("name"), workbook_rels[sheet.get(f"{{{_NS['r']}}}id")][1])
+        for sheet in root.iterfind("main:sheets/main:sheet", _NS)
+    ]
+
+
+def sheet_dimensions(zf: zipfile.ZipFile, sheet_part: str) -> Tuple[Dict[int, float], Dict[int, float]]:
+    """逐元素解析 sheet XML，返回 (列宽 {列号: 宽度}, 行高 {行号: 高度})，行列号从 1 开始"""
+    col_widths: Dict[int, float] = {}
+    row_heights: Dict[int, float] = {}
+    with zf.open(sheet_part) as f:
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            if event == "start":
+                if elem.tag == f"{{{_NS['main']}}}row" and elem.get("ht") is not None:
+                    row_heights[int(elem.get("r"))] = float(elem.get("ht"))
+                elif elem.tag == f"{{{_NS['main']}}}col" and elem.get("width") is not None:
+                    for col_idx in range(int(elem.get("min")), int(elem.get("max")) + 1):
+                        col_widths[col_idx] = float(elem.get("width"))
+            elif elem.tag == f"{{{_NS['main']}}}row":
+                elem.clear()
+    return col_widths, row_heights
+
+
+def sheet_images(zf: zipfile.ZipFile, sheet_part: str) -> List[Tuple[int, int, str, int, int]]:
+    """
+    sheet 中的图片 (行号, 列号, 图片在压缩包内的路径, 显示宽度, 显示高度)，
+    行列号从 1 开始，显示尺寸单位为 EMU（1 像素 = 9525 EMU）；
+    绘图 XML 逐个锚点解析，不在内存中建整棵树（每张图片一个锚点，大报告中有上万个）
+    """
+    anchor_tags = {f"{{{_NS['xdr']}}}{tag}" for tag in ("twoCellAnchor", "oneCellAnchor", "absoluteAnchor")}
+    images = []
+    for rel_type, drawing_part in _rels(zf, sheet_part).values():
+        if not rel_type.endswith("/drawing"):
+            continue
+        media = {rid: target for rid, (_, target) in _rels(zf, drawing_part).items()}
+        with zf.open(drawing_part) as f:
+            for _, anchor in ET.iterparse(f, events=("end",)):
+                if anchor.tag not in anchor_tags:
+                    continue
+                start = anchor.find("xdr:from", _NS)
+                blip = anchor.find("xdr:pic/xdr:blipFill/a:blip", _NS)
+                if start is not None and blip is not None:
+                    # oneCellAnchor 的尺寸在 ext 中，twoCellAnchor 的在图片的 xfrm 中
+                    ext = anchor.find("xdr:ext", _NS)
+                    if ext is None:
+                        ext = anchor.find("xdr:pic/xdr:spPr/a:xfrm/a:ext", _NS)
+                    images.append((
+                        int(start.find("xdr:row", _NS).text) + 1,
+                        int(start.find("xdr:col", _NS).text) + 1,
+                        media[blip.get(f"{{{_NS['r']}}}embed")],
+                        int(ext.get("cx")) if ext is not None else 0,
+                        int(ext.get("cy")) if ext is not None else 0,
+                    ))
+                anchor.clear()
+    return images
+
+
+class ReportReader:
+    """
+    流式读取报告的第一个 sheet：单元格值用 openpyxl 只读模式逐行读取，
+    列宽 / 行高 / 图片位置直接解析 XML；图片只记录在压缩包中的路径，
+    用到时解压到临时目录（每张图片只解压一次），不在内存中保留图片数据
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self._tmp_dir = tempfile.mkdtemp(prefix="split_images_")
+        self._extracted: Dict[str, Tuple[str, Tuple[int, int, float, float]]] = {}
+
+        _, sheet_part = sheet_parts(self._zip)[0]
+        self.col_widths, self.row_heights = sheet_dimensions(self._zip, sheet_part)
+        self.row_images: Dict[int, List[Tuple[int, str]]] = {}
+        for row, col, media, _, _ in sheet_images(self._zip, sheet_part):
+            self.row_images.setdefault(row, []).append((col, media))
+
+    def rows(self):
+        """逐行返回单元格值（元组）"""
+        wb = load_workbook(self.path, read_only=True)
         try:
-            # 立即读取图片数据到内存，避免文件流关闭的问题
-            img_data = img._data()
-            # 确保数据被完全读取到内存（转换为bytes）
-            if hasattr(img_data, 'read'):
-                # 如果是文件流，读取所有数据
-                img_bytes = img_data.read()
-                img_data.close()  # 关闭原始流
-            else:
-                # 如果已经是bytes，直接使用
-                img_bytes = img_data
-            # 将字节数据存储为元组：(图片字节数据, 列索引, 宽度, 高度)
-            col_idx = img.anchor._from.col + 1
-            row_images.setdefault(row, []).append((img_bytes, col_idx, img.width, img.height))
-        except Exception as e:
-            print(f"读取图片数据失败（行 {row}）: {e}")
-
-    # 三层分组：
-    # 第一层：按照主要类别分组（用于创建sheet）
-    # 第二层：按照开发结论值分组
-    # 第三层：按照开发结论说明值分组 - {主类别: {开发结论: {开发结论说明: [行索引列表]}}}
-    category_groups = {}
-    for row_idx in range(2, src_ws.max_row + 1):
-        conclusion_value = src_ws.cell(row=row_idx, column=desc_col_idx).value
-        conclusion_str = str(conclusion_value).strip() if conclusion_value else "未分类"
-        
-        # 获取开发结论说明值
-        if conclusion_desc_col_idx:
-            conclusion_desc_value = src_ws.cell(row=row_idx, column=conclusion_desc_col_idx).value
-            conclusion_desc_str = str(conclusion_desc_value).strip() if conclusion_desc_value else "未分类说明"
-        else:
-            conclusion_desc_str = "未分类说明"
-        
-        main_category = extract_main_category(conclusion_str)
-        
-        if main_category not in category_groups:
-            category_groups[main_category] = {}
-        
-        if conclusion_str not in category_groups[main_category]:
-            category_groups[main_category][conclusion_str] = {}
-        
-        if conclusion_desc_str not in category_groups[main_category][conclusion_str]:
-            category_groups[main_category][conclusion_str][conclusion_desc_str] = []
-        
-        category_groups[main_category][conclusion_str][conclusion_desc_str].append(row_idx)
-
-    new_wb = Workbook()
-    ws_original = new_wb.active
-    ws_original.title = "源数据"
-    
-    # 定义sheet创建顺序（主要类别）
-    sheet_order = ["源数据", "开发", "追踪", "待定", "不开发"]
-
-    # 复制函数，用于复制一行数据到目标工作表
-    def copy_row_to_sheet(src_ws, target_ws, old_row, new_row_idx, headers, wrap_text_col_indices, wrap_alignment, src_row_heights, row_images, src_col_widths, img_col_idx):
-        # 写单元格
-        for col_idx in range(1, len(headers) + 1):
-            cell = target_ws.cell(
-                row=new_row_idx,
-                column=col_idx,
-                value=src_ws.cell(row=old_row, column=col_idx).value
-            )
-            # 如果是需要换行的列，设置对齐方式为换行
-            if col_idx in wrap_text_col_indices:
-                cell.alignment = wrap_alignment
-
-        # 复制行高
-        if src_row_heights.get(old_row):
-            target_ws.row_dimensions[new_row_idx].height = src_row_heights[old_row]
-
-        # 复制图片（核心修复）
-        if old_row in row_images:
-            for img_data_tuple in row_images[old_row]:
-                try:
-                    img_bytes, col_idx, original_width, original_height = img_data_tuple
-                    # 从内存中的字节数据创建新的图片
-                    stream = BytesIO(img_bytes)
-                    new_img = XLImage(stream)
+            yield from wb.worksheets[0].iter_rows(values_only=True)
+        finally:
+            wb.close()
 
-                    col_letter = get_column_letter(col_idx)
+    def image_file(self, media: str) -> Tuple[str, Tuple[int, int, float, float]]:
+        """图片解压后的文件路径和 image_size（宽, 高, DPI）"""
+        if media not in self._extracted:
+            data = self._zip.read(media)
+            path = os.path.join(self._tmp_dir, f"{len(self._extracted)}{posixpath.splitext(media)[1]}")
+            with open(path, "wb") as f:
+                f.write(data)
+            self._extracted[media] = (path, image_size(data))
+        return self._extracted[media]
 
-                    # 计算目标像素尺寸
-                    col_width = src_col_widths.get(col_idx)
-                    row_height = src_row_heights.get(old_row)
+    def close(self):
+        self._zip.close()
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
 
-                    max_w = excel_colwidth_to_pixels(col_width)
-                    max_h = excel_rowheight_to_pixels(row_height)
-                    
-                    # 如果当前图片是"图片"列中的内容，则高度只取一半
-                    if img_col_idx is not None and col_idx == img_col_idx:
-                        max_h = max_h // 2
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
-                    # 限制尺寸（关键）
-                    new_img.width = min(new_img.width, max_w)
-                    new_img.height = min(new_img.height, max_h)
 
-                    target_ws.add_image(new_img, f"{col_letter}{new_row_idx}")
+# =========================================================
+# 流式拆分
+# =========================================================
+def _xlsxwriter_column_width(width: float) -> float:
+    """xlsxwriter 的 set_column 会加上单元格边距（5 像素），换算成写入后与原列宽相同的值"""
+    return width - 5 / 7 if width > 1 + 5 / 7 else width
 
+
+def split_excel_by_description_with_images(
+    input_path: str,
+    output_path: str,
+    desc_col_name: str = "开发结论"
+):
+    """
+    按"开发结论"把报告拆分成 源数据 / 开发 / 追踪 / 待定 / 不开发 几个 sheet，
+    每个类别 sheet 内再按"开发结论说明"分段（说明标题行 + 表头 + 数据行）
+
+    流式实现：ReportReader 读两遍报告，第一遍只按分组列记录行号，第二遍逐行读取单元格值，
+    直接写出"源数据"，类别 sheet 的行按分段顺序暂存到临时文件，再由 xlsxwriter（constant_memory 模式）
+    按行顺序写出；图片只解压一次到临时文件，同一张图片出现在多个 sheet 中时只按文件路径引用，
+    输出文件中也只保存一份。内存中不保留单元格值和图片数据，只有行号和每处图片的锚点信息
+    （xlsxwriter 在 close 时才写出绘图 XML，每处图片约 2 KB）。
+    输出内容（单元格、样式、行高、列宽、图片位置和尺寸）与原 openpyxl 实现一致
+    （python -m benchmarks.split_parity 对比内容和峰值内存）。
+    """
+    import xlsxwriter
+
+    with ReportReader(input_path) as report, tempfile.TemporaryDirectory(prefix="split_rows_") as spool_dir:
+        rows = report.rows()
+        headers = list(next(rows, ()))
+        if desc_col_name not in headers:
+            raise ValueError(f"未找到列：{desc_col_name}")
+        n_cols = len(headers)
+
+        desc_pos = headers.index(desc_col_name)
+        conclusion_desc_col_name = "开发结论说明"
+        conclusion_desc_pos = headers.index(conclusion_desc_col_name) if conclusion_desc_col_name in headers else None
+        img_col_idx = headers.index("图片") + 1 if "图片" in headers else None
+        wrap_positions = {headers.index(col_name) for col_name in SPLIT_WRAP_COLUMNS if col_name in headers}
+        col_widths = {idx: report.col_widths.get(idx, DEFAULT_COLUMN_WIDTH) for idx in range(1, n_cols + 1)}
+
+        def group_key(row) -> Tuple[str, str, str]:
+            """(主类别, 开发结论, 开发结论说明)"""
+            conclusion_value = row[desc_pos] if desc_pos < len(row) else None
+            conclusion_str = str(conclusion_value).strip() if conclusion_value else "未分类"
+            if conclusion_desc_pos is not None and conclusion_desc_pos < len(row) and row[conclusion_desc_pos]:
+                conclusion_desc_str = str(row[conclusion_desc_pos]).strip()
+            else:
+                conclusion_desc_str = "未分类说明"
+            return extract_main_category(conclusion_str), conclusion_str, conclusion_desc_str
+
+        # 第一遍：三层分组 {主类别: {开发结论: {开发结论说明: [行号列表]}}}，只保留行号
+        category_groups = {}
+        for row_idx, row in enumerate(rows, start=2):
+            main_category, conclusion_str, conclusion_desc_str = group_key(row)
+            (category_groups.setdefault(main_category, {})
+             .setdefault(conclusion_str, {})
+             .setdefault(conclusion_desc_str, [])
+             .append(row_idx))
+
+        if os.path.dirname(output_path):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        workbook = xlsxwriter.Workbook(output_path, {
+            "constant_memory": True,
+            "strings_to_formulas": False,
+            "strings_to_urls": False,
+            "strings_to_numbers": False,
+            "default_date_format": "yyyy-mm-dd h:mm:ss",
+            "nan_inf_to_errors": True,
+        })
+        wrap_format = workbook.add_format({"text_wrap": True, "valign": "top"})
+        border = {"border": 1, "border_color": "#000000"}
+        section_title_format = workbook.add_format({
+            "font_name": "Microsoft YaHei", "font_size": 11, "bold": True, "font_color": "#FFFFFF",
+            "bg_color": "#70AD47", "pattern": 1, "align": "left", "valign": "vcenter", **border,
+        })
+        header_format = workbook.add_format({"font_name": "Microsoft YaHei", "font_size": 10, "bold": True, **border})
+
+        def new_sheet(name: str):
+            ws = workbook.add_worksheet(name)
+            for col_idx, width in col_widths.items():
+                if width:
+                    ws.set_column(col_idx - 1, col_idx - 1, _xlsxwriter_column_width(width))
+            return ws
+
+        def write_value(ws, row: int, col: int, value, cell_format=None):
+            if value is None:
+                if cell_format is not None:
+                    ws.write_blank(row, col, None, cell_format)
+            elif isinstance(value, str):
+                ws.write_string(row, col, value, cell_format)
+            else:
+                ws.write(row, col, value, cell_format)
+
+        def copy_row(ws, old_row: int, values: tuple, new_row: int):
+            """把报告中的一行（单元格、行高、图片）写到目标 sheet 的 new_row 行（行号从 1 开始）"""
+            row_height = report.row_heights.get(old_row)
+            if row_height:
+                ws.set_row(new_row - 1, row_height)
+            for col_idx, media in report.row_images.get(old_row, []):
+                try:
+                    path, size = report.image_file(media)
+                    # 限制尺寸：不超过列宽 / 行高对应的像素（"图片"列的高度只取一半）
+                    max_w = excel_colwidth_to_pixels(col_widths.get(col_idx))
+                    max_h = excel_rowheight_to_pixels(row_height)
+                    if img_col_idx is not None and col_idx == img_col_idx:
+                        max_h = max_h // 2
+                    width, height = min(size[0], max_w), min(size[1], max_h)
+                    ws.insert_image(new_row - 1, col_idx - 1, path, {
+                        "object_position": 2, **xlsxwriter_image_scale(size, width, height),
+                    })
                 except Exception as e:
-                    print(f"图片复制失败（行 {old_row}）: {e}")
-
-    # 1. 第一个sheet：复制所有原始数据
-    # 写表头
-    for col_idx, header in enumerate(headers, 1):
-        ws_original.cell(row=1, column=col_idx, value=header)
-
-    # 复制列宽
-    for col_idx, width in src_col_widths.items():
-        if width:
-            ws_original.column_dimensions[get_column_letter(col_idx)].width = width
-
-    original_row_idx = 2
-    for old_row in range(2, src_ws.max_row + 1):
-        copy_row_to_sheet(
-            src_ws, ws_original, old_row, original_row_idx,
-            headers, wrap_text_col_indices, wrap_alignment,
-            src_row_heights, row_images, src_col_widths, img_col_idx
-        )
-        original_row_idx += 1
-
-    # 定义说明内容的样式
-    section_title_font = Font(name='Microsoft YaHei', size=11, bold=True, color='FFFFFF')
-    section_title_fill = PatternFill(start_color='70AD47', end_color='70AD47', fill_type='solid')
-    header_font = Font(name='Microsoft YaHei', size=10, bold=True)
-    border_style = Border(
-        left=Side(style='thin', color='000000'),
-        right=Side(style='thin', color='000000'),
-        top=Side(style='thin', color='000000'),
-        bottom=Side(style='thin', color='000000')
-    )
-    
-    # 2. 其他sheet：按照主要类别创建，每个sheet内按开发结论说明值分组显示
-    for main_category in sheet_order[1:]:  # 跳过"源数据"
-        if main_category not in category_groups:
-            continue  # 如果该主要类别没有数据，跳过
-        
-        # 获取该主要类别下的所有开发结论和数据
-        conclusions = category_groups[main_category]
-        if not conclusions:
-            continue
-        
-        ws_new = new_wb.create_sheet(main_category[:31])
-        
-        # 复制列宽
-        for col_idx, width in src_col_widths.items():
-            if width:
-                ws_new.column_dimensions[get_column_letter(col_idx)].width = width
-        
-        current_row = 1
-        
-        # 收集所有开发结论说明值，用于按说明分组
-        # 因为同一个说明可能出现在不同的开发结论下，我们需要按说明分组
-        all_conclusion_descriptions = {}
-        for conclusion_str, conclusion_descriptions in conclusions.items():
-            for desc_str, rows in conclusion_descriptions.items():
-                if desc_str not in all_conclusion_descriptions:
-                    all_conclusion_descriptions[desc_str] = []
-                all_conclusion_descriptions[desc_str].extend(rows)
-        
-        # 按照开发结论说明顺序处理每个部分
-        sorted_descriptions = sorted(all_conclusion_descriptions.keys())
-        
-        for desc_idx, conclusion_desc_str in enumerate(sorted_descriptions):
-            rows = all_conclusion_descriptions[conclusion_desc_str]
-            if not rows:
+                    row_event('拆分报告图片', FAILED, '复制出错', old_row, f"图片复制失败（行 {old_row}）: {e}")
+            for col_pos, value in enumerate(values):
+                write_value(ws, new_row - 1, col_pos, value, wrap_format if col_pos in wrap_positions else None)
+
+        # 第二遍：逐行读取单元格值，写出第一个sheet（所有原始数据）；
+        # 类别 sheet 中的行顺序与报告不同，按 (主类别, 开发结论, 开发结论说明) 暂存到临时文件
+        ws_original = new_sheet(SHEET_ORDER[0])
+        for col_pos, header in enumerate(headers):
+            write_value(ws_original, 0, col_pos, header)
+        spool_paths: Dict[Tuple[str, str, str], str] = {}
+        spool_files = {}
+        try:
+            rows = report.rows()
+            next(rows, None)
+            for old_row, row in enumerate(rows, start=2):
+                values = tuple(row[:n_cols]) + (None,) * (n_cols - len(row))
+                copy_row(ws_original, old_row, values, old_row)
+                key = group_key(values)
+                if key[0] not in SHEET_ORDER[1:]:
+                    continue
+                if key not in spool_files:
+                    spool_paths[key] = os.path.join(spool_dir, f"{len(spool_paths)}.pickle")
+                    spool_files[key] = open(spool_paths[key], "wb")
+                pickle.dump((old_row, values), spool_files[key], protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            for f in spool_files.values():
+                f.close()
+
+        def spooled_rows(key: Tuple[str, str, str]):
+            """按报告中的顺序读回暂存的 (行号, 单元格值)"""
+            with open(spool_paths[key], "rb") as f:
+                while True:
+                    try:
+                        yield pickle.load(f)
+                    except EOFError:
+                        return
+
+        # 2. 其他sheet：按照主要类别创建，每个sheet内按开发结论说明值分组显示
+        for main_category in SHEET_ORDER[1:]:
+            conclusions = category_groups.get(main_category)
+            if not conclusions:
                 continue
-            
-            # 1. 添加开发结论说明行（显示开发结论说明的值）
-            section_title_cell = ws_new.cell(row=current_row, column=1, value=conclusion_desc_str)
-            section_title_cell.font = section_title_font
-            section_title_cell.fill = section_title_fill
-            section_title_cell.alignment = Alignment(horizontal='left', vertical='center')
-            section_title_cell.border = border_style
-            
-            # 合并单元格，让说明跨越多列
-            max_col = min(len(headers), 10)
-            ws_new.merge_cells(start_row=current_row, start_column=1, 
-                              end_row=current_row, end_column=max_col)
-            ws_new.row_dimensions[current_row].height = 22
-            current_row += 1
-            
-            # 2. 写表头行
-            for col_idx, header in enumerate(headers, 1):
-                header_cell = ws_new.cell(row=current_row, column=col_idx, value=header)
-                header_cell.font = header_font
-                header_cell.border = border_style
-            ws_new.row_dimensions[current_row].height = 20
-            current_row += 1
-            
-            # 3. 复制数据行
-            for old_row in rows:
-                copy_row_to_sheet(
-                    src_ws, ws_new, old_row, current_row,
-                    headers, wrap_text_col_indices, wrap_alignment,
-                    src_row_heights, row_images, src_col_widths, img_col_idx
-                )
+            ws_new = new_sheet(main_category[:31])
+
+            # 同一个说明可能出现在不同的开发结论下，按说明合并（开发结论按首次出现的顺序）
+            all_conclusion_descriptions = {}
+            for conclusion_str, conclusion_descriptions in conclusions.items():
+                for desc_str in conclusion_descriptions:
+                    all_conclusion_descriptions.setdefault(desc_str, []).append(conclusion_str)
+            sorted_descriptions = sorted(all_conclusion_descriptions)
+
+            current_row = 1
+            for desc_idx, conclusion_desc_str in enumerate(sorted_descriptions):
+                # 开发结论说明行（跨多列合并）
+                max_col = min(n_cols, 10)
+                ws_new.set_row(current_row - 1, 22)
+                if max_col > 1:
+                    ws_new.merge_range(current_row - 1, 0, current_row - 1, max_col - 1,
+                                       conclusion_desc_str, section_title_format)
+                else:
+                    ws_new.write_string(current_row - 1, 0, conclusion_desc_str, section_title_format)
+                current_row += 1
+
+                # 表头行
+                ws_new.set_row(current_row - 1, 20)
+                for col_pos, header in enumerate(headers):
+                    write_value(ws_new, current_row - 1, col_pos, header, header_format)
                 current_row += 1
-            
-            # 4. 在部分之间添加空行（最后一个部分不添加）
-            if desc_idx < len(sorted_descriptions) - 1:
-                current_row += 2  # 空出2行作为分隔
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    new_wb.save(output_path)
+                # 数据行
+                for conclusion_str in all_conclusion_descriptions[conclusion_desc_str]:
+                    for old_row, values in spooled_rows((main_category, conclusion_str, conclusion_desc_str)):
+                        copy_row(ws_new, old_row, values, current_row)
+                        current_row += 1
+
+                # 部分之间空出2行（最后一个部分不添加）
+                if desc_idx < len(sorted_descriptions) - 1:
+                    current_row += 2
+
+        # 图片文件在 close 时才写入压缩包，必须在 ReportReader 关闭前完成
+        workbook.close()
 
     print(f"✅ 已完成拆分并保持图片大小：{output_path}")
 
 
 if __name__ == '__main__':
     split_excel_by_description_with_images(input_path='result/bs/流量周期分析结果_20260120.xlsx',
-                                           output_path='result/bs/潜在价值结果/分类后_潜在价值_20260120.xlsx')
\ No newline at end of file
+                                           output_path='result/bs/潜在价值结果/分类后_潜在价值_20260120.xlsx')
@@ -0,0 +1,125 @@
+import re
+import pandas as pd
+
+# 标题标准化：小写 + 去符号 + 合并空格
+NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+SPACES_RE = re.compile(r"\s+")
+# 数量，如 96pcs / 96 pcs / 96 Pieces / 96-piece（在标准化后的标题上匹配）
+PCS_RE = re.compile(r"(\d+)\s*(pcs|pc|pieces|piece)")
+
+# 标题中能识别出的材质（按在标题中出现的先后取第一个）
+MATERIAL_HINTS = ('cardboard', 'paper', 'plastic', 'foam', 'bamboo', 'wood', 'metal', 'glass', 'acrylic')
+
+# 一次匹配提取所有特征：每个特征是一个可选的前瞻分组，互不影响
+TITLE_FEATURE_RE = re.compile(
+    r"^(?=(?:.*?(?P<pcs>\d+)\s*(?:pcs|pc|pieces|piece))?)"
+    r"(?=(?:.*?(?P<size>\d+)\s*inch)?)"
+    r"(?=(?:.*?(?P<inch9>9inch))?)"
+    r"(?=(?:.*?(?P<inch7>7inch))?)"
+    rf"(?=(?:.*?\b(?P<material>{'|'.join(MATERIAL_HINTS)}))?)"
+    r"(?=(?:.*?(?P<photography>photography))?)"
+)
+
+# 特征列（加 标题_ 前缀，避免与结果列 pcs / 材质 重名）
+TITLE_FEATURE_COLUMNS = ['标题_标准化', '标题_pcs', '标题_尺寸', '标题_9inch', '标题_7inch', '标题_材质', '标题_photography']
+
+
+def normalize_titles(titles: pd.Series) -> pd.Series:
+    """批量标准化标题（与 pass_rule.normalize_title 一致，空值视为空字符串）"""
+    # object 列走 Python re，与 normalize_title 的 \s 语义一致
+    return (titles.map(lambda t: str(t or "")).astype(object).str.lower()
+            .str.replace(NON_ALNUM_RE.pattern, " ", regex=True)
+            .str.replace(SPACES_RE.pattern, " ", regex=True)
+            .str.strip())
+
+
+def extract_title_features(titles: pd.Series) -> pd.DataFrame:
+    """
+    批量提取标题特征（相同标题只处理一次）
+
+    参数
+    ------
+    titles : pd.Series
+        产品标题列
+
+    返回
+    ------
+    pd.DataFrame
+        与 titles 索引一致，列为 TITLE_FEATURE_COLUMNS：
+        标准化标题、pcs 数量、尺寸（第一个 Ninch 的 N）、是否含 9inch / 7inch（与 pass_rule 的尺寸规则一致，按子串判断）、
+        材质提示（MATERIAL_HINTS 中最先出现的一个）、是否含 photography。
+        解析不到的数值为 <NA>，材质为 None。
+    """
+    codes, uniques = pd.factorize(titles.map(lambda t: str(t or "")).astype(object))
+    norm = normalize_titles(pd.Series(uniques, dtype=object))
+    parts = norm.str.extract(TITLE_FEATURE_RE.pattern)
+
+    features = pd.DataFrame({
+        '标题_标准化': norm,
+        '标题_pcs': pd.to_numeric(parts['pcs']).astype('Int64'),
+        '标题_尺寸': pd.to_numeric(parts['size']).astype('Int64'),
+        '标题_9inch': parts['inch9'].notna(),
+        '标题_7inch': parts['inch7'].notna(),
+        '标题_材质': parts['material'].astype(object).where(parts['material'].notna(), None),
+        '标题_photography': parts['photography'].notna(),
+    })
+    features = features.iloc[codes].reset_index(drop=True)
+    features.index = titles.index
+    return features
+
+
+def add_title_features(df: pd.DataFrame, title_col: str = '产品标题') -> pd.DataFrame:
+    """
+    在 df 上追加标题特征列（已有特征列时直接复用）
+
+    返回
+    ------
+    pd.DataFrame
+        追加了 TITLE_FEATURE_COLUMNS 的 DataFrame（原 df 不修改）
+    """
+    if all(col in df.columns for col in TITLE_FEATURE_COLUMNS):
+        return df
+    features = extract_title_features(df[title_col].astype(object))
+    return df.drop(columns=[c for c in TITLE_FEATURE_COLUMNS if c in df.columns]).join(features)
+
+
+def get_title_features(df: pd.DataFrame, title_col: str = '产品标题') -> pd.DataFrame:
+    """取出 df 的标题特征列，df 中没有时现场提取（没有标题列时按空标题处理）"""
+    if all(col in df.columns for col in TITLE_FEATURE_COLUMNS):
+        return df[TITLE_FEATURE_COLUMNS]
+    if title_col in df.columns:
+        titles = df[title_col].astype(object)
+    else:
+        titles = pd.Series([None] * len(df), index=df.index, dtype=object)
+    return extract_title_features(titles.where(titles.notna(), None))
+
+
+if __name__ == '__main__':
+    # 与逐个标题调用 pass_rule.normalize_title / extract_pcs 的一致性检查 + 耗时对比
+    import glob
+    import time
+
+    from pass_rule import extract_pcs, normalize_title
+
+    titles = ['60pcs 9inch Plates', '60 PCS 7-inch', '19inch 96-piece\xa0set', 'Photography Backdrop', None, '']
+    for best_sellers in sorted(glob.glob('input_file/rank/*/best-sellers-*.xlsx')):
+        titles += pd.read_excel(best_sellers)['产品标题'].astype(object).tolist()
+    series = pd.Series(titles * 20, dtype=object)
+    series = series.where(series.notna(), None)
+
+    t0 = time.perf_counter()
+    expected = []
+    for title in series:
+        norm_title = normalize_title(str(title or ""))
+        size = re.search(r"(\d+)\s*inch", norm_title)
+        material = re.search(rf"\b({'|'.join(MATERIAL_HINTS)})", norm_title)
+        expected.append((norm_title, extract_pcs(norm_title), int(size.group(1)) if size else None,
+                         "9inch" in norm_title, "7inch" in norm_title, material.group(1) if material else None,
+                         'photography' in str(title).lower()))
+    t1 = time.perf_counter()
+    features = extract_title_features(series)
+    t2 = time.perf_counter()
+
+    actual = [tuple(None if v is pd.NA else v for v in row) for row in features.itertuples(index=False, name=None)]
+    assert actual == expected, next((e, a) for e, a in zip(expected, actual) if e != a)
+    print(f'一致性检查通过：{len(series)} 个标题；逐个解析 {t1 - t0:.3f}s，批量提取 {t2 - t1:.3f}s')
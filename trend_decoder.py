@@ -0,0 +1,191 @@
+import ast
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class TruncatedPayloadError(ValueError):
+    """单元格中的数据被截断（括号或字符串未闭合），无法完整解析"""
+
+
+# Python 字面量中需要改写成 JSON 的部分：字符串、None/True/False；数字和括号原样保留
+_PY_TOKEN_RE = re.compile(r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|\bNone\b|\bTrue\b|\bFalse\b""", re.S)
+# 截断检查：完整的字符串、括号，以及未闭合的引号
+_STRUCTURE_RE = re.compile(r"""'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|[\[\]{}()]|['"]""", re.S)
+_KEYWORDS = {"None": "null", "True": "true", "False": "false"}
+_CLOSING = {"]": "[", "}": "{", ")": "("}
+
+
+def _json_loads(text: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _replace_py_token(match: re.Match) -> str:
+    token = match.group(0)
+    if token in _KEYWORDS:
+        return _KEYWORDS[token]
+    if token[0] == '"' or "\\" not in token:
+        # 不含转义的单引号字符串直接换成双引号
+        if token[0] == "'":
+            return json.dumps(token[1:-1], ensure_ascii=False)
+        return token
+    return json.dumps(ast.literal_eval(token), ensure_ascii=False)
+
+
+def python_literal_to_json(text: str) -> str:
+    """把 Python 字面量文本（单引号字符串、None/True/False）改写成 JSON 文本"""
+    parts = text.split("'")
+    if '"' in text or "\\" in text or len(parts) % 2 == 0:
+        # 含双引号、转义或引号不成对：逐个字符串改写
+        return _PY_TOKEN_RE.sub(_replace_py_token, text)
+
+    # 常见情况：没有双引号和转义，单引号一定是字符串边界，
+    # 偶数段在字符串外（只有数字、标点和 None/True/False），奇数段是字符串内容
+    outside = "\x00".join(parts[0::2])
+    for keyword, value in _KEYWORDS.items():
+        outside = outside.replace(keyword, value)
+    parts[0::2] = outside.split("\x00")
+    return '"'.join(parts)
+
+
+def _check_truncated(text: str):
+    """括号或字符串未闭合时抛出 TruncatedPayloadError"""
+    stack: List[str] = []
+    for match in _STRUCTURE_RE.finditer(text):
+        token = match.group(0)
+        if token in ("'", '"'):
+            raise TruncatedPayloadError(f"字符串未闭合（位置 {match.start()}，总长度 {len(text)}）")
+        if token in "[{(":
+            stack.append(token)
+        elif token in _CLOSING:
+            if not stack or stack.pop() != _CLOSING[token]:
+                return
+    if stack:
+        raise TruncatedPayloadError(f"有 {len(stack)} 层括号未闭合（总长度 {len(text)}）")
+
+
+def decode_payload(text: str) -> Any:
+    """
+    解析 sell_trend / search_trend 单元格文本
+
+    先按 JSON 解析（有 orjson 时使用 orjson），失败时把 Python 字面量改写成 JSON 再解析，
+    仍失败且括号/字符串未闭合时抛出 TruncatedPayloadError，其他格式最后交给 ast.literal_eval。
+
+    返回
+    ------
+    与 ast.literal_eval 相同的 Python 对象（dict / list）
+    """
+    text = text.strip()
+    try:
+        return _json_loads(text)
+    except ValueError:
+        pass
+    try:
+        return _json_loads(python_literal_to_json(text))
+    except ValueError:
+        pass
+    _check_truncated(text)
+    # 元组、尾逗号等少见写法
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError, MemoryError, RecursionError) as e:
+        raise ValueError(f"无法解析的数据: {e}") from e
+
+
+def _int_array(values: Optional[list]) -> np.ndarray:
+    """数值列表转 int64 数组；含空值时转 float64（空值为 NaN）"""
+    if not values:
+        return np.zeros(0, dtype=np.int64)
+    try:
+        return np.asarray(values, dtype=np.int64)
+    except (TypeError, ValueError):
+        return np.asarray(values, dtype=float)
+
+
+def _month_keys(months: Optional[list]) -> np.ndarray:
+    """'2024-01' / '202401' 格式的月份转成 int 形式的 YYYYMM"""
+    if not months:
+        return np.zeros(0, dtype=np.int32)
+    return np.asarray([int(str(m).replace("-", "")[:6]) for m in months], dtype=np.int32)
+
+
+@dataclass
+class KeywordTrend:
+    """单个核心词的月度搜索量"""
+    keyword: Optional[str]
+    keyword_cn: Optional[str]
+    months: np.ndarray  # int32，YYYYMM
+    searches: np.ndarray  # int64（含空值时为 float64）
+
+
+@dataclass
+class SalesTrend:
+    """月度销量"""
+    months: np.ndarray  # int32，YYYYMM
+    sales: np.ndarray  # int64（含空值时为 float64）
+
+
+def decode_search_trend(text: str) -> List[KeywordTrend]:
+    """解析 search_trend（核心词周期数据）为每个核心词的类型化数组"""
+    payload = decode_payload(text) if isinstance(text, str) else text
+    return [
+        KeywordTrend(
+            keyword=item.get("keyword"),
+            keyword_cn=item.get("keywordCn"),
+            months=_month_keys(item.get("months")),
+            searches=_int_array(item.get("searches")),
+        )
+        for item in (payload or {}).get("data", []) or []
+    ]
+
+
+def decode_sell_trend(text: str) -> SalesTrend:
+    """解析 sell_trend（销量数据）为月份和销量数组"""
+    payload = decode_payload(text) if isinstance(text, str) else text
+    payload = payload or []
+    return SalesTrend(
+        months=_month_keys([item.get("dk") for item in payload]),
+        sales=_int_array([item.get("sales") for item in payload]),
+    )
+
+
+if __name__ == "__main__":
+    import time
+    import pandas as pd
+
+    df = pd.read_excel("input_file/kinds/2026-02-02/asin详细数据-2026-02-02.xlsx")
+    cells = df["核心词周期数据"].dropna().tolist() + df["销量数据"].dropna().tolist()
+
+    # 结果一致性
+    assert all(decode_payload(cell) == ast.literal_eval(cell) for cell in cells), "解析结果与 literal_eval 不一致"
+
+    # 截断检测
+    try:
+        decode_payload(cells[0][:len(cells[0]) // 2])
+    except TruncatedPayloadError as e:
+        print(f"截断检测: {e}")
+
+    elapsed = {}
+    for name, func in (("literal_eval", ast.literal_eval), ("decode_payload", decode_payload)):
+        t0 = time.perf_counter()
+        for _ in range(5):
+            for cell in cells:
+                func(cell)
+        elapsed[name] = (time.perf_counter() - t0) / 5
+    print(f"{len(cells)} 个单元格：literal_eval {elapsed['literal_eval'] * 1e3:.1f} ms，"
+          f"decode_payload {elapsed['decode_payload'] * 1e3:.1f} ms，"
+          f"加速 {elapsed['literal_eval'] / elapsed['decode_payload']:.1f}x")
+
+    trends = decode_search_trend(cells[0])
+    print(f"核心词数: {len(trends)}，首个核心词: {trends[0].keyword}，月份: {trends[0].months[:3]}，"
+          f"搜索量类型: {trends[0].searches.dtype}")